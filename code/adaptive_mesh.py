@@ -0,0 +1,230 @@
+"""
+Adaptive meshes of prisms driven by the pressure field and by the
+computation points.
+
+A layer of prisms built with ``compaction.prism_layer_rectangular`` has the
+same resolution everywhere, even where the pressure is smooth or the prisms
+are far from all the computation points. Here the layer is refined as a
+quadtree (or an octree, if the prisms are also split along ``z``): a prism
+is split only if the field produced by its children at the computation
+points differs from the field produced by the prism itself by more than its
+share of the tolerance. The pressure of each prism is the average of the
+pressure over its area (or volume).
+"""
+
+import numpy as np
+import compaction as cp
+import sensitivity as sens
+
+
+def prism_layer_adaptive(
+    region, bottom, top, pressure, coordinates, poisson, young,
+    tolerance=1e-3, field="displacement_z", shape=(1, 1), max_depth=6,
+    split_z=False, samples=4
+):
+    """
+    Create a layer of prisms adaptively refined for a pressure distribution
+    and a set of computation points.
+
+    The layer starts as ``shape`` prisms. At each level, every prism is split
+    into 4 children along ``y`` and ``x`` (8 if ``split_z``). The difference
+    between the fields produced by the children and by the prism (with their
+    average pressures) is an estimate of the error of keeping the prism. The
+    prism is kept if this difference is not greater than ``tolerance`` times
+    the largest absolute field times the fraction of the volume of the layer
+    occupied by the prism. The sum of the estimates of the kept prisms is
+    then not greater than ``tolerance`` times the largest absolute field.
+
+    The fields are computed with ``sensitivity.sensitivity_matrix``, so each
+    level requires memory proportional to the number of computation points
+    times the number of prisms being refined. The fields of the children
+    are kept for the next level, so each prism is computed only once.
+
+    Parameters
+    ----------
+    region : list
+        Boundaries ``y1``, ``y2``, ``x1`` and ``x2`` of the layer in meters.
+    bottom, top : float
+        Depths of the bottom and the top of the layer in meters.
+    pressure : func or 2d-array
+        Function of the ``y``, ``x`` and ``z`` coordinates (arrays) returning
+        the pressure in MPa, or 2d array with the pressure of the cells of a
+        regular grid covering ``region``, with the cells along ``y`` on the
+        first dimension (as in ``compaction.prism_layer_rectangular``).
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+    tolerance : float (optional)
+        Target relative error of the field. Default to 1e-3.
+    field : str (optional)
+        Field component used to estimate the error (see
+        ``sensitivity.sensitivity_matrix``). Default to ``displacement_z``.
+    shape : tuple (optional)
+        Number of prisms along ``y`` and ``x`` of the initial layer.
+        Default to (1, 1).
+    max_depth : int (optional)
+        Maximum number of refinements of the initial prisms. It must be at
+        least 1. Default to 6.
+    split_z : bool (optional)
+        If ``True``, the prisms are also split along ``z``. Default to
+        ``False``.
+    samples : int (optional)
+        Number of midpoints along each direction used to average a pressure
+        function over each prism. Default to 4.
+
+    Returns
+    -------
+    prisms : 2d-array
+        Boundaries of the prisms (see ``compaction.field_component``).
+    pressure : 1d-array
+        Average pressure of each prism.
+    error : float
+        Sum of the error estimates of the prisms divided by the largest
+        absolute field. If ``max_depth`` stops the refinement, the prisms
+        of the last level are estimated by the errors of their parents,
+        which exceed their shares of the tolerance.
+    """
+    if tolerance < 0:
+        raise ValueError(
+            "Invalid tolerance ({}). ".format(tolerance)
+            + "It must be positive or zero."
+        )
+    if max_depth < 1:
+        raise ValueError(
+            "Invalid max_depth ({}). ".format(max_depth)
+            + "It must be a positive integer."
+        )
+    cells = cp.prism_layer_rectangular(region, shape, bottom, top)
+    if callable(pressure):
+        average = _function_average(pressure, samples, split_z)
+    else:
+        average = _grid_average(np.asarray(pressure, dtype=float), region)
+    values = average(cells)
+    total_volume = _volume(cells).sum()
+    n_children = 8 if split_z else 4
+    leaves, leaf_values = [], []
+    leaf_field = np.zeros(np.broadcast(*coordinates[:3]).size)
+    leaf_error = 0.0
+    scale = 0.0
+    # Fields of the prisms being refined (the children of the previous level)
+    parent_field = values*sens.sensitivity_matrix(
+        coordinates, cells, poisson, young, field, disable_checks=True
+    )
+    # Errors of the prisms whose children are still being refined
+    pending_error = np.zeros(0)
+    for depth in range(max_depth):
+        if cells.shape[0] == 0:
+            break
+        children = _split(cells, split_z)
+        child_values = average(children)
+        child_field = child_values*sens.sensitivity_matrix(
+            coordinates, children, poisson, young, field, disable_checks=True
+        )
+        children_field = child_field.reshape(
+            -1, cells.shape[0], n_children
+        ).sum(axis=2)
+        error = np.abs(children_field - parent_field).max(axis=0)
+        scale = np.abs(leaf_field + children_field.sum(axis=1)).max()
+        refine = error > tolerance*scale*_volume(cells)/total_volume
+        leaves.append(cells[~refine])
+        leaf_values.append(values[~refine])
+        leaf_field += parent_field[:, ~refine].sum(axis=1)
+        leaf_error += error[~refine].sum()
+        pending_error = error[refine]
+        refine = np.repeat(refine, n_children)
+        cells = children[refine]
+        values = child_values[refine]
+        parent_field = child_field[:, refine]
+    # The prisms left when max_depth stops the refinement are estimated by
+    # the errors of their parents
+    if cells.shape[0] > 0:
+        leaf_error += pending_error.sum()
+    leaves.append(cells)
+    leaf_values.append(values)
+    prisms = np.vstack(leaves)
+    pressure = np.concatenate(leaf_values)
+    return prisms, pressure, leaf_error/scale if scale > 0 else 0.0
+
+
+def _volume(prisms):
+    """
+    Volume of the prisms.
+    """
+    return (
+        (prisms[:, 1] - prisms[:, 0])*(prisms[:, 3] - prisms[:, 2])
+        * (prisms[:, 4] - prisms[:, 5])
+    )
+
+
+def _split(prisms, split_z):
+    """
+    Split each prism into 4 children along ``y`` and ``x``, or into 8
+    children if ``split_z``. The children of each prism are consecutive.
+    """
+    y1, y2, x1, x2, z2, z1 = prisms.T
+    y_mid = 0.5*(y1 + y2)
+    x_mid = 0.5*(x1 + x2)
+    z_mid = 0.5*(z1 + z2)
+    y_halves = ((y1, y_mid), (y_mid, y2))
+    x_halves = ((x1, x_mid), (x_mid, x2))
+    z_halves = ((z_mid, z1), (z2, z_mid)) if split_z else ((z2, z1),)
+    children = [
+        np.column_stack([y[0], y[1], x[0], x[1], z[0], z[1]])
+        for y in y_halves for x in x_halves for z in z_halves
+    ]
+    return np.stack(children, axis=1).reshape(-1, 6)
+
+
+def _function_average(pressure, samples, split_z):
+    """
+    Average of a pressure function over each prism, computed with the
+    midpoint rule.
+    """
+    fractions = (np.arange(samples) + 0.5)/samples
+
+    def average(prisms):
+        y = prisms[:, :1] + fractions*(prisms[:, 1:2] - prisms[:, :1])
+        x = prisms[:, 2:3] + fractions*(prisms[:, 3:4] - prisms[:, 2:3])
+        if split_z:
+            z = prisms[:, 5:6] + fractions*(prisms[:, 4:5] - prisms[:, 5:6])
+        else:
+            z = 0.5*(prisms[:, 4:5] + prisms[:, 5:6])
+        y, x, z = (
+            np.broadcast_to(i, (prisms.shape[0], samples))
+            for i in (y, x, z)
+        )
+        values = pressure(
+            y[:, :, None, None], x[:, None, :, None], z[:, None, None, :]
+        )
+        return np.broadcast_to(
+            values, (prisms.shape[0], samples, samples, samples)
+        ).mean(axis=(1, 2, 3))
+
+    return average
+
+
+def _grid_average(grid, region):
+    """
+    Area-weighted average of the pressure of the cells of a regular grid
+    over each prism.
+    """
+    y_edges, x_edges = cp.cell_edges(region, grid.shape)
+
+    def overlap(lower, upper, edges):
+        return np.clip(
+            np.minimum(upper[:, None], edges[None, 1:])
+            - np.maximum(lower[:, None], edges[None, :-1]),
+            0, None
+        )
+
+    def average(prisms):
+        y_overlap = overlap(prisms[:, 0], prisms[:, 1], y_edges)
+        x_overlap = overlap(prisms[:, 2], prisms[:, 3], x_edges)
+        area = y_overlap.sum(axis=1)*x_overlap.sum(axis=1)
+        return np.einsum("pi,ij,pj->p", y_overlap, grid, x_overlap)/area
+
+    return average
@@ -0,0 +1,565 @@
+"""
+Benchmarks of the forward models.
+
+Run this module from the ``code`` directory::
+
+    python benchmarks.py [--output results.json] [--reference old.json]
+
+The suite (see ``run_suite``) times the three forward engines
+(``compaction``, ``geertsma_disk`` and ``geertsma_nucleus_strain``) on the
+models of the notebooks Test_1, Test_2 and Test_3 and on cylinders of
+increasing size. The results are saved in a JSON file, which can be compared
+with the file of a previous release.
+
+"""
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import compaction as cp
+import geertsma_disk as disk
+
+
+# Target of the first call of displacement_z_component in a new process,
+# with the loops cached on disk (see cold_start_benchmark)
+COLD_START_TARGET = 1.0
+
+# Script timing the first call of displacement_z_component in a new process
+_COLD_START_SCRIPT = """
+import time
+import numpy as np
+import compaction as cp
+prisms = cp.prism_layer_rectangular((-1000, 1000, -1000, 1000), (4, 4), 1100,
+                                    1000)
+start = time.perf_counter()
+cp.displacement_z_component(np.zeros((3, 5)), prisms, -np.ones(16), 0.25,
+                            3300)
+print(time.perf_counter() - start)
+"""
+
+
+# Elastic parameters of the notebooks
+POISSON = 0.25
+YOUNG = 3300
+
+# Number of prisms along y and x and number of computation points of the
+# cylinders of increasing size (see workloads)
+SCALES = ((10, 400), (20, 1600), (40, 6400))
+
+# Script timing a case of the suite in a new process (see run_suite)
+_CASE_SCRIPT = """
+import json
+import benchmarks
+print(json.dumps(benchmarks.time_case({!r}, {!r}, repeat={})))
+"""
+
+
+def best_time(function, *args, repeat=3):
+    """
+    Smallest wall time of repeated calls of a function.
+
+    Parameters
+    ----------
+    function : func
+        Function to be timed.
+    args
+        Arguments passed to the function.
+    repeat : int (optional)
+        Number of calls. Default to 3.
+
+    Returns
+    -------
+    time : float
+        Smallest wall time in seconds.
+    """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def dispatch_benchmark(shape=(30, 30), n_points=1600, repeat=3):
+    """
+    Compare the generic loop of ``compaction.field_component``, which
+    receives the kernel as an argument, with the loops specialized for each
+    kernel.
+
+    Both loops are compiled before being timed. The computation points are
+    on the surface above a single layer of prisms.
+
+    Parameters
+    ----------
+    shape : tuple (optional)
+        Number of prisms along the ``y`` and ``x`` directions.
+        Default to (30, 30).
+    n_points : int (optional)
+        Number of computation points. Default to 1600.
+    repeat : int (optional)
+        Number of timed calls of each loop. Default to 3.
+
+    Returns
+    -------
+    times : dict
+        Smallest wall times in seconds of the generic and specialized loops
+        for each kernel.
+    """
+    prisms = cp.prism_layer_rectangular(
+        (-3000, 3000, -3000, 3000), shape, 1100, 1000
+    )
+    np.random.seed(0)
+    pressure = -10*np.random.rand(1, prisms.shape[0])
+    side = int(np.ceil(np.sqrt(n_points)))
+    y, x = np.meshgrid(
+        np.linspace(-5000, 5000, side), np.linspace(-5000, 5000, side)
+    )
+    coordinates = (
+        y.ravel()[:n_points], x.ravel()[:n_points], np.zeros(n_points)
+    )
+    out = np.zeros((1, n_points))
+    times = {}
+    for name, kernel in cp.KERNELS.items():
+        serial = cp.SPECIALIZED_LOOPS[name][0]
+        # Compile both loops
+        cp.jit_field_component(
+            coordinates, prisms[:1], pressure[:, :1], kernel, out
+        )
+        serial(coordinates, prisms[:1], pressure[:, :1], out)
+        times[name] = (
+            best_time(
+                cp.jit_field_component, coordinates, prisms, pressure,
+                kernel, out, repeat=repeat
+            ),
+            best_time(
+                serial, coordinates, prisms, pressure, out, repeat=repeat
+            ),
+        )
+    return times
+
+
+def cold_start_benchmark(repeat=3):
+    """
+    Wall time of the first call of ``compaction.displacement_z_component``
+    in new Python processes.
+
+    The first process may compile the loops and write them to the on-disk
+    cache of Numba. The following processes load them from the cache (or
+    from the extension built by ``build_aot.py``, if present). The target
+    for these is ``COLD_START_TARGET`` seconds.
+
+    Parameters
+    ----------
+    repeat : int (optional)
+        Number of new processes. Default to 3.
+
+    Returns
+    -------
+    times : list
+        Wall time in seconds of the first call in each process.
+    """
+    directory = os.path.dirname(os.path.abspath(cp.__file__))
+    times = []
+    for i in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _COLD_START_SCRIPT], cwd=directory,
+            check=True, capture_output=True, text=True
+        ).stdout
+        times.append(float(output.split()[-1]))
+    return times
+
+
+def _vertical_section(y_min, y_max, x, z_max, shape):
+    """
+    Computation points on a vertical section with constant ``x``, as in the
+    notebooks.
+    """
+    y, z = np.meshgrid(
+        np.linspace(y_min, y_max, shape[0]), np.linspace(0, z_max, shape[1])
+    )
+    return np.vstack([y.ravel(), np.full(y.size, x), z.ravel()])
+
+
+def _test_1():
+    """
+    Disk-shaped reservoir of the notebook Test_1.
+    """
+    prisms = cp.prism_layer_circular((0, 0), 500, (20, 20), 850, 750)
+    return {
+        "coordinates": _vertical_section(-1500, 1500, 0, 1200, (120, 24)),
+        "prisms": prisms,
+        "pressure": np.full(prisms.shape[0], -10.0),
+        "disk": [0, 0, 800, 500, 100],
+    }
+
+
+def _test_2():
+    """
+    Two vertically juxtaposed cylinders of the notebook Test_2.
+    """
+    shallowest = cp.prism_layer_circular((0, 0), 500, (20, 20), 800, 750)
+    deepest = cp.prism_layer_circular((0, 0), 500, (20, 20), 850, 800)
+    return {
+        "coordinates": _vertical_section(-1500, 1500, 0, 1200, (120, 24)),
+        "prisms": np.vstack([shallowest, deepest]),
+        "pressure": np.hstack([
+            np.full(shallowest.shape[0], -40.0),
+            np.full(deepest.shape[0], -20.0)
+        ]),
+        "disk": None,
+    }
+
+
+def _test_3():
+    """
+    Realistic reservoir of the notebook Test_3 (``realistic_model.pickle``).
+    """
+    directory = os.path.dirname(os.path.abspath(cp.__file__))
+    with open(os.path.join(directory, "realistic_model.pickle"), "rb") as f:
+        model = pickle.load(f, encoding="bytes")
+    return {
+        "coordinates": _vertical_section(0, 13000, 8000, 4000, (100, 80)),
+        "prisms": np.asarray(model[b"model"], dtype=float),
+        "pressure": np.asarray(model[b"DP"], dtype=float).ravel(),
+        "disk": None,
+    }
+
+
+def _cylinder(side, n_points):
+    """
+    Disk-shaped reservoir of Test_1 with ``side`` prisms along ``y`` and
+    ``x`` and ``n_points`` computation points on the surface.
+    """
+    prisms = cp.prism_layer_circular((0, 0), 500, (side, side), 850, 750)
+    n = int(np.ceil(np.sqrt(n_points)))
+    y, x = np.meshgrid(
+        np.linspace(-1500, 1500, n), np.linspace(-1500, 1500, n)
+    )
+    return {
+        "coordinates": np.vstack([
+            y.ravel()[:n_points], x.ravel()[:n_points], np.zeros(n_points)
+        ]),
+        "prisms": prisms,
+        "pressure": np.full(prisms.shape[0], -10.0),
+        "disk": [0, 0, 800, 500, 100],
+    }
+
+
+def workloads():
+    """
+    Workloads of the benchmark suite.
+
+    Returns
+    -------
+    workloads : dict
+        Functions without arguments building each workload. A workload is a
+        dictionary with the ``coordinates`` of the computation points, the
+        ``prisms``, their ``pressure`` and the equivalent ``disk`` of
+        ``geertsma_disk`` (or ``None`` if there is none).
+    """
+    builders = {"test_1": _test_1, "test_2": _test_2, "test_3": _test_3}
+    for side, n_points in SCALES:
+        builders["cylinder_{}x{}_{}".format(side, side, n_points)] = (
+            lambda side=side, n_points=n_points: _cylinder(side, n_points)
+        )
+    return builders
+
+
+def _nucleus_displacement(coordinates, nuclei, pressure, poisson, young):
+    """
+    x, y and z components of the displacement field of nuclei of strain.
+    """
+    import geertsma_nucleus_strain as nucleus
+    return tuple(
+        function(coordinates, nuclei, pressure, poisson, young)
+        for function in (
+            nucleus.displacement_x_component,
+            nucleus.displacement_y_component,
+            nucleus.displacement_z_component,
+        )
+    )
+
+
+def _case(engine, workload):
+    """
+    Function, arguments and number of kernel evaluations of an engine on a
+    workload.
+
+    A kernel evaluation is the evaluation of a single kernel at a corner of a
+    prism (``compaction``), at a nucleus of strain
+    (``geertsma_nucleus_strain``) or of all the elliptic integrals of the
+    disk (``geertsma_disk``) for a computation point.
+
+    Returns
+    -------
+    case : tuple or None
+        ``None`` if the engine can't compute the workload (e.g.,
+        ``geertsma_disk`` on a model that is not a disk).
+    """
+    coordinates = workload["coordinates"]
+    prisms = workload["prisms"]
+    pressure = workload["pressure"]
+    n_points = coordinates.shape[1]
+    if engine in ("compaction_displacement", "compaction_stress"):
+        function = {
+            "compaction_displacement": cp.displacement_components,
+            "compaction_stress": cp.stress_components,
+        }[engine]
+        return (
+            function, (coordinates, prisms, pressure, POISSON, YOUNG),
+            9*8*n_points*prisms.shape[0]
+        )
+    if engine in ("disk_displacement", "disk_stress"):
+        if workload["disk"] is None:
+            return None
+        function = {
+            "disk_displacement": disk.Geertsma_disk_displacement,
+            "disk_stress": disk.Geertsma_disk_stress,
+        }[engine]
+        return (
+            function,
+            (coordinates, workload["disk"], pressure[0], POISSON, YOUNG),
+            n_points
+        )
+    if engine == "nucleus_displacement":
+        # The nuclei are at the centers of the prisms and have the same
+        # pressure
+        if np.any(pressure != pressure[0]):
+            return None
+        nuclei = np.column_stack([
+            0.5*(prisms[:, 0] + prisms[:, 1]),
+            0.5*(prisms[:, 2] + prisms[:, 3]),
+            0.5*(prisms[:, 4] + prisms[:, 5]),
+        ])
+        return (
+            _nucleus_displacement,
+            (coordinates, nuclei, pressure[0], POISSON, YOUNG),
+            9*n_points*nuclei.shape[0]
+        )
+    raise ValueError("Engine {} not recognized".format(engine))
+
+
+# Engines timed by the suite (see _case)
+ENGINES = (
+    "compaction_displacement",
+    "compaction_stress",
+    "disk_displacement",
+    "disk_stress",
+    "nucleus_displacement",
+)
+
+
+def time_case(engine, workload, repeat=3):
+    """
+    Cold and warm wall times of an engine on a workload.
+
+    The cold time is that of the first call in the current process. It
+    includes the import of Numba or SciPy and the compilation of the jitted
+    loops (or their loading from the on-disk cache). The warm time is the
+    smallest wall time of the following calls.
+
+    Parameters
+    ----------
+    engine : str
+        Name of the engine (see ``ENGINES``).
+    workload : str
+        Name of the workload (see ``workloads``).
+    repeat : int (optional)
+        Number of warm calls. Default to 3.
+
+    Returns
+    -------
+    record : dict or None
+        Sizes of the workload, number of kernel evaluations, cold and warm
+        times in seconds and throughput in kernel evaluations per second.
+        ``None`` if the engine can't compute the workload.
+    """
+    data = workloads()[workload]()
+    case = _case(engine, data)
+    if case is None:
+        return None
+    function, args, evaluations = case
+    start = time.perf_counter()
+    function(*args)
+    cold = time.perf_counter() - start
+    warm = best_time(function, *args, repeat=repeat)
+    return {
+        "engine": engine,
+        "workload": workload,
+        "n_points": data["coordinates"].shape[1],
+        "n_prisms": data["prisms"].shape[0],
+        "evaluations": evaluations,
+        "cold": cold,
+        "warm": warm,
+        "throughput": evaluations/warm,
+    }
+
+
+def run_suite(repeat=3, new_process=True):
+    """
+    Time all the engines on all the workloads.
+
+    Parameters
+    ----------
+    repeat : int (optional)
+        Number of warm calls of each case. Default to 3.
+    new_process : bool (optional)
+        If ``True``, each case is timed in a new Python process, so the cold
+        times do not depend on the previous cases. Default to ``True``.
+
+    Returns
+    -------
+    results : list
+        Records of the cases (see ``time_case``).
+    """
+    directory = os.path.dirname(os.path.abspath(cp.__file__))
+    results = []
+    for workload in workloads():
+        for engine in ENGINES:
+            if new_process:
+                output = subprocess.run(
+                    [
+                        sys.executable, "-c",
+                        _CASE_SCRIPT.format(engine, workload, repeat)
+                    ],
+                    cwd=directory, check=True, capture_output=True, text=True
+                ).stdout
+                record = json.loads(output.splitlines()[-1])
+            else:
+                record = time_case(engine, workload, repeat=repeat)
+            if record is not None:
+                results.append(record)
+    return results
+
+
+def environment():
+    """
+    Description of the machine and of the versions of the dependencies.
+    """
+    import numba
+    import scipy
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, capture_output=True,
+            text=True, cwd=os.path.dirname(os.path.abspath(cp.__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numba_threads": numba.config.NUMBA_NUM_THREADS,
+    }
+
+
+def save_results(results, filename):
+    """
+    Save the results of the suite and the environment in a JSON file.
+    """
+    with open(filename, "w") as f:
+        json.dump(
+            {"environment": environment(), "results": results}, f, indent=2
+        )
+
+
+def load_results(filename):
+    """
+    Load the results of the suite saved by ``save_results``.
+    """
+    with open(filename) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(reference, results):
+    """
+    Ratio of the warm times of a reference (e.g., a previous release) to
+    those of new results.
+
+    Parameters
+    ----------
+    reference, results : list
+        Records of the suite (see ``run_suite`` and ``load_results``).
+
+    Returns
+    -------
+    speedups : dict
+        Speedup of each case present in both results, with keys
+        ``(engine, workload)``. Values greater than 1 mean that the new
+        results are faster.
+    """
+    reference = {
+        (record["engine"], record["workload"]): record for record in reference
+    }
+    speedups = {}
+    for record in results:
+        key = (record["engine"], record["workload"])
+        if key in reference:
+            speedups[key] = reference[key]["warm"]/record["warm"]
+    return speedups
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of the forward models."
+    )
+    parser.add_argument(
+        "--output", default="benchmark_results.json",
+        help="JSON file where the results of the suite are saved"
+    )
+    parser.add_argument(
+        "--reference", default=None,
+        help="JSON file of previous results to compare with"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="number of warm calls"
+    )
+    arguments = parser.parse_args()
+
+    times = cold_start_benchmark()
+    print("First call of displacement_z_component (seconds)")
+    print("first process: {:.3f}".format(times[0]))
+    print("next processes: {:.3f} (target {:.1f})".format(
+        min(times[1:]), COLD_START_TARGET
+    ))
+
+    print("Kernel dispatch (seconds)")
+    print("{:>8} {:>10} {:>12} {:>8}".format(
+        "kernel", "generic", "specialized", "speedup"
+    ))
+    for name, (generic, specialized) in dispatch_benchmark().items():
+        print("{:>8} {:10.4f} {:12.4f} {:8.2f}".format(
+            name, generic, specialized, generic/specialized
+        ))
+
+    results = run_suite(repeat=arguments.repeat)
+    speedups = {}
+    if arguments.reference is not None:
+        speedups = compare_results(
+            load_results(arguments.reference), results
+        )
+    print("Forward engines (seconds, kernel evaluations per second)")
+    print("{:>24} {:>22} {:>9} {:>9} {:>10} {:>8}".format(
+        "engine", "workload", "cold", "warm", "throughput", "speedup"
+    ))
+    for record in results:
+        speedup = speedups.get((record["engine"], record["workload"]))
+        print("{:>24} {:>22} {:9.4f} {:9.4f} {:10.3e} {:>8}".format(
+            record["engine"], record["workload"], record["cold"],
+            record["warm"], record["throughput"],
+            "" if speedup is None else "{:.2f}".format(speedup)
+        ))
+    save_results(results, arguments.output)
+    print("Results saved in {}".format(arguments.output))
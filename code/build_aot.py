@@ -0,0 +1,56 @@
+"""
+Ahead-of-time compilation of the loops of ``compaction.field_component``.
+
+Run this module from the ``code`` directory to build the extension module
+``compaction_aot`` next to ``compaction.py``::
+
+    python build_aot.py
+
+When the extension can be imported, ``compaction.field_component`` uses its
+serial loops instead of compiling them with Numba at run time. The parallel
+loops are still compiled by Numba (and cached on disk). The extension must
+be rebuilt whenever the kernels change.
+
+``numba.pycc`` is deprecated by Numba and will be removed. Without it, the
+loops are compiled once and then loaded from Numba's on-disk cache.
+"""
+
+from numba.pycc import CC
+import compaction_jit as cj
+
+
+# Signature of the specialized loops (see
+# compaction_jit._specialized_loops_source)
+SIGNATURE = "void(UniTuple(f8[::1], 3), f8[:, ::1], f8[:, ::1], f8[:, ::1])"
+
+
+def build(output_dir=".", name="compaction_aot"):
+    """
+    Compile the serial loops of ``field_component`` of all the kernels into
+    an extension module.
+
+    Parameters
+    ----------
+    output_dir : str (optional)
+        Directory where the extension module is written. Default to the
+        current directory.
+    name : str (optional)
+        Name of the extension module. Default to ``compaction_aot``.
+
+    Returns
+    -------
+    filename : str
+        Name of the extension module file.
+    """
+    cc = CC(name)
+    cc.output_dir = output_dir
+    cc.verbose = False
+    for kernel in cj.KERNELS:
+        loop = cj.SPECIALIZED_LOOPS[kernel][0].py_func
+        cc.export("field_component_" + kernel, SIGNATURE)(loop)
+    cc.compile()
+    return cc.output_file
+
+
+if __name__ == "__main__":
+    print(build())
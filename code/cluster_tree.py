@@ -0,0 +1,412 @@
+"""
+Forward modelling of elastic reservoir deformation produced by large models
+of prisms by grouping distant prisms into aggregated sources (Barnes and
+Hut, 1986).
+
+The prisms are organized in an octree built on their centers. For each
+computation point the tree is traversed from the root: a node whose size is
+small compared with its distance to the computation point is replaced by a
+single source located at the volume-weighted centroid of its prisms,
+carrying the monopole (sum of pressure times volume) and the dipole moments
+of its prisms. The remaining nodes are opened and, at the leaves, the prisms
+are computed with the exact kernels. The cost per computation point grows
+with the logarithm of the number of prisms, instead of linearly.
+
+The accuracy is controlled by the opening angle ``theta``: a node with
+diagonal ``D`` at distance ``R`` from the computation point (or from its
+image, for the kernels of the 2nd system) is replaced only if
+``D < theta*R``. The truncation error of the monopole and dipole expansion
+is of the order of ``theta**2`` relative to the field of the node. For
+models of a few layers and computation points near the reservoir, the
+maximum error relative to the largest value of the field is typically below
+0.1% for ``theta = 0.2`` and a few percent for ``theta = 0.5``. With
+``theta = 0`` all the prisms are computed exactly.
+
+References
+----------
+
+Barnes, J. and Hut, P. (1986). A hierarchical O(N log N) force-calculation
+algorithm. Nature 324: 446. doi:10.1038/324446a0
+
+"""
+
+import numpy as np
+from numba import njit, prange
+import compaction as cp
+
+
+def field_component(
+    coordinates, prisms, pressure, poisson, young, kernel, theta=0.5,
+    leaf_size=16, dtype="float64", disable_checks=False, parallel=None,
+    n_threads=None
+):
+    """
+    Displacement and stress components produced by pore-pressure variations in
+    right-rectangular prisms computed with a cluster tree.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+    kernel : str
+        Kernel used for computing the desired field component. See
+        ``compaction.field_component`` for the available kernels.
+    theta : float (optional)
+        Opening angle, in the interval [0, 1). Smaller values are more
+        accurate and slower. If 0, the result is equal to that obtained with
+        ``compaction.field_component``. Default to 0.5.
+    leaf_size : int (optional)
+        Maximum number of prisms in the leaves of the tree. Default to 16.
+    dtype : data-type (optional)
+        Data type assigned to the resulting field component. Default to
+        ``np.float64``.
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    parallel : bool or None (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. If ``None``, the global setting defined by
+        ``compaction.set_parallel`` is used. Default to ``None``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. If ``None``, the
+        global setting defined by ``compaction.set_parallel`` is used.
+        Default to ``None``.
+
+    Returns
+    -------
+    result : array
+        Field component generated by the prisms at the computation points.
+    """
+    return _sub_kernel_fields(
+        coordinates, prisms, pressure, poisson, young, (kernel,), theta,
+        leaf_size, dtype, disable_checks, parallel, n_threads
+    )[0]
+
+
+def displacement_components(
+    coordinates, prisms, pressure, poisson, young, theta=0.5, leaf_size=16,
+    dtype="float64", disable_checks=False, parallel=None, n_threads=None
+):
+    """
+    x, y and z components of the displacement field computed with a cluster
+    tree.
+
+    See ``field_component`` for a description of the parameters.
+
+    Returns
+    -------
+    d_x, d_y, d_z : arrays
+        x, y and z components of the displacement field generated by the
+        prisms at the computation points.
+    """
+    fields = _sub_kernel_fields(
+        coordinates, prisms, pressure, poisson, young,
+        ("d_x1", "d_x2", "d_xz2", "d_y1", "d_y2", "d_yz2", "d_z1", "d_z2",
+         "d_zz2"),
+        theta, leaf_size, dtype, disable_checks, parallel, n_threads
+    )
+    d_x1, d_x2, d_xz2, d_y1, d_y2, d_yz2, d_z1, d_z2, d_zz2 = fields
+    d_x = d_x1 + (3 - 4*poisson)*d_x2 + d_xz2
+    d_y = d_y1 + (3 - 4*poisson)*d_y2 + d_yz2
+    d_z = d_z1 - (3 - 4*poisson)*d_z2 + d_zz2
+    return d_x, d_y, d_z
+
+
+def stress_components(
+    coordinates, prisms, pressure, poisson, young, theta=0.5, leaf_size=16,
+    dtype="float64", disable_checks=False, parallel=None, n_threads=None
+):
+    """
+    x, y and z components of the stress field computed with a cluster tree.
+
+    See ``field_component`` for a description of the parameters.
+
+    Returns
+    -------
+    s_x, s_y, s_z : arrays
+        x, y and z components of the stress field generated by the prisms at
+        the computation points.
+    """
+    fields = _sub_kernel_fields(
+        coordinates, prisms, pressure, poisson, young,
+        ("s_xz1", "s_xz2", "s_xzz2", "s_yz1", "s_yz2", "s_yzz2", "s_zz1",
+         "s_zz2", "s_zzz2"),
+        theta, leaf_size, dtype, disable_checks, parallel, n_threads
+    )
+    s_xz1, s_xz2, s_xzz2, s_yz1, s_yz2, s_yzz2, s_zz1, s_zz2, s_zzz2 = fields
+    s_x = s_xz1 + s_xzz2 + s_xz2
+    s_y = s_yz1 + s_yzz2 + s_yz2
+    s_z = s_zz1 + s_zzz2 - s_zz2
+    s_x *= young/(1 + poisson)
+    s_y *= young/(1 + poisson)
+    s_z *= young/(1 + poisson)
+    return s_x, s_y, s_z
+
+
+def _sub_kernel_fields(
+    coordinates, prisms, pressure, poisson, young, kernels, theta, leaf_size,
+    dtype, disable_checks, parallel, n_threads
+):
+    """
+    Compute the fields produced by a sequence of kernels, building the tree
+    only once.
+    """
+    for kernel in kernels:
+        if kernel not in cp.KERNELS:
+            raise ValueError("Kernel {} not recognized".format(kernel))
+    if not 0 <= theta < 1:
+        raise ValueError(
+            "Invalid opening angle ({}). ".format(theta)
+            + "It must be in the interval [0, 1)."
+        )
+    shape, coordinates, prisms, pressure = cp._prepare_arguments(
+        coordinates, prisms, pressure, disable_checks
+    )
+    tree = build_tree(prisms, pressure, leaf_size)
+    fields = []
+    for kernel in kernels:
+        result = np.zeros(
+            (pressure.shape[0], coordinates[0].size), dtype=dtype
+        )
+        cp._run_loop(
+            jit_tree_field_component, jit_tree_field_component_parallel,
+            parallel, n_threads, coordinates, *tree, cp.KERNELS[kernel],
+            cp.POINT_KERNELS[kernel], kernel.endswith("2"), theta**2, result
+        )
+        result *= -cp.Cm(poisson, young)/(4*np.pi)
+        fields.append(result.reshape(shape))
+    return fields
+
+
+def build_tree(prisms, pressure, leaf_size=16):
+    """
+    Octree of prisms with the moments of each node.
+
+    The nodes are split at the middle of the bounding box of the centers of
+    their prisms, until they have at most ``leaf_size`` prisms. The prisms
+    are sorted so that the prisms of each node are contiguous.
+
+    Parameters
+    ----------
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 2d-array
+        2d array with shape (``n_steps``, ``n_prisms``) containing the
+        pressure of each prism in MPa.
+    leaf_size : int (optional)
+        Maximum number of prisms in the leaves of the tree. Default to 16.
+
+    Returns
+    -------
+    prisms : 2d-array
+        Sorted prisms.
+    pressure : 2d-array
+        Pressure of the sorted prisms.
+    nodes : 2d-array
+        Integer array with shape (``n_nodes``, 4). Each line contains the
+        indices of the first and one past the last prisms of the node, the
+        index of its first child and its number of children. The children
+        of a node are contiguous and the root is the first node.
+    centers : 2d-array
+        Array with shape (``n_nodes``, 4). Each line contains the ``y``,
+        ``x`` and ``z`` coordinates of the volume-weighted centroid of the
+        node and the square of the diagonal of its bounding box.
+    monopoles : 2d-array
+        Array with shape (``n_steps``, ``n_nodes``) containing the sum of
+        the pressure times the volume of the prisms of each node.
+    dipoles : 3d-array
+        Array with shape (``n_steps``, ``n_nodes``, 3) containing the
+        dipole moments of each node with respect to its centroid.
+    depth : int
+        Number of levels of the tree.
+    """
+    if leaf_size < 1:
+        raise ValueError(
+            "Invalid leaf size ({}). It must be positive.".format(leaf_size)
+        )
+    prisms = np.atleast_2d(prisms)
+    pressure = np.atleast_2d(pressure)
+    centers = np.stack([
+        0.5*(prisms[:, 0] + prisms[:, 1]),
+        0.5*(prisms[:, 2] + prisms[:, 3]),
+        0.5*(prisms[:, 4] + prisms[:, 5]),
+    ], axis=1)
+    order = np.arange(prisms.shape[0])
+    # Split the nodes level by level, so that the children are contiguous
+    nodes = [[0, prisms.shape[0], 0, 0]]
+    level = [0]
+    depth = 1
+    while level:
+        next_level = []
+        for index in level:
+            start, stop = nodes[index][:2]
+            if stop - start <= leaf_size:
+                continue
+            node_centers = centers[order[start:stop]]
+            lower = node_centers.min(axis=0)
+            upper = node_centers.max(axis=0)
+            if np.all(upper == lower):
+                continue
+            middle = 0.5*(lower + upper)
+            octant = (
+                4*(node_centers[:, 0] > middle[0])
+                + 2*(node_centers[:, 1] > middle[1])
+                + (node_centers[:, 2] > middle[2])
+            )
+            sorting = np.argsort(octant, kind="stable")
+            order[start:stop] = order[start:stop][sorting]
+            counts = np.bincount(octant, minlength=8)
+            nodes[index][2] = len(nodes)
+            for count in counts[counts > 0]:
+                next_level.append(len(nodes))
+                nodes.append([start, start + count, 0, 0])
+                nodes[index][3] += 1
+                start += count
+        if next_level:
+            depth += 1
+        level = next_level
+    nodes = np.array(nodes, dtype=np.int64)
+    prisms = np.ascontiguousarray(prisms[order])
+    pressure = np.ascontiguousarray(pressure[:, order])
+    centers = centers[order]
+    volumes = (
+        (prisms[:, 1] - prisms[:, 0])
+        * (prisms[:, 3] - prisms[:, 2])
+        * (prisms[:, 4] - prisms[:, 5])
+    )
+    weights = pressure*volumes
+    node_centers = np.empty((nodes.shape[0], 4))
+    monopoles = np.empty((pressure.shape[0], nodes.shape[0]))
+    dipoles = np.empty((pressure.shape[0], nodes.shape[0], 3))
+    for index, (start, stop) in enumerate(nodes[:, :2]):
+        volume = volumes[start:stop]
+        centroid = volume @ centers[start:stop] / volume.sum()
+        lower = prisms[start:stop, [0, 2, 5]].min(axis=0)
+        upper = prisms[start:stop, [1, 3, 4]].max(axis=0)
+        node_centers[index, :3] = centroid
+        node_centers[index, 3] = np.sum((upper - lower)**2)
+        monopoles[:, index] = weights[:, start:stop].sum(axis=1)
+        dipoles[:, index] = weights[:, start:stop] @ (
+            centers[start:stop] - centroid
+        )
+    return prisms, pressure, nodes, node_centers, monopoles, dipoles, depth
+
+
+def _tree_field_component_loop(
+    coordinates, prisms, pressure, nodes, centers, monopoles, dipoles, depth,
+    kernel, point_kernel, image, theta2, out
+):
+    """
+    Compute the field component at the computation points traversing the
+    tree of prisms
+
+    Parameters
+    ----------
+    coordinates : 1d array
+        1d array containing ``y``, ``x`` and ``z`` Cartesian coordinates of the
+        computation points (in meters).
+    prisms, pressure, nodes, centers, monopoles, dipoles, depth
+        Tree of prisms (see ``build_tree``).
+    kernel : func
+        Kernel function to be used for computing the desired field component.
+    point_kernel : func
+        Point-source approximation of ``kernel``.
+    image : bool
+        Whether the kernel belongs to the 2nd system.
+    theta2 : float
+        Square of the opening angle.
+    out : 2d-array
+        Array with shape (n_steps, n_points) where the resulting field
+        component values will be stored.
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        # The stack holds at most 7 siblings per level and the current node
+        stack = np.empty(7 * depth + 1, dtype=np.int64)
+        stack[0] = 0
+        size = 1
+        # The contributions of the point are added in double precision
+        total = np.zeros(pressure.shape[0])
+        while size > 0:
+            size -= 1
+            node = stack[size]
+            c_y = centers[node, 0]
+            c_x = centers[node, 1]
+            c_z = centers[node, 2]
+            if image:
+                distance = (yp - c_y)**2 + (xp - c_x)**2 + (zp + c_z)**2
+            else:
+                distance = (yp - c_y)**2 + (xp - c_x)**2 + (zp - c_z)**2
+            if centers[node, 3] < theta2 * distance:
+                # Monopole and dipole (central differences) of the node
+                h = 1e-3 * np.sqrt(distance)
+                value = point_kernel(c_y, c_x, c_z, c_z, yp, xp, zp)
+                g_y = (
+                    point_kernel(c_y + h, c_x, c_z, c_z, yp, xp, zp)
+                    - point_kernel(c_y - h, c_x, c_z, c_z, yp, xp, zp)
+                ) / (2 * h)
+                g_x = (
+                    point_kernel(c_y, c_x + h, c_z, c_z, yp, xp, zp)
+                    - point_kernel(c_y, c_x - h, c_z, c_z, yp, xp, zp)
+                ) / (2 * h)
+                g_z = (
+                    point_kernel(c_y, c_x, c_z + h, c_z + h, yp, xp, zp)
+                    - point_kernel(c_y, c_x, c_z - h, c_z - h, yp, xp, zp)
+                ) / (2 * h)
+                for t in range(pressure.shape[0]):
+                    total[t] += (
+                        monopoles[t, node] * value
+                        + dipoles[t, node, 0] * g_y
+                        + dipoles[t, node, 1] * g_x
+                        + dipoles[t, node, 2] * g_z
+                    )
+            elif nodes[node, 3] == 0:
+                # Leaf: exact kernels
+                for m in range(nodes[node, 0], nodes[node, 1]):
+                    c_z = 0.5 * (prisms[m, 4] + prisms[m, 5])
+                    value = 0.0
+                    for i in range(2):
+                        for j in range(2):
+                            for k in range(2):
+                                value += (-1) ** (i + j + k) * kernel(
+                                    prisms[m, 1 - i],
+                                    prisms[m, 3 - j],
+                                    prisms[m, 5 - k],
+                                    c_z,
+                                    yp,
+                                    xp,
+                                    zp
+                                )
+                    for t in range(pressure.shape[0]):
+                        total[t] += pressure[t, m] * value
+            else:
+                first = nodes[node, 2]
+                for child in range(first, first + nodes[node, 3]):
+                    stack[size] = child
+                    size += 1
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_tree_field_component = njit(cache=True)(_tree_field_component_loop)
+jit_tree_field_component_parallel = njit(parallel=True, cache=True)(
+    _tree_field_component_loop
+)
@@ -43,11 +43,33 @@ modeling, inversion, and processing gravity and magnetic data
 
 """
 
+import hashlib
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
 import numpy as np
-from numba import njit
 
+# Global execution mode of the jitted loops (see set_parallel)
+_PARALLEL = {"parallel": False, "n_threads": None}
 
-def displacement_x_component(coordinates, prisms, pressure, poisson, young):
+# Opt-in profiling of the jitted loops (see set_profiling)
+_PROFILE = {"enabled": False, "tracemalloc": False, "report": None}
+
+# Opt-in on-disk cache of the results of field_component (see set_cache)
+_CACHE = {
+    "directory": None, "max_bytes": 2**30, "hits": 0, "misses": 0,
+    "evictions": 0
+}
+
+# Version of the cached results, included in their hashes. It must be
+# increased whenever a change of the kernels or loops changes the results.
+_CACHE_VERSION = 1
+
+
+def displacement_x_component(
+    coordinates, prisms, pressure, poisson, young, tolerance=None
+):
     """
     x-component of the displacement field.
 
@@ -60,12 +82,19 @@ def displacement_x_component(coordinates, prisms, pressure, poisson, young):
         2d array containing the Cartesian coordinates of the prism(s). Each
         line contains the coordinates of a prism in following order: y1, y2,
         x1, x2, z2 and z1. All coordinates should be in meters.
-    pressure : 1d array
-        1d array containing the pressure of each prism in MPa.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
     poisson : float
         Poisson’s ratio.
     young : float
         Young’s modulus in MPa.
+    tolerance : float or None (optional)
+        If not ``None``, distant prisms are replaced by point sources with
+        this target relative error (see ``field_component``).
+        Default to ``None``.
 
     Returns
     -------
@@ -74,15 +103,18 @@ def displacement_x_component(coordinates, prisms, pressure, poisson, young):
         computation points.
     """
     d_x1  = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_x1'
+        coordinates, prisms, pressure, poisson, young, kernel='d_x1',
+        tolerance=tolerance
     )
 
     d_x2  = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_x2'
+        coordinates, prisms, pressure, poisson, young, kernel='d_x2',
+        tolerance=tolerance
     )
 
     d_xz2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_xz2'
+        coordinates, prisms, pressure, poisson, young, kernel='d_xz2',
+        tolerance=tolerance
     )
 
     result = d_x1 + (3 - 4*poisson)*d_x2 + d_xz2
@@ -90,7 +122,9 @@ def displacement_x_component(coordinates, prisms, pressure, poisson, young):
     return result
 
 
-def displacement_y_component(coordinates, prisms, pressure, poisson, young):
+def displacement_y_component(
+    coordinates, prisms, pressure, poisson, young, tolerance=None
+):
     """
     y-component of the displacement field.
 
@@ -103,12 +137,19 @@ def displacement_y_component(coordinates, prisms, pressure, poisson, young):
         2d array containing the Cartesian coordinates of the prism(s). Each
         line contains the coordinates of a prism in following order: y1, y2,
         x1, x2, z2 and z1. All coordinates should be in meters.
-    pressure : 1d array
-        1d array containing the pressure of each prism in MPa.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
     poisson : float
         Poisson’s ratio.
     young : float
         Young’s modulus in MPa.
+    tolerance : float or None (optional)
+        If not ``None``, distant prisms are replaced by point sources with
+        this target relative error (see ``field_component``).
+        Default to ``None``.
 
     Returns
     -------
@@ -117,15 +158,18 @@ def displacement_y_component(coordinates, prisms, pressure, poisson, young):
         computation points.
     """
     d_y1 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_y1'
+        coordinates, prisms, pressure, poisson, young, kernel='d_y1',
+        tolerance=tolerance
     )
 
     d_y2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_y2'
+        coordinates, prisms, pressure, poisson, young, kernel='d_y2',
+        tolerance=tolerance
     )
 
     d_yz2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_yz2'
+        coordinates, prisms, pressure, poisson, young, kernel='d_yz2',
+        tolerance=tolerance
     )
 
     result = d_y1 + (3 - 4*poisson)*d_y2 + d_yz2
@@ -133,7 +177,9 @@ def displacement_y_component(coordinates, prisms, pressure, poisson, young):
     return result
 
 
-def displacement_z_component(coordinates, prisms, pressure, poisson, young):
+def displacement_z_component(
+    coordinates, prisms, pressure, poisson, young, tolerance=None
+):
     """
     z-component of the displacement field.
 
@@ -146,12 +192,19 @@ def displacement_z_component(coordinates, prisms, pressure, poisson, young):
         2d array containing the Cartesian coordinates of the prism(s). Each
         line contains the coordinates of a prism in following order: y1, y2,
         x1, x2, z2 and z1. All coordinates should be in meters.
-    pressure : 1d array
-        1d array containing the pressure of each prism in MPa.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
     poisson : float
         Poisson’s ratio.
     young : float
         Young’s modulus in MPa.
+    tolerance : float or None (optional)
+        If not ``None``, distant prisms are replaced by point sources with
+        this target relative error (see ``field_component``).
+        Default to ``None``.
 
     Returns
     -------
@@ -160,15 +213,18 @@ def displacement_z_component(coordinates, prisms, pressure, poisson, young):
         computation points.
     """
     d_z1 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_z1'
+        coordinates, prisms, pressure, poisson, young, kernel='d_z1',
+        tolerance=tolerance
     )
 
     d_z2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_z2'
+        coordinates, prisms, pressure, poisson, young, kernel='d_z2',
+        tolerance=tolerance
     )
 
     d_zz2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='d_zz2'
+        coordinates, prisms, pressure, poisson, young, kernel='d_zz2',
+        tolerance=tolerance
     )
 
     result = d_z1 - (3 - 4*poisson)*d_z2 + d_zz2
@@ -176,7 +232,103 @@ def displacement_z_component(coordinates, prisms, pressure, poisson, young):
     return result
 
 
-def stress_x_component(coordinates, prisms, pressure, poisson, young):
+def displacement_components(
+    coordinates, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None, out=None,
+    block_size=100000, pressure_threshold=0
+):
+    """
+    x, y and z components of the displacement field computed in a single
+    sweep over the prisms.
+
+    The kernels of the 1st and 2nd systems share the terms ``rho``, the
+    logarithms and the arctangents, so they are evaluated once per prism
+    corner and combined into the three components at the same time.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+    dtype : data-type (optional)
+        Data type assigned to the resulting field components. Default to
+        ``np.float64``. The contributions of the prisms are added in double
+        precision (see ``field_component``).
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    parallel : bool or None (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. If ``None``, the global setting defined by ``set_parallel``
+        is used. Default to ``None``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. If ``None``, the
+        global setting defined by ``set_parallel`` is used.
+        Default to ``None``.
+    out : tuple of arrays or None (optional)
+        If not ``None``, three arrays (e.g., ``numpy.memmap``) where the x, y
+        and z components are written. See ``field_component``.
+        Default to ``None``.
+    block_size : int (optional)
+        Number of computation points computed at once when ``out`` is given.
+        Default to 100000.
+    pressure_threshold : float (optional)
+        Relative threshold below which the contributions of the prisms are
+        dropped before the sweep (see ``active_prisms``). The prisms with
+        zero pressure at all time steps are always skipped.
+        Default to 0.
+
+    Returns
+    -------
+    d_x, d_y, d_z : arrays
+        x, y and z components of the displacement field generated by the
+        prisms at the computation points.
+    """
+    if out is not None:
+        return _write_blocks(
+            displacement_components, out, coordinates, prisms, pressure,
+            disable_checks, block_size, poisson, young, dtype=out[0].dtype,
+            parallel=parallel, n_threads=n_threads,
+            pressure_threshold=pressure_threshold
+        )
+    import compaction_jit as jit
+    # Sub-kernel fields in the following order: d_x1, d_x2, d_xz2, d_y1,
+    # d_y2, d_yz2, d_z1, d_z2 and d_zz2
+    shape, fields = _component_fields(
+        jit.jit_displacement_components,
+        jit.jit_displacement_components_parallel, "displacement_components",
+        coordinates, prisms, pressure, dtype, disable_checks, parallel,
+        n_threads, pressure_threshold
+    )
+    with _profile_phase("post_processing"):
+        fields *= -Cm(poisson, young)/(4*np.pi)
+        d_x1, d_x2, d_xz2, d_y1, d_y2, d_yz2, d_z1, d_z2, d_zz2 = fields
+        d_x = d_x1 + (3 - 4*poisson)*d_x2 + d_xz2
+        d_y = d_y1 + (3 - 4*poisson)*d_y2 + d_yz2
+        d_z = d_z1 - (3 - 4*poisson)*d_z2 + d_zz2
+    return (
+        d_x.reshape(shape),
+        d_y.reshape(shape),
+        d_z.reshape(shape)
+    )
+
+
+def stress_x_component(
+    coordinates, prisms, pressure, poisson, young, tolerance=None
+):
     """
     x-component of the stress field.
 
@@ -189,12 +341,19 @@ def stress_x_component(coordinates, prisms, pressure, poisson, young):
         2d array containing the Cartesian coordinates of the prism(s). Each
         line contains the coordinates of a prism in following order: y1, y2,
         x1, x2, z2 and z1. All coordinates should be in meters.
-    pressure : 1d array
-        1d array containing the pressure of each prism in MPa.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
     poisson : float
         Poisson’s ratio.
     young : float
         Young’s modulus in MPa.
+    tolerance : float or None (optional)
+        If not ``None``, distant prisms are replaced by point sources with
+        this target relative error (see ``field_component``).
+        Default to ``None``.
 
     Returns
     -------
@@ -204,15 +363,18 @@ def stress_x_component(coordinates, prisms, pressure, poisson, young):
     """
 
     s_xz1  = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_xz1'
+        coordinates, prisms, pressure, poisson, young, kernel='s_xz1',
+        tolerance=tolerance
     )
 
     s_xz2  = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_xz2'
+        coordinates, prisms, pressure, poisson, young, kernel='s_xz2',
+        tolerance=tolerance
     )
 
     s_xzz2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_xzz2'
+        coordinates, prisms, pressure, poisson, young, kernel='s_xzz2',
+        tolerance=tolerance
     )
 
     result = s_xz1 + s_xzz2 + s_xz2
@@ -221,7 +383,9 @@ def stress_x_component(coordinates, prisms, pressure, poisson, young):
     return result
 
 
-def stress_y_component(coordinates, prisms, pressure, poisson, young):
+def stress_y_component(
+    coordinates, prisms, pressure, poisson, young, tolerance=None
+):
     """
     y-component of the stress field.
 
@@ -234,12 +398,19 @@ def stress_y_component(coordinates, prisms, pressure, poisson, young):
         2d array containing the Cartesian coordinates of the prism(s). Each
         line contains the coordinates of a prism in following order: y1, y2,
         x1, x2, z2 and z1. All coordinates should be in meters.
-    pressure : 1d array
-        1d array containing the pressure of each prism in MPa.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
     poisson : float
         Poisson’s ratio.
     young : float
         Young’s modulus in MPa.
+    tolerance : float or None (optional)
+        If not ``None``, distant prisms are replaced by point sources with
+        this target relative error (see ``field_component``).
+        Default to ``None``.
 
     Returns
     -------
@@ -249,15 +420,18 @@ def stress_y_component(coordinates, prisms, pressure, poisson, young):
     """
 
     s_yz1 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_yz1'
+        coordinates, prisms, pressure, poisson, young, kernel='s_yz1',
+        tolerance=tolerance
     )
 
     s_yz2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_yz2'
+        coordinates, prisms, pressure, poisson, young, kernel='s_yz2',
+        tolerance=tolerance
     )
 
     s_yzz2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_yzz2'
+        coordinates, prisms, pressure, poisson, young, kernel='s_yzz2',
+        tolerance=tolerance
     )
 
     result = s_yz1 + s_yzz2 + s_yz2
@@ -266,7 +440,9 @@ def stress_y_component(coordinates, prisms, pressure, poisson, young):
     return result
 
 
-def stress_z_component(coordinates, prisms, pressure, poisson, young):
+def stress_z_component(
+    coordinates, prisms, pressure, poisson, young, tolerance=None
+):
     """
     z-component of the stress field.
 
@@ -279,12 +455,19 @@ def stress_z_component(coordinates, prisms, pressure, poisson, young):
         2d array containing the Cartesian coordinates of the prism(s). Each
         line contains the coordinates of a prism in following order: y1, y2,
         x1, x2, z2 and z1. All coordinates should be in meters.
-    pressure : 1d array
-        1d array containing the pressure of each prism in MPa.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
     poisson : float
         Poisson’s ratio.
     young : float
         Young’s modulus in MPa.
+    tolerance : float or None (optional)
+        If not ``None``, distant prisms are replaced by point sources with
+        this target relative error (see ``field_component``).
+        Default to ``None``.
 
     Returns
     -------
@@ -294,15 +477,18 @@ def stress_z_component(coordinates, prisms, pressure, poisson, young):
     """
 
     s_zz1 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_zz1'
+        coordinates, prisms, pressure, poisson, young, kernel='s_zz1',
+        tolerance=tolerance
     )
 
     s_zz2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_zz2'
+        coordinates, prisms, pressure, poisson, young, kernel='s_zz2',
+        tolerance=tolerance
     )
 
     s_zzz2 = field_component(
-        coordinates, prisms, pressure, poisson, young, kernel='s_zzz2'
+        coordinates, prisms, pressure, poisson, young, kernel='s_zzz2',
+        tolerance=tolerance
     )
 
     result = s_zz1 + s_zzz2 - s_zz2
@@ -311,14 +497,320 @@ def stress_z_component(coordinates, prisms, pressure, poisson, young):
     return result
 
 
+def stress_components(
+    coordinates, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None, out=None,
+    block_size=100000, pressure_threshold=0
+):
+    """
+    x, y and z components of the stress field computed in a single sweep over
+    the prisms.
+
+    The kernels of the 1st and 2nd systems share the terms ``rho``, the
+    logarithms and the arctangents, so they are evaluated once per prism
+    corner and combined into the three components at the same time.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+    dtype : data-type (optional)
+        Data type assigned to the resulting field components. Default to
+        ``np.float64``. The contributions of the prisms are added in double
+        precision (see ``field_component``).
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    parallel : bool or None (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. If ``None``, the global setting defined by ``set_parallel``
+        is used. Default to ``None``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. If ``None``, the
+        global setting defined by ``set_parallel`` is used.
+        Default to ``None``.
+    out : tuple of arrays or None (optional)
+        If not ``None``, three arrays (e.g., ``numpy.memmap``) where the x, y
+        and z components are written. See ``field_component``.
+        Default to ``None``.
+    block_size : int (optional)
+        Number of computation points computed at once when ``out`` is given.
+        Default to 100000.
+    pressure_threshold : float (optional)
+        Relative threshold below which the contributions of the prisms are
+        dropped before the sweep (see ``active_prisms``). The prisms with
+        zero pressure at all time steps are always skipped.
+        Default to 0.
+
+    Returns
+    -------
+    s_x, s_y, s_z : arrays
+        x, y and z components of the stress field generated by the prisms at
+        the computation points.
+    """
+    if out is not None:
+        return _write_blocks(
+            stress_components, out, coordinates, prisms, pressure,
+            disable_checks, block_size, poisson, young, dtype=out[0].dtype,
+            parallel=parallel, n_threads=n_threads,
+            pressure_threshold=pressure_threshold
+        )
+    import compaction_jit as jit
+    # Sub-kernel fields in the following order: s_xz1, s_xz2, s_xzz2, s_yz1,
+    # s_yz2, s_yzz2, s_zz1, s_zz2 and s_zzz2
+    shape, fields = _component_fields(
+        jit.jit_stress_components, jit.jit_stress_components_parallel,
+        "stress_components", coordinates, prisms, pressure, dtype,
+        disable_checks, parallel, n_threads, pressure_threshold
+    )
+    with _profile_phase("post_processing"):
+        fields *= -Cm(poisson, young)/(4*np.pi)
+        s_xz1, s_xz2, s_xzz2, s_yz1, s_yz2, s_yzz2, s_zz1, s_zz2, s_zzz2 = (
+            fields
+        )
+        s_x = s_xz1 + s_xzz2 + s_xz2
+        s_y = s_yz1 + s_yzz2 + s_yz2
+        s_z = s_zz1 + s_zzz2 - s_zz2
+        s_x *= young/(1 + poisson)
+        s_y *= young/(1 + poisson)
+        s_z *= young/(1 + poisson)
+    return (
+        s_x.reshape(shape),
+        s_y.reshape(shape),
+        s_z.reshape(shape)
+    )
+
+
+def displacement_components_sweep(
+    coordinates, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None,
+    pressure_threshold=0
+):
+    """
+    x, y and z components of the displacement field for many pairs of
+    elastic parameters, computed in a single sweep over the prisms.
+
+    The sub-kernel fields computed by ``displacement_components`` do not
+    depend on the elastic parameters, which only scale and combine them. The
+    fields are computed once and combined for each pair of ``poisson`` and
+    ``young``, so each additional pair costs a few operations per point.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results, after the dimensions
+        of the elastic parameters.
+    poisson : float or array
+        Poisson’s ratios.
+    young : float or array
+        Young’s moduli in MPa. The arrays of ``poisson`` and ``young`` are
+        broadcast against each other to form the pairs of parameters.
+    dtype : data-type (optional)
+        Data type assigned to the resulting field components. Default to
+        ``np.float64``. The contributions of the prisms are added in double
+        precision (see ``field_component``).
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    parallel : bool or None (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. If ``None``, the global setting defined by ``set_parallel``
+        is used. Default to ``None``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. If ``None``, the
+        global setting defined by ``set_parallel`` is used.
+        Default to ``None``.
+    pressure_threshold : float (optional)
+        Relative threshold below which the contributions of the prisms are
+        dropped before the sweep (see ``active_prisms``). The prisms with
+        zero pressure at all time steps are always skipped.
+        Default to 0.
+
+    Returns
+    -------
+    d_x, d_y, d_z : arrays
+        x, y and z components of the displacement field generated by the
+        prisms at the computation points. The first dimensions are those of
+        the broadcast elastic parameters.
+    """
+    poisson, young = np.broadcast_arrays(
+        np.asarray(poisson, dtype=np.float64),
+        np.asarray(young, dtype=np.float64)
+    )
+    import compaction_jit as jit
+    shape, fields = _component_fields(
+        jit.jit_displacement_components,
+        jit.jit_displacement_components_parallel, "displacement_components",
+        coordinates, prisms, pressure, dtype, disable_checks, parallel,
+        n_threads, pressure_threshold
+    )
+    with _profile_phase("post_processing"):
+        scale = (-Cm(poisson, young)/(4*np.pi)).ravel().astype(dtype)
+        factor = scale*(3 - 4*poisson.ravel()).astype(dtype)
+        d_x1, d_x2, d_xz2, d_y1, d_y2, d_yz2, d_z1, d_z2, d_zz2 = fields
+        d_x = np.multiply.outer(scale, d_x1 + d_xz2)
+        d_x += np.multiply.outer(factor, d_x2)
+        d_y = np.multiply.outer(scale, d_y1 + d_yz2)
+        d_y += np.multiply.outer(factor, d_y2)
+        d_z = np.multiply.outer(scale, d_z1 + d_zz2)
+        d_z -= np.multiply.outer(factor, d_z2)
+    return (
+        d_x.reshape(poisson.shape + shape),
+        d_y.reshape(poisson.shape + shape),
+        d_z.reshape(poisson.shape + shape)
+    )
+
+
+def stress_components_sweep(
+    coordinates, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None,
+    pressure_threshold=0
+):
+    """
+    x, y and z components of the stress field for many pairs of elastic
+    parameters, computed in a single sweep over the prisms.
+
+    The sub-kernel fields computed by ``stress_components`` do not depend on
+    the elastic parameters, and each component is their sum scaled by
+    ``-Cm(poisson, young)*young/(4*pi*(1 + poisson))``. The fields are
+    summed once and scaled for each pair of ``poisson`` and ``young``.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results, after the dimensions
+        of the elastic parameters.
+    poisson : float or array
+        Poisson’s ratios.
+    young : float or array
+        Young’s moduli in MPa. The arrays of ``poisson`` and ``young`` are
+        broadcast against each other to form the pairs of parameters.
+    dtype : data-type (optional)
+        Data type assigned to the resulting field components. Default to
+        ``np.float64``. The contributions of the prisms are added in double
+        precision (see ``field_component``).
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    parallel : bool or None (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. If ``None``, the global setting defined by ``set_parallel``
+        is used. Default to ``None``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. If ``None``, the
+        global setting defined by ``set_parallel`` is used.
+        Default to ``None``.
+    pressure_threshold : float (optional)
+        Relative threshold below which the contributions of the prisms are
+        dropped before the sweep (see ``active_prisms``). The prisms with
+        zero pressure at all time steps are always skipped.
+        Default to 0.
+
+    Returns
+    -------
+    s_x, s_y, s_z : arrays
+        x, y and z components of the stress field generated by the prisms at
+        the computation points. The first dimensions are those of the
+        broadcast elastic parameters.
+    """
+    poisson, young = np.broadcast_arrays(
+        np.asarray(poisson, dtype=np.float64),
+        np.asarray(young, dtype=np.float64)
+    )
+    import compaction_jit as jit
+    shape, fields = _component_fields(
+        jit.jit_stress_components, jit.jit_stress_components_parallel,
+        "stress_components", coordinates, prisms, pressure, dtype,
+        disable_checks, parallel, n_threads, pressure_threshold
+    )
+    with _profile_phase("post_processing"):
+        scale = (
+            -Cm(poisson, young)*young/(4*np.pi*(1 + poisson))
+        ).ravel().astype(dtype)
+        s_xz1, s_xz2, s_xzz2, s_yz1, s_yz2, s_yzz2, s_zz1, s_zz2, s_zzz2 = (
+            fields
+        )
+        s_x = np.multiply.outer(scale, s_xz1 + s_xzz2 + s_xz2)
+        s_y = np.multiply.outer(scale, s_yz1 + s_yzz2 + s_yz2)
+        s_z = np.multiply.outer(scale, s_zz1 + s_zzz2 - s_zz2)
+    return (
+        s_x.reshape(poisson.shape + shape),
+        s_y.reshape(poisson.shape + shape),
+        s_z.reshape(poisson.shape + shape)
+    )
+
+
+def _component_fields(
+    serial, parallel_loop, label, coordinates, prisms, pressure, dtype,
+    disable_checks, parallel, n_threads, pressure_threshold
+):
+    """
+    Unscaled sub-kernel fields computed in a single sweep over the prisms by
+    the loops of ``displacement_components`` or ``stress_components``.
+    """
+    shape, coordinates, prisms, pressure = _prepare_arguments(
+        coordinates, prisms, pressure, disable_checks
+    )
+    prisms, pressure = _skip_prisms(prisms, pressure, pressure_threshold)
+    fields = np.zeros(
+        (9, pressure.shape[0], coordinates[0].size), dtype=dtype
+    )
+    _run_loop(
+        serial, parallel_loop, parallel, n_threads, coordinates, prisms,
+        pressure, fields, label=label, points=coordinates[0].size,
+        prisms=prisms.shape[0],
+        evaluations=9*8*coordinates[0].size*prisms.shape[0]
+    )
+    return shape, fields
+
+
 def field_component(
     coordinates, prisms, pressure, poisson, young, kernel, dtype="float64",
-    disable_checks=False
+    disable_checks=False, parallel=None, n_threads=None, tolerance=None,
+    out=None, block_size=100000, pressure_threshold=0
 ):
     """
     Displacement and stress components produced by pore-pressure variations in
     right-rectangular prisms.
 
+    If the cache is enabled (see ``set_cache``) and ``out`` is ``None``, the
+    result is read from the cache when the same component was computed
+    before for the same inputs.
+
     Parameters
     ----------
     coordinates : 2d-array
@@ -328,8 +820,11 @@ def field_component(
         2d array containing the Cartesian coordinates of the prism(s). Each
         line contains the coordinates of a prism in following order: y1, y2,
         x1, x2, z2 and z1. All coordinates should be in meters.
-    pressure : 1d array
-        1d array containing the pressure of each prism in MPa.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
     poisson : float
         Poisson’s ratio.
     young : float
@@ -358,471 +853,812 @@ def field_component(
         -  zz-component of the 2nd system: ``s_zz2``
     dtype : data-type (optional)
         Data type assigned to the resulting field component. Default to
-        ``np.float64``.
+        ``np.float64``. If ``np.float32``, the results are stored in single
+        precision, which halves their memory (e.g., of ``out``) but does not
+        speed up the computation. The kernels are still evaluated in double
+        precision, because their alternating sums over the corners of a
+        prism lose all the significant digits of single precision at
+        distances larger than about 10 times the size of the prism, and the
+        contributions of the prisms are added in double precision. Each
+        result is rounded to single precision before the final scaling, so
+        it differs from the ``np.float64`` result by at most about
+        ``3*u*abs(result)``, where ``u = 2**-24``.
     disable_checks : bool (optional)
         Flag that controls whether to perform a sanity check on the model.
         Should be set to ``True`` only when it is certain that the input model
         is valid and it does not need to be checked.
         Default to ``False``.
+    parallel : bool or None (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. If ``None``, the global setting defined by ``set_parallel``
+        is used. Default to ``None``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. If ``None``, the
+        global setting defined by ``set_parallel`` is used.
+        Default to ``None``.
+    tolerance : float or None (optional)
+        If not ``None``, the prisms that are far enough from a computation
+        point are replaced by point sources (nuclei of strain) located at
+        their centers. The kernel of order ``n`` (i.e., decaying as
+        ``1/R**(n + 1)``) is approximated with a relative error of roughly
+        ``(n + 1)(n + 2) D**2 / (24 R**2)``, where ``D`` is the diagonal of
+        the prism and ``R`` the distance to its center (or to the center of
+        its image, for the 2nd system). A prism is replaced when this
+        estimate is not greater than ``tolerance``. If ``None``, all prisms
+        are computed with the exact kernels. Default to ``None``.
+    out : array or None (optional)
+        If not ``None``, array (e.g., a ``numpy.memmap``) where the result is
+        written. It must be C-contiguous and have the shape of the result.
+        The computation points are then read and computed in blocks of
+        ``block_size`` points, without full-size intermediate copies, and
+        ``dtype`` is replaced by the data type of ``out``.
+        Default to ``None``.
+    block_size : int (optional)
+        Number of computation points computed at once when ``out`` is given.
+        Default to 100000.
+    pressure_threshold : float (optional)
+        Relative threshold below which the contributions of the prisms are
+        dropped before the sweep (see ``active_prisms``). The prisms with
+        zero pressure at all time steps are always skipped.
+        Default to 0.
 
     Returns
     -------
     result : array
         Field component generated by the prisms at the computation points.
     """
-    kernels = {
-        "d_x1": kernel_d_x1,
-        "d_y1": kernel_d_y1,
-        "d_z1": kernel_d_z1,
-        "d_x2": kernel_d_x2,
-        "d_y2": kernel_d_y2,
-        "d_z2": kernel_d_z2,
-        "d_xz2": kernel_d_xz2,
-        "d_yz2": kernel_d_yz2,
-        "d_zz2": kernel_d_zz2,
-        "s_xz1": kernel_s_xz1,
-        "s_yz1": kernel_s_yz1,
-        "s_zz1": kernel_s_zz1,
-        "s_xz2": kernel_s_xz2,
-        "s_yz2": kernel_s_yz2,
-        "s_zz2": kernel_s_zz2,
-        "s_xzz2": kernel_s_xzz2,
-        "s_yzz2": kernel_s_yzz2,
-        "s_zzz2": kernel_s_zzz2
-    }
-    if kernel not in kernels:
+    import compaction_jit as jit
+    if kernel not in jit.KERNELS:
         raise ValueError("Kernel {} not recognized".format(kernel))
-    # Figure out the shape and size of the output array
-    cast = np.broadcast(*coordinates[:3])
-    result = np.zeros(cast.size, dtype=dtype)
-    # Convert coordinates, prisms and pressure to arrays with proper shape
-    coordinates = tuple(np.atleast_1d(i).ravel() for i in coordinates[:3])
-    prisms = np.atleast_2d(prisms)
-    pressure = np.atleast_1d(pressure).ravel()
-    # Sanity checks
-    if not disable_checks:
-        if pressure.size != prisms.shape[0]:
+    if out is not None:
+        # The blocks are not cached, so they can't evict useful results
+        return _write_blocks(
+            _field_component, (out,), coordinates, prisms, pressure,
+            disable_checks, block_size, poisson, young, kernel,
+            dtype=out.dtype, parallel=parallel, n_threads=n_threads,
+            tolerance=tolerance, pressure_threshold=pressure_threshold
+        )[0]
+    key = _cache_key(
+        "field_component", coordinates, prisms, pressure, poisson, young,
+        kernel, np.dtype(dtype).str, tolerance, pressure_threshold
+    )
+    cached = _cache_load(key)
+    if cached is not None:
+        return cached
+    result = _field_component(
+        coordinates, prisms, pressure, poisson, young, kernel, dtype=dtype,
+        disable_checks=disable_checks, parallel=parallel,
+        n_threads=n_threads, tolerance=tolerance,
+        pressure_threshold=pressure_threshold
+    )
+    _cache_store(key, result)
+    return result
+
+
+def _field_component(
+    coordinates, prisms, pressure, poisson, young, kernel, dtype,
+    disable_checks, parallel, n_threads, tolerance, pressure_threshold
+):
+    """
+    Compute a field component without the cache (see ``field_component``).
+    """
+    import compaction_jit as jit
+    shape, coordinates, prisms, pressure = _prepare_arguments(
+        coordinates, prisms, pressure, disable_checks
+    )
+    prisms, pressure = _skip_prisms(prisms, pressure, pressure_threshold)
+    result = np.zeros(
+        (pressure.shape[0], coordinates[0].size), dtype=dtype
+    )
+    # Sizes recorded when profiling (see set_profiling)
+    sizes = dict(
+        label=kernel, points=coordinates[0].size, prisms=prisms.shape[0],
+        evaluations=8*coordinates[0].size*prisms.shape[0]
+    )
+    # Compute the component
+    if tolerance is None:
+        serial, parallel_loop = jit.SPECIALIZED_LOOPS[kernel]
+        if jit._aot is not None and result.dtype == np.float64:
+            serial = _aot_loop(getattr(jit._aot, "field_component_" + kernel))
+        _run_loop(
+            serial, parallel_loop, parallel, n_threads, coordinates, prisms,
+            pressure, result, **sizes
+        )
+    else:
+        if tolerance <= 0:
             raise ValueError(
-                "Number of elements in pressure ({}) ".format(pressure.size)
-                + "mismatch the number of prisms ({})".format(prisms.shape[0])
+                "Invalid tolerance ({}). ".format(tolerance)
+                + "It must be positive."
             )
-        _check_prisms(prisms)
-    # Compute the component
-    jit_field_component(
-        coordinates, prisms, pressure, kernels[kernel], result
-    )
-    result *= -Cm(poisson, young)/(4*np.pi)
-    return result.reshape(cast.shape)
+        order = jit.KERNEL_ORDERS[kernel]
+        threshold = (order + 1)*(order + 2)/(24*tolerance)
+        _run_loop(
+            jit.jit_hybrid_field_component,
+            jit.jit_hybrid_field_component_parallel, parallel, n_threads,
+            coordinates, prisms, pressure, jit.KERNELS[kernel],
+            jit.POINT_KERNELS[kernel], kernel.endswith("2"),
+            threshold, result, **sizes
+        )
+    with _profile_phase("post_processing"):
+        result *= -Cm(poisson, young)/(4*np.pi)
+    return result.reshape(shape)
+
+
+def iter_chunks(coordinates, chunk_size=100000):
+    """
+    Split the computation points into chunks with bounded size.
 
+    The coordinates are broadcast against each other without copying them,
+    so a dense volume can be defined by three broadcastable 1d axes (e.g.,
+    with ``np.ix_``). Only the coordinates of the current chunk are copied.
 
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    chunk_size : int (optional)
+        Maximum number of computation points per chunk. Default to 100000.
 
-@njit
-def jit_field_component(
-    coordinates, prisms, pressure, kernel, out
+    Returns
+    -------
+    chunks : generator
+        Generator of tuples containing the ``y``, ``x`` and ``z`` 1d arrays
+        of the computation points of each chunk, in the order of the raveled
+        coordinates.
+    """
+    if chunk_size < 1:
+        raise ValueError(
+            "Invalid chunk size ({}). It must be positive.".format(chunk_size)
+        )
+    coordinates = np.broadcast_arrays(*coordinates[:3])
+    for start in range(0, coordinates[0].size, chunk_size):
+        stop = min(start + chunk_size, coordinates[0].size)
+        yield tuple(i.flat[start:stop] for i in coordinates)
+
+
+def stream_field_component(
+    chunks, prisms, pressure, poisson, young, kernel, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None, tolerance=None,
+    pressure_threshold=0
 ):
     """
-    Compute the displacement or stress component at the computations points
+    Field component computed over a sequence of chunks of computation points.
+
+    The memory used at any time is proportional to the size of a chunk, so
+    this function can be used for volumes of computation points that do not
+    fit in memory (see ``iter_chunks``).
 
     Parameters
     ----------
-    coordinates : 1d array
-        1d array containing ``y``, ``x`` and ``z`` Cartesian coordinates of the
-        computation points (in meters).
-    prisms : 2d-array
-        2d array containing the Cartesian coordinates of the prism(s). Each
-        line contains the coordinates of a prism in following order: y1, y2,
-        x1, x2, z2 and z1. All coordinates should be in meters.
-    pressure : 1d array
-        1d array containing the pressure of each prism in MPa.
-    kernel : func
-        Kernel function to be used for computing the desired field component.
-    out : 1d-array
-        Array where the resulting field component values will be stored.
-        Must have the same size as the arrays contained on ``coordinates``.
-    """
-    # Iterate over computation points and prisms
-    for l in range(coordinates[0].size):
-        for m in range(prisms.shape[0]):
-            # Iterate over the prism boundaries to compute the result of the
-            # integration (see Nagy et al., 2000)
-            c_z = 0.5 * (prisms[m, 4] + prisms[m, 5])
-            for i in range(2):
-                for j in range(2):
-                    for k in range(2):
-                        y_prism = prisms[m, 1 - i]
-                        x_prism = prisms[m, 3 - j]
-                        z_prism = prisms[m, 5 - k]
-                        # If i, j or k is 1, the shift_* will refer to the
-                        # lower boundary, meaning the corresponding term should
-                        # have a minus sign
-                        out[l] += (
-                            pressure[m]
-                            * (-1) ** (i + j + k)
-                            * kernel(
-                                y_prism,
-                                x_prism,
-                                z_prism,
-                                c_z,
-                                coordinates[0][l],
-                                coordinates[1][l],
-                                coordinates[2][l]
-                            )
-                        )
-
-@njit
-def kernel_d_x1(y, x, z, zc, yp, xp, zp):
-    """
-    Kernel for x-component of displacement in the infinite space domain
-    (1st system)
-    """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp
-    Y = yp - y
-    X = xp - x
-    Z = zp - z
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        Y * safe_log(Z + rho)
-        + Z * safe_log(Y + rho)
-        - X * safe_atan2(Y * Z, X * rho)
-    )
-    return kernel
-
-
-@njit
-def kernel_d_y1(y, x, z, zc, yp, xp, zp):
-    """
-    Kernel for y-component of displacement in the infinite space domain
-    (1st system)
-    """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp
-    Y = yp - y
-    X = xp - x
-    Z = zp - z
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        X * safe_log(Z + rho)
-        + Z * safe_log(X + rho)
-        - Y * safe_atan2(X * Z, Y * rho)
-    )
-    return kernel
-
-
-@njit
-def kernel_d_z1(y, x, z, zc, yp, xp, zp):
-    """
-    Kernel for z-component of displacement in the infinite space domain
-    (1st system)
-    """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp
-    Y = yp - y
-    X = xp - x
-    Z = zp - z
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        X * safe_log(Y + rho)
-        + Y * safe_log(X + rho)
-        - Z * safe_atan2(X * Y, Z * rho)
-    )
-    return kernel
-
-
-@njit
-def kernel_d_x2(y, x, z, zc, yp, xp, zp):
-    """
-    Kernel for x-component of displacement in the semi-infinite space domain
-    (2nd system)
-    """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        Y * safe_log(Z + rho)
-        + Z * safe_log(Y + rho)
-        - X * safe_atan2(Y * Z, X * rho)
-    )
-    return kernel
-
-
-@njit
-def kernel_d_y2(y, x, z, zc, yp, xp, zp):
-    """
-    Kernel for y-component of displacement in the semi-infinite space domain
-    (2nd system)
-    """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        X * safe_log(Z + rho)
-        + Z * safe_log(X + rho)
-        - Y * safe_atan2(X * Z, Y * rho)
-    )
-    return kernel
+    chunks : iterable
+        Iterable of chunks of computation points. Each chunk contains the
+        ``y``, ``x`` and ``z`` Cartesian coordinates of the computation
+        points in meters.
 
+    See ``field_component`` for a description of the other parameters.
 
-@njit
-def kernel_d_z2(y, x, z, zc, yp, xp, zp):
+    Returns
+    -------
+    results : generator
+        Generator of the field component at the computation points of each
+        chunk. If ``pressure`` is a 2d array, the time steps are along the
+        first dimension of each result.
     """
-    Kernel for z-component of displacement in the semi-infinite space domain
-    (2nd system)
+    import compaction_jit as jit
+    if kernel not in jit.KERNELS:
+        raise ValueError("Kernel {} not recognized".format(kernel))
+    # Check the model only once
+    _prepare_arguments(np.zeros((3, 0)), prisms, pressure, disable_checks)
+    # The chunks are not cached, so they can't evict useful results
+    for coordinates in chunks:
+        yield _field_component(
+            coordinates, prisms, pressure, poisson, young, kernel, dtype=dtype,
+            disable_checks=True, parallel=parallel, n_threads=n_threads,
+            tolerance=tolerance, pressure_threshold=pressure_threshold
+        )
+
+
+def stream_displacement_components(
+    chunks, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None, pressure_threshold=0
+):
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        X * safe_log(Y + rho)
-        + Y * safe_log(X + rho)
-        - Z * safe_atan2(X * Y, Z * rho)
-    )
-    return kernel
+    x, y and z components of the displacement field computed over a sequence
+    of chunks of computation points.
 
+    See ``stream_field_component`` and ``displacement_components`` for a
+    description of the parameters.
 
-@njit
-def kernel_d_xz2(y, x, z, zc, yp, xp, zp):
+    Returns
+    -------
+    results : generator
+        Generator of tuples containing the x, y and z components of the
+        displacement field at the computation points of each chunk.
     """
-    Kernel for xz-component of displacement in the semi-infinite space domain
-    (2nd system)
+    _prepare_arguments(np.zeros((3, 0)), prisms, pressure, disable_checks)
+    for coordinates in chunks:
+        yield displacement_components(
+            coordinates, prisms, pressure, poisson, young, dtype=dtype,
+            disable_checks=True, parallel=parallel, n_threads=n_threads,
+            pressure_threshold=pressure_threshold
+        )
+
+
+def stream_stress_components(
+    chunks, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None, pressure_threshold=0
+):
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = 2 * zp * (
-        safe_log(Y + rho)
-    )
-    return kernel
+    x, y and z components of the stress field computed over a sequence of
+    chunks of computation points.
 
+    See ``stream_field_component`` and ``stress_components`` for a
+    description of the parameters.
 
-@njit
-def kernel_d_yz2(y, x, z, zc, yp, xp, zp):
+    Returns
+    -------
+    results : generator
+        Generator of tuples containing the x, y and z components of the
+        stress field at the computation points of each chunk.
     """
-    Kernel for yz-component of displacement in the semi-infinite space domain
-    (2nd system)
+    _prepare_arguments(np.zeros((3, 0)), prisms, pressure, disable_checks)
+    for coordinates in chunks:
+        yield stress_components(
+            coordinates, prisms, pressure, poisson, young, dtype=dtype,
+            disable_checks=True, parallel=parallel, n_threads=n_threads,
+            pressure_threshold=pressure_threshold
+        )
+
+
+def set_parallel(parallel=True, n_threads=None):
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = 2 * zp * (
-        safe_log(X + rho)
-    )
-    return kernel
+    Define the global execution mode of the jitted loops.
 
+    The setting is used by every function that receives ``parallel=None``
+    or ``n_threads=None``.
 
-@njit
-def kernel_d_zz2(y, x, z, zc, yp, xp, zp):
+    Parameters
+    ----------
+    parallel : bool (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. Default to ``True``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. It is limited to
+        the number of threads available to Numba (``NUMBA_NUM_THREADS``). If
+        ``None``, all the available threads are used. Default to ``None``.
     """
-    Kernel for zz-component of displacement in the semi-infinite space domain
-    (2nd system)
+    if n_threads is not None and n_threads < 1:
+        raise ValueError(
+            "Invalid number of threads ({}). ".format(n_threads)
+            + "It must be a positive integer."
+        )
+    _PARALLEL["parallel"] = bool(parallel)
+    _PARALLEL["n_threads"] = n_threads
+
+
+def set_profiling(enabled=True):
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = 2 * zp * (
-        - safe_atan2(X * Y, Z * rho)
-    )
-    return kernel
+    Enable or disable the profiling of the jitted loops.
 
+    While enabled, every function computing fields in the current process
+    records the time spent compiling the jitted loops (or loading them from
+    the on-disk cache), checking the prisms, sweeping the kernels over the
+    points and prisms, and post-processing the results, as well as the peak
+    memory allocated by Python and NumPy (traced with ``tracemalloc``). The
+    records are returned by ``profile_report``. Enabling the profiling
+    discards the previous records. While disabled, nothing is recorded.
 
-@njit
-def kernel_s_xz1(y, x, z, zc, yp, xp, zp):
+    Parameters
+    ----------
+    enabled : bool (optional)
+        Whether to record the profile. Default to ``True``.
     """
-    Kernel for xz-component of stress in the infinite space domain (1st system)
+    if _PROFILE["tracemalloc"]:
+        tracemalloc.stop()
+        _PROFILE["tracemalloc"] = False
+    _PROFILE["enabled"] = bool(enabled)
+    if not enabled:
+        return
+    _PROFILE["report"] = {
+        "compile": 0.0, "checks": 0.0, "post_processing": 0.0, "sweeps": {},
+        "skipped_prisms": 0, "error_estimate": 0.0
+    }
+    if tracemalloc.is_tracing():
+        # Traced by another tool, whose peak can't be reset before Python 3.9
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+        _PROFILE["tracemalloc"] = True
+
+
+def profile_report():
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp
-    Y = yp - y
-    X = xp - x
-    Z = zp - z
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        safe_log(Y + rho)
+    Profile recorded since the profiling was enabled (see ``set_profiling``).
+
+    Returns
+    -------
+    report : dict or None
+        Wall times in seconds of the ``compile``, ``checks`` and
+        ``post_processing`` phases, ``peak_bytes`` allocated and ``sweeps``,
+        a dictionary with the ``calls``, wall ``time`` in seconds, number of
+        ``points`` and ``prisms`` processed and number of kernel
+        ``evaluations`` of each kernel or loop. For ``field_component``, a
+        kernel is evaluated 8 times per point and prism (at most, when
+        ``tolerance`` is given). Also the number of ``skipped_prisms`` and
+        the largest ``error_estimate`` caused by dropping them (see
+        ``active_prisms``). ``None`` if the profiling was never enabled.
+        If ``tracemalloc`` was already tracing when the profiling was
+        enabled with Python < 3.9, ``peak_bytes`` also covers the
+        allocations made before.
+    """
+    if _PROFILE["report"] is None:
+        return None
+    report = dict(_PROFILE["report"])
+    report["sweeps"] = {
+        label: dict(sweep) for label, sweep in report["sweeps"].items()
+    }
+    report["peak_bytes"] = (
+        tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
     )
-    return kernel
+    return report
 
 
-@njit
-def kernel_s_yz1(y, x, z, zc, yp, xp, zp):
+def set_cache(directory=None, max_bytes=2**30):
     """
-    Kernel for yz-component of stress in the infinite space domain (1st system)
+    Enable or disable the on-disk cache of the results of
+    ``field_component``.
+
+    While enabled, each result of ``field_component`` (without ``out``) is
+    stored in ``directory`` as a ``.npy`` file named by a hash of the
+    coordinates, prisms, pressure, elastic parameters, kernel, data type,
+    ``tolerance`` and ``pressure_threshold``. A later call with the same
+    inputs, in this or in another process, reads the stored result instead
+    of computing it. When the files exceed ``max_bytes``, the least recently
+    used ones are removed. The results of ``stream_field_component`` and
+    those written into ``out`` are not cached. Enabling or disabling the
+    cache resets the statistics returned by ``cache_statistics``. The hashes
+    include a version of the kernels, so results stored before the kernels
+    change are not read again (they are evicted as the least recently used
+    or removed by ``clear_cache``).
+
+    Parameters
+    ----------
+    directory : str or None (optional)
+        Directory where the results are stored. It is created if needed. If
+        ``None``, the cache is disabled. Default to ``None``.
+    max_bytes : int (optional)
+        Maximum total size in bytes of the stored results. Default to 1 GiB.
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp
-    Y = yp - y
-    X = xp - x
-    Z = zp - z
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        safe_log(X + rho)
+    if max_bytes < 0:
+        raise ValueError(
+            "Invalid maximum size ({}). ".format(max_bytes)
+            + "It must be positive or zero."
+        )
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    _CACHE.update(
+        directory=directory, max_bytes=max_bytes, hits=0, misses=0,
+        evictions=0
     )
-    return kernel
 
 
-@njit
-def kernel_s_zz1(y, x, z, zc, yp, xp, zp):
+def cache_statistics():
     """
-    Kernel for zz-component of stress in the infinite space domain (1st system)
+    Statistics of the cache since it was enabled (see ``set_cache``).
+
+    Returns
+    -------
+    statistics : dict
+        Number of ``hits``, ``misses`` and ``evictions``, and number of
+        ``entries`` and total size in ``bytes`` of the stored results.
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp
-    Y = yp - y
-    X = xp - x
-    Z = zp - z
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        - safe_atan2(X * Y, Z * rho)
-    )
-    return kernel
+    entries = _cache_entries()
+    return {
+        "hits": _CACHE["hits"], "misses": _CACHE["misses"],
+        "evictions": _CACHE["evictions"], "entries": len(entries),
+        "bytes": sum(entry[1] for entry in entries),
+    }
 
 
-@njit
-def kernel_s_xz2(y, x, z, zc, yp, xp, zp):
+def clear_cache():
     """
-    Kernel for xz-component of stress in the semi-infinite space domain
-    (2nd system)
+    Remove all the results stored in the cache (see ``set_cache``).
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        safe_log(Y + rho)
-    )
-    return kernel
+    for _, _, filename in _cache_entries():
+        _remove_file(filename)
 
 
-@njit
-def kernel_s_yz2(y, x, z, zc, yp, xp, zp):
+@contextmanager
+def _profile_phase(phase):
     """
-    Kernel for yz-component of stress in the semi-infinite space domain
-    (2nd system)
+    Add the wall time of the enclosed code to a phase of the profile, if the
+    profiling is enabled.
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        safe_log(X + rho)
-    )
-    return kernel
+    if not _PROFILE["enabled"]:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _PROFILE["report"][phase] += time.perf_counter() - start
 
 
-@njit
-def kernel_s_zz2(y, x, z, zc, yp, xp, zp):
+def _cache_key(*arguments):
     """
-    Kernel for zz-component of stress in the semi-infinite space domain
-    (2nd system)
+    Hash of the arguments of a cached function, or ``None`` if the cache is
+    disabled.
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
-    kernel = (
-        - safe_atan2(X * Y, Z * rho)
-    )
-    return kernel
+    if _CACHE["directory"] is None:
+        return None
+    digest = hashlib.blake2b(digest_size=20)
+    _hash_argument(digest, _CACHE_VERSION)
+    for argument in arguments:
+        _hash_argument(digest, argument)
+    return digest.hexdigest()
 
 
-@njit
-def kernel_s_xzz2(y, x, z, zc, yp, xp, zp):
+def _hash_argument(digest, argument):
     """
-    Kernel for xzz-component of stress in the semi-infinite space domain
-    (2nd system)
+    Add a scalar, a sequence or an array to a hash.
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    aux = X ** 2 + Z ** 2
-    rho = np.sqrt(Y ** 2 + aux)
-    kernel = 2 * zp * (
-        - (Y * Z)/(rho * aux)
-    )
-    return kernel
+    if isinstance(argument, np.generic):
+        argument = argument.item()
+    if argument is None or isinstance(argument, (str, int, float)):
+        digest.update("{!r};".format(argument).encode())
+    elif isinstance(argument, (list, tuple)):
+        digest.update("[{};".format(len(argument)).encode())
+        for item in argument:
+            _hash_argument(digest, item)
+    else:
+        array = np.ascontiguousarray(argument)
+        digest.update("{}{};".format(array.dtype.str, array.shape).encode())
+        digest.update(array)
 
 
-@njit
-def kernel_s_yzz2(y, x, z, zc, yp, xp, zp):
+def _cache_load(key):
     """
-    Kernel for yzz-component of stress in the semi-infinite space domain
-    (2nd system)
+    Result stored in the cache under a key, or ``None`` if it is not stored.
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    aux = Y ** 2 + Z ** 2
-    rho = np.sqrt(X ** 2 + aux)
-    kernel = 2 * zp * (
-        - (X * Z)/(rho * aux)
-    )
-    return kernel
+    if key is None:
+        return None
+    filename = os.path.join(_CACHE["directory"], key + ".npy")
+    try:
+        result = np.load(filename)
+        # The access time used by the eviction is the modification time
+        os.utime(filename)
+    except (OSError, ValueError):
+        _CACHE["misses"] += 1
+        return None
+    _CACHE["hits"] += 1
+    return result
 
 
-@njit
-def kernel_s_zzz2(y, x, z, zc, yp, xp, zp):
+def _cache_store(key, result):
+    """
+    Store a result in the cache under a key and evict the least recently
+    used results if the cache is too large.
+    """
+    if key is None or result.nbytes > _CACHE["max_bytes"]:
+        return
+    filename = os.path.join(_CACHE["directory"], key + ".npy")
+    # Written under a temporary name, so readers never see partial files
+    temporary = "{}.{}.tmp".format(filename, os.getpid())
+    with open(temporary, "wb") as f:
+        np.save(f, result)
+    os.replace(temporary, filename)
+    entries = sorted(_cache_entries())
+    size = sum(entry[1] for entry in entries)
+    for _, nbytes, filename in entries:
+        if size <= _CACHE["max_bytes"]:
+            break
+        _remove_file(filename)
+        size -= nbytes
+        _CACHE["evictions"] += 1
+
+
+def _cache_entries():
+    """
+    Modification time, size and name of each result stored in the cache.
+    """
+    directory = _CACHE["directory"]
+    if directory is None:
+        return []
+    entries = []
+    for name in os.listdir(directory):
+        if not name.endswith(".npy"):
+            continue
+        filename = os.path.join(directory, name)
+        try:
+            status = os.stat(filename)
+        except FileNotFoundError:
+            continue
+        entries.append((status.st_mtime, status.st_size, filename))
+    return entries
+
+
+def _remove_file(filename):
     """
-    Kernel for zzz-component of stress in the semi-infinite space domain
-    (2nd system)
+    Remove a file, if it was not removed by another process.
     """
-    # Y = y - yp
-    # X = x - xp
-    # Z = z - zp - 2 * zc
-    Y = yp - y
-    X = xp - x
-    Z = zp - z + 2 * zc
-    X2 = X ** 2
-    Y2 = Y ** 2
-    Z2 = Z ** 2
-    rho = np.sqrt(X2 + Y2 + Z2)
-    kernel = 2 * zp * (
-        ((X * Y)/rho)*((1./(X2 + Z2)) + (1./(Y2 + Z2)))
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
+
+
+def _compile_loop(loop, args):
+    """
+    Compile a jitted loop for the types of its arguments, if needed, and add
+    the wall time to the profile.
+    """
+    # Loops compiled ahead of time are plain functions
+    if not hasattr(loop, "overloads"):
+        return
+    from numba import typeof
+    signature = tuple(typeof(i) for i in args)
+    if signature in loop.overloads:
+        return
+    with _profile_phase("compile"):
+        loop.compile(signature)
+
+
+def _run_loop(
+    serial, parallel_loop, parallel, n_threads, *args, label=None, points=0,
+    prisms=0, evaluations=0
+):
+    """
+    Run the serial or the parallel version of a jitted loop.
+
+    Parameters
+    ----------
+    serial, parallel_loop : func
+        Serial and parallel versions of the jitted loop.
+    parallel : bool or None
+        Whether to run the parallel version. If ``None``, the global setting
+        is used.
+    n_threads : int or None
+        Number of threads used by the parallel version. If ``None``, the
+        global setting is used.
+    args
+        Arguments passed to the jitted loop.
+    label : str or None
+        Name of the sweep in the profile (see ``set_profiling``). If
+        ``None``, the name of the loop is used.
+    points, prisms, evaluations : int
+        Number of points, prisms and kernel evaluations of the sweep, added
+        to the profile.
+    """
+    if parallel is None:
+        parallel = _PARALLEL["parallel"]
+    if n_threads is None:
+        n_threads = _PARALLEL["n_threads"]
+    loop = parallel_loop if parallel else serial
+    profiling = _PROFILE["enabled"]
+    if profiling:
+        _compile_loop(loop, args)
+        start = time.perf_counter()
+    if not parallel or n_threads is None:
+        loop(*args)
+    else:
+        from numba import config, get_num_threads, set_num_threads
+        previous = get_num_threads()
+        set_num_threads(min(n_threads, config.NUMBA_NUM_THREADS))
+        try:
+            loop(*args)
+        finally:
+            set_num_threads(previous)
+    if profiling:
+        elapsed = time.perf_counter() - start
+        if label is None:
+            label = getattr(loop, "__name__", "loop")
+        sweep = _PROFILE["report"]["sweeps"].setdefault(
+            label,
+            {"calls": 0, "time": 0.0, "points": 0, "prisms": 0,
+             "evaluations": 0}
+        )
+        sweep["calls"] += 1
+        sweep["time"] += elapsed
+        sweep["points"] += points
+        sweep["prisms"] += prisms
+        sweep["evaluations"] += evaluations
+
+
+def _aot_loop(function):
+    """
+    Wrap a loop compiled ahead of time so that it receives contiguous
+    ``float64`` arrays, as required by its signature (see build_aot.py).
+    """
+    def loop(coordinates, prisms, pressure, out):
+        function(
+            tuple(
+                np.ascontiguousarray(i, dtype=np.float64) for i in coordinates
+            ),
+            np.ascontiguousarray(prisms, dtype=np.float64),
+            np.ascontiguousarray(pressure, dtype=np.float64),
+            out
+        )
+    return loop
+
+
+def active_prisms(prisms, pressure, threshold=0):
+    """
+    Prisms whose contributions to the fields are not negligible.
+
+    The contribution of a prism far from the computation points is roughly
+    proportional to its strength, the product of the absolute values of its
+    pressure and volume. A prism is dropped if its strength is not greater
+    than ``threshold`` times the largest strength at every time step. The
+    relative error of the fields far from the prisms is then estimated by the
+    sum of the strengths of the dropped prisms divided by the sum of all the
+    strengths, at the worst time step.
+
+    Parameters
+    ----------
+    prisms : 2d-array
+        Boundaries of the prisms (see ``field_component``).
+    pressure : 1d-array or 2d-array
+        Pressure of each prism, or pressure of each prism at a sequence of
+        time steps (see ``field_component``).
+    threshold : float (optional)
+        Relative threshold. If 0, only the prisms with zero pressure at all
+        time steps (or zero volume) are dropped, without changing the fields.
+        Default to 0.
+
+    Returns
+    -------
+    prisms : 2d-array
+        Boundaries of the active prisms.
+    pressure : 1d-array or 2d-array
+        Pressure of the active prisms.
+    error : float
+        Estimate of the relative error caused by dropping the other prisms.
+    """
+    if threshold < 0:
+        raise ValueError(
+            "Invalid threshold ({}). ".format(threshold)
+            + "It must be positive or zero."
+        )
+    prisms = np.atleast_2d(prisms)
+    pressure = np.atleast_1d(pressure)
+    volume = np.abs(
+        (prisms[:, 1] - prisms[:, 0])*(prisms[:, 3] - prisms[:, 2])
+        * (prisms[:, 4] - prisms[:, 5])
     )
-    return kernel
+    strength = np.abs(np.atleast_2d(pressure))*volume
+    largest = np.max(strength, axis=1, keepdims=True, initial=0)
+    active = (strength > threshold*largest).any(axis=0)
+    if active.all():
+        return prisms, pressure, 0.0
+    total = strength.sum(axis=1)
+    dropped = strength[:, ~active].sum(axis=1)
+    error = np.max(
+        np.divide(dropped, total, out=np.zeros_like(total), where=total > 0)
+    )
+    return prisms[active], pressure[..., active], float(error)
+
+
+def _skip_prisms(prisms, pressure, threshold):
+    """
+    Drop the prisms with negligible contributions before a sweep (see
+    ``active_prisms``) and add the number of skipped prisms and the error
+    estimate to the profile.
+    """
+    active, pressure, error = active_prisms(prisms, pressure, threshold)
+    if _PROFILE["enabled"]:
+        report = _PROFILE["report"]
+        report["skipped_prisms"] += prisms.shape[0] - active.shape[0]
+        report["error_estimate"] = max(report["error_estimate"], error)
+    return active, pressure
+
+
+def _prepare_arguments(coordinates, prisms, pressure, disable_checks):
+    """
+    Convert the computation points, prisms and pressure to arrays with proper
+    shape and check the model.
+
+    Returns
+    -------
+    shape : tuple
+        Shape of the resulting field components. It is the broadcast shape of
+        the coordinates, preceded by the number of time steps if ``pressure``
+        is a 2d array.
+    coordinates : tuple of 1d-arrays
+        Raveled ``y``, ``x`` and ``z`` coordinates of the computation points.
+    prisms : 2d-array
+        Boundaries of the prisms.
+    pressure : 2d-array
+        Pressure of each prism with shape (``n_steps``, ``n_prisms``).
+    """
+    # Figure out the shape and size of the output array
+    shape = np.broadcast(*coordinates[:3]).shape
+    # Convert coordinates, prisms and pressure to arrays with proper shape
+    coordinates = tuple(np.atleast_1d(i).ravel() for i in coordinates[:3])
+    prisms = np.atleast_2d(prisms)
+    pressure = np.atleast_1d(pressure)
+    if pressure.ndim > 2:
+        raise ValueError(
+            "Invalid pressure with {} dimensions. ".format(pressure.ndim)
+            + "It must be a 1d or 2d array."
+        )
+    if pressure.ndim == 2:
+        shape = (pressure.shape[0],) + shape
+    pressure = np.atleast_2d(pressure)
+    # Sanity checks
+    if not disable_checks:
+        with _profile_phase("checks"):
+            if pressure.shape[1] != prisms.shape[0]:
+                raise ValueError(
+                    "Number of elements in pressure "
+                    + "({}) mismatch the number ".format(pressure.shape[1])
+                    + "of prisms ({})".format(prisms.shape[0])
+                )
+            _check_prisms(prisms)
+    return shape, coordinates, prisms, pressure
+
+
+def _write_blocks(
+    function, out, coordinates, prisms, pressure, disable_checks, block_size,
+    *args, **kwargs
+):
+    """
+    Compute fields in blocks of computation points and write them into
+    existing arrays.
+
+    Parameters
+    ----------
+    function : func
+        Function that computes the fields (e.g., ``field_component``). It
+        must return an array or a tuple of arrays.
+    out : tuple of arrays
+        Arrays where the results of ``function`` are written.
+    coordinates, prisms, pressure, disable_checks
+        See ``field_component``.
+    block_size : int
+        Number of computation points computed at once.
+    args, kwargs
+        Remaining arguments passed to ``function``.
+
+    Returns
+    -------
+    out : tuple of arrays
+        The arrays containing the results.
+    """
+    # Check the model only once, without copying the coordinates
+    pressure_steps = _prepare_arguments(
+        np.zeros((3, 0)), prisms, pressure, disable_checks
+    )[3].shape[0]
+    points = np.broadcast(*coordinates[:3])
+    shape = points.shape
+    if np.ndim(pressure) == 2:
+        shape = (pressure_steps,) + shape
+    views = []
+    for array in out:
+        if array.shape != shape:
+            raise ValueError(
+                "Invalid out with shape {}. ".format(array.shape)
+                + "It must have shape {}.".format(shape)
+            )
+        if not array.flags.c_contiguous:
+            raise ValueError("Invalid out. It must be C-contiguous.")
+        views.append(array.reshape(pressure_steps, points.size))
+    start = 0
+    for chunk in iter_chunks(coordinates, block_size):
+        results = function(
+            chunk, prisms, pressure, *args, disable_checks=True, **kwargs
+        )
+        if not isinstance(results, tuple):
+            results = (results,)
+        stop = start + chunk[0].size
+        for view, result in zip(views, results):
+            view[:, start:stop] = result.reshape(pressure_steps, -1)
+        start = stop
+    for array in out:
+        if isinstance(array, np.memmap):
+            array.flush()
+    return tuple(out)
 
 
 def _check_prisms(prisms):
@@ -861,42 +1697,6 @@ def _check_prisms(prisms):
         raise ValueError(err_msg)
 
 
-@njit
-def safe_atan2(numerator, denominator):
-    """
-    Principal value of the arctangent expressed as a two variable function
-
-    This modification has to be made to the arctangent function so the
-    harmonic field of the prism satisfies the Poisson's equation.
-    Therefore, it guarantees that the fields satisfies the symmetry properties
-    of the prism. This modified function has been defined according to
-    Fukushima (2019).
-    """
-    if denominator != 0:
-        result = np.arctan(numerator / denominator)
-    else:
-        if numerator > 0:
-            result = np.pi / 2
-        elif numerator < 0:
-            result = -np.pi / 2
-        else:
-            result = 0
-    return result
-
-
-@njit
-def safe_log(argument):
-    """
-    Modified log to return 0 for log(0).
-    The limits in the formula terms tend to 0 (see Nagy et al., 2000).
-    """
-    if np.abs(argument) < 1e-10:
-        result = 0
-    else:
-        result = np.log(argument)
-    return result
-
-
 def Cm(poisson, young):
     """
     Uniaxial compaction coefficient Cm.
@@ -913,18 +1713,9 @@ def prism_layer_rectangular(region, shape, bottom, top):
     assert y2 > y1, 'y2 must be greater than y1'
     assert x2 > x1, 'x2 must be greater than x1'
     assert bottom > top, 'bottom must be greater than top (z points downward)'
-    dy = (y2 - y1)/shape[0]
-    dx = (x2 - x1)/shape[1]
-    layer = []
-    y = y1
-    for i in range(shape[0]):
-        x = x1
-        for j in range(shape[1]):
-            layer.append([y, y+dy, x, x+dx, bottom, top])
-            x += dx
-        y += dy
-    layer = np.array(layer)
-    return layer
+    return _stack_layers(
+        region, shape, np.array([[top], [bottom]], dtype=float)
+    )
 
 
 def prism_layer_circular(center, radius, shape, bottom, top):
@@ -933,26 +1724,247 @@ def prism_layer_circular(center, radius, shape, bottom, top):
     '''
     y0, x0 = center
     assert radius > 0, 'radius must be positive'
-    assert bottom > top, 'bottom must be greater than top (z points downward)'
-    y_min = y0 - radius
-    y_max = y0 + radius
-    x_min = x0 - radius
-    x_max = x0 + radius
-    dy = (y_max - y_min)/shape[0]
-    dx = (x_max - x_min)/shape[1]
-    half_dy = 0.5*dy
-    half_dx = 0.5*dx
-    layer = []
-    y = y_min
-    for i in range(shape[0]):
-        yc = y + half_dy - y0
-        x = x_min
-        for j in range(shape[1]):
-            xc = x + half_dx - x0
-            r_prism = np.sqrt(xc**2 + yc**2)
-            if r_prism <= radius:
-                layer.append([y, y+dy, x, x+dx, bottom, top])
-            x += dx
-        y += dy
-    layer = np.array(layer)
-    return layer
+    layer = prism_layer_rectangular(
+        (y0 - radius, y0 + radius, x0 - radius, x0 + radius), shape, bottom,
+        top
+    )
+    r_prism = np.hypot(
+        0.5*(layer[:, 2] + layer[:, 3]) - x0,
+        0.5*(layer[:, 0] + layer[:, 1]) - y0
+    )
+    return layer[r_prism <= radius]
+
+
+def prism_grid(region, shape, depth_levels):
+    '''
+    Create a 3D grid of prisms made of stacked rectangular layers.
+
+    Parameters
+    ----------
+    region : list
+        Boundaries ``y1``, ``y2``, ``x1`` and ``x2`` of the grid in meters.
+    shape : tuple
+        Number of prisms along ``y`` and ``x`` in each layer.
+    depth_levels : 1d-array
+        Increasing depths of the boundaries of the layers in meters. The
+        first layer has top ``depth_levels[0]`` and bottom
+        ``depth_levels[1]``.
+
+    Returns
+    -------
+    prisms : 2d-array
+        C-contiguous array with the boundaries of the prisms. The prisms of
+        each layer are ordered as in ``prism_layer_rectangular`` and the
+        layers are ordered from the top to the bottom.
+    '''
+    depth_levels = np.asarray(depth_levels, dtype=float)
+    assert depth_levels.ndim == 1 and depth_levels.size > 1, \
+        'depth_levels must be a 1d array with at least 2 depths'
+    assert np.all(np.diff(depth_levels) > 0), \
+        'depth_levels must be increasing (z points downward)'
+    return _stack_layers(region, shape, depth_levels[:, None])
+
+
+def prism_layer_surfaces(region, shape, bottom, top, n_layers=1):
+    '''
+    Create a layer of prisms between two surfaces with varying depth,
+    optionally divided into stacked layers.
+
+    Parameters
+    ----------
+    region : list
+        Boundaries ``y1``, ``y2``, ``x1`` and ``x2`` of the layer in meters.
+    shape : tuple
+        Number of prisms along ``y`` and ``x``.
+    bottom, top : float, 2d-array or func
+        Depths of the bottom and top surfaces in meters. Either a constant, a
+        2d array with ``shape`` containing the depth of each column of
+        prisms, or a function of the ``y`` and ``x`` coordinates (arrays) of
+        the centers of the columns.
+    n_layers : int (optional)
+        Number of layers dividing the thickness of each column in equal
+        parts. Default to 1.
+
+    Returns
+    -------
+    prisms : 2d-array
+        C-contiguous array with the boundaries of the prisms. The prisms of
+        each layer are ordered as in ``prism_layer_rectangular`` and the
+        layers are ordered from the top to the bottom. Columns where the
+        surfaces coincide give prisms with zero thickness, which produce no
+        fields (see ``active_prisms``).
+    '''
+    assert n_layers >= 1, 'n_layers must be positive'
+    y, x = cell_edges(region, shape)
+    # Centers of the columns on a grid with ``shape``
+    y_center, x_center = np.meshgrid(
+        0.5*(y[:-1] + y[1:]), 0.5*(x[:-1] + x[1:]), indexing="ij"
+    )
+    surfaces = []
+    for surface in (bottom, top):
+        if callable(surface):
+            surface = surface(y_center, x_center)
+        surfaces.append(
+            np.broadcast_to(np.asarray(surface, dtype=float), shape).ravel()
+        )
+    bottom, top = surfaces
+    assert np.all(bottom >= top), \
+        'bottom must not be above top (z points downward)'
+    fractions = np.linspace(0, 1, n_layers + 1)[:, None]
+    return _stack_layers(region, shape, top + fractions*(bottom - top))
+
+
+def cell_edges(region, shape):
+    """
+    Boundaries of the cells of a regular grid along ``y`` and ``x``.
+
+    The boundaries are computed without accumulating the cell sizes, so
+    neighbouring cells share exactly the same boundary.
+
+    Parameters
+    ----------
+    region : list
+        Boundaries ``y1``, ``y2``, ``x1`` and ``x2`` of the grid in meters.
+    shape : tuple
+        Number of cells along ``y`` and ``x``.
+
+    Returns
+    -------
+    y, x : 1d-arrays
+        Boundaries of the cells along ``y`` and ``x``.
+    """
+    y1, y2, x1, x2 = region
+    return (
+        np.linspace(y1, y2, shape[0] + 1), np.linspace(x1, x2, shape[1] + 1)
+    )
+
+
+def _stack_layers(region, shape, levels):
+    """
+    Stack rectangular layers of prisms with the depths of the boundaries of
+    the layers given by the rows of ``levels`` (one column per prism or a
+    single column).
+    """
+    y, x = cell_edges(region, shape)
+    n_layers = levels.shape[0] - 1
+    n_prisms = shape[0]*shape[1]
+    levels = np.broadcast_to(levels, (n_layers + 1, n_prisms))
+    prisms = np.empty((n_layers*n_prisms, 6))
+    prisms[:, 0] = np.tile(np.repeat(y[:-1], shape[1]), n_layers)
+    prisms[:, 1] = np.tile(np.repeat(y[1:], shape[1]), n_layers)
+    prisms[:, 2] = np.tile(x[:-1], shape[0]*n_layers)
+    prisms[:, 3] = np.tile(x[1:], shape[0]*n_layers)
+    prisms[:, 4] = levels[1:].ravel()
+    prisms[:, 5] = levels[:-1].ravel()
+    return prisms
+
+
+def merge_prisms(prisms, pressure):
+    """
+    Merge adjacent prisms with equal pressure into larger prisms.
+
+    The fields are linear in the pressure and the kernels are integrated
+    over the volume of the prisms, so two prisms sharing a whole face and
+    having the same pressure at all time steps produce the same fields as
+    the prism resulting from their union. The prisms are merged along the
+    ``x``, ``y`` and ``z`` directions until no pair of prisms can be merged,
+    so rows, layers and stacks of layers with uniform pressure (e.g., built
+    with ``prism_layer_rectangular``) become single prisms.
+
+    Parameters
+    ----------
+    prisms : 2d-array
+        Boundaries of the prisms (see ``field_component``).
+    pressure : 1d-array or 2d-array
+        Pressure of each prism, or pressure of each prism at a sequence of
+        time steps (see ``field_component``).
+
+    Returns
+    -------
+    prisms : 2d-array
+        Boundaries of the merged prisms.
+    pressure : 1d-array or 2d-array
+        Pressure of the merged prisms.
+    ratio : float
+        Number of prisms divided by the number of merged prisms.
+    """
+    prisms = np.atleast_2d(prisms)
+    pressure = np.atleast_1d(pressure)
+    merged = np.array(prisms, dtype=float)
+    steps = np.atleast_2d(pressure)
+    if steps.shape[1] != prisms.shape[0]:
+        raise ValueError(
+            "Number of elements in pressure "
+            + "({}) mismatch the number ".format(steps.shape[1])
+            + "of prisms ({})".format(prisms.shape[0])
+        )
+    size = None
+    while size != merged.shape[0]:
+        size = merged.shape[0]
+        # Lower and upper boundaries along x, y and z
+        for lower, upper in ((2, 3), (0, 1), (5, 4)):
+            merged, steps = _merge_along(merged, steps, lower, upper)
+    if pressure.ndim == 1:
+        steps = steps[0]
+    return merged, steps, prisms.shape[0]/max(merged.shape[0], 1)
+
+
+def _merge_along(prisms, pressure, lower, upper):
+    """
+    Merge the consecutive prisms along one direction that have the same
+    pressure and the same boundaries along the other directions.
+
+    Parameters
+    ----------
+    prisms : 2d-array
+        Boundaries of the prisms.
+    pressure : 2d-array
+        Pressure of each prism with shape (``n_steps``, ``n_prisms``).
+    lower, upper : int
+        Columns of ``prisms`` containing the lower and upper boundaries
+        along the direction.
+
+    Returns
+    -------
+    prisms, pressure : 2d-arrays
+        Boundaries and pressure of the merged prisms.
+    """
+    if prisms.shape[0] < 2:
+        return prisms, pressure
+    others = [i for i in range(6) if i not in (lower, upper)]
+    keys = np.hstack([pressure.T, prisms[:, others]])
+    # Sort by the keys and then by the lower boundary
+    order = np.lexsort((prisms[:, lower],) + tuple(keys.T[::-1]))
+    prisms = prisms[order]
+    keys = keys[order]
+    pressure = pressure[:, order]
+    continues = (
+        np.all(keys[1:] == keys[:-1], axis=1)
+        & (prisms[1:, lower] == prisms[:-1, upper])
+    )
+    starts = np.flatnonzero(np.concatenate([[True], ~continues]))
+    ends = np.append(starts[1:], prisms.shape[0]) - 1
+    merged = prisms[starts]
+    merged[:, upper] = prisms[ends, upper]
+    return merged, pressure[:, starts]
+
+
+def __getattr__(name):
+    """
+    Give access to the jitted kernels and loops of ``compaction_jit`` (e.g.,
+    ``KERNELS``) as attributes of this module.
+
+    ``compaction_jit`` imports Numba, so it is only imported when one of its
+    attributes is requested or a field is computed.
+    """
+    if name.startswith("__"):
+        raise AttributeError(
+            "module 'compaction' has no attribute '{}'".format(name)
+        )
+    import compaction_jit
+    try:
+        return getattr(compaction_jit, name)
+    except AttributeError:
+        raise AttributeError(
+            "module 'compaction' has no attribute '{}'".format(name)
+        ) from None
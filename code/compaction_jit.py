@@ -0,0 +1,2019 @@
+"""
+Jitted loops and kernels used by ``compaction`` to compute the displacement
+and stress components of prisms.
+
+This module imports Numba, so it is only imported by ``compaction`` when a
+field is computed. The kernels and loops are also accessible as attributes of
+``compaction`` (e.g., ``compaction.KERNELS``).
+"""
+
+import numpy as np
+from numba import njit, prange
+
+try:
+    # Optional ahead-of-time compiled loops (see build_aot.py)
+    import compaction_aot as _aot
+except ImportError:
+    _aot = None
+
+
+def _field_component_loop(
+    coordinates, prisms, pressure, kernel, out
+):
+    """
+    Compute the displacement or stress component at the computations points
+
+    The kernel integrated over each prism is multiplied by the pressure of
+    the prism at all the time steps. The contributions of the prisms are
+    added in double precision and then added to ``out``, so they are
+    rounded only once if ``out`` has single precision.
+
+    Parameters
+    ----------
+    coordinates : 1d array
+        1d array containing ``y``, ``x`` and ``z`` Cartesian coordinates of the
+        computation points (in meters).
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 2d array
+        2d array with shape (n_steps, n_prisms) containing the pressure of
+        each prism in MPa.
+    kernel : func
+        Kernel function to be used for computing the desired field component.
+    out : 2d-array
+        Array with shape (n_steps, n_points) where the resulting field
+        component values will be stored.
+    """
+    # Iterate over computation points and prisms
+    for l in prange(coordinates[0].size):
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            # Iterate over the prism boundaries to compute the result of the
+            # integration (see Nagy et al., 2000)
+            c_z = 0.5 * (prisms[m, 4] + prisms[m, 5])
+            value = 0.0
+            for i in range(2):
+                for j in range(2):
+                    for k in range(2):
+                        y_prism = prisms[m, 1 - i]
+                        x_prism = prisms[m, 3 - j]
+                        z_prism = prisms[m, 5 - k]
+                        # If i, j or k is 1, the shift_* will refer to the
+                        # lower boundary, meaning the corresponding term should
+                        # have a minus sign
+                        value += (
+                            (-1) ** (i + j + k)
+                            * kernel(
+                                y_prism,
+                                x_prism,
+                                z_prism,
+                                c_z,
+                                coordinates[0][l],
+                                coordinates[1][l],
+                                coordinates[2][l]
+                            )
+                        )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component = njit(cache=True)(_field_component_loop)
+jit_field_component_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop
+)
+
+
+def _specialized_loops_source():
+    """
+    Source code of the loops of ``field_component`` specialized for each
+    kernel
+
+    Each loop calls its kernel directly, so the compiler can inline it. The
+    8 corners of each prism are unrolled with their signs and the depth of
+    the center of the prism is computed once per prism. The corners are
+    added in the same order as in ``jit_field_component``, so both loops
+    give the same results. Unlike loops receiving the kernel as an argument,
+    these loops can also be compiled ahead of time (see ``build_aot.py``).
+
+    The generated code is stored at the end of this module, between the
+    ``GENERATED_LOOPS`` markers. It must be updated whenever this function
+    or ``KERNELS`` change.
+
+    Returns
+    -------
+    source : str
+        Source code of the loops and of the ``SPECIALIZED_LOOPS`` dictionary.
+    """
+    template = '''
+
+def _field_component_loop_{name}(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``{name}`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_{name}(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_{name}(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_{name}(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_{name}(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_{name}(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_{name}(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_{name}(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_{name}(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_{name} = njit(cache=True)(_field_component_loop_{name})
+jit_field_component_{name}_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_{name}
+)
+'''
+    source = "".join(template.format(name=name) for name in KERNELS)
+    source += (
+        "\n\n# Serial and parallel loops of field_component specialized for "
+        + "each kernel\nSPECIALIZED_LOOPS = {\n"
+    )
+    source += ",\n".join(
+        '    "{0}": (\n        jit_field_component_{0},\n'
+        '        jit_field_component_{0}_parallel\n    )'.format(name)
+        for name in KERNELS
+    )
+    source += "\n}\n"
+    return source
+
+
+def _hybrid_field_component_loop(
+    coordinates, prisms, pressure, kernel, point_kernel, image, threshold,
+    out
+):
+    """
+    Compute the displacement or stress component at the computations points
+    replacing distant prisms by point sources
+
+    A prism is replaced by a point source at its center (or at the center of
+    its image, for the 2nd system) if the squared ratio between the distance
+    to the computation point and the diagonal of the prism is greater than
+    or equal to ``threshold``.
+
+    Parameters
+    ----------
+    coordinates : 1d array
+        1d array containing ``y``, ``x`` and ``z`` Cartesian coordinates of the
+        computation points (in meters).
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 2d array
+        2d array with shape (n_steps, n_prisms) containing the pressure of
+        each prism in MPa.
+    kernel : func
+        Kernel function to be used for computing the desired field component.
+    point_kernel : func
+        Point-source approximation of ``kernel``.
+    image : bool
+        Whether the kernel belongs to the 2nd system.
+    threshold : float
+        Squared ratio between distance and diagonal above which the point
+        source is used.
+    out : 2d-array
+        Array with shape (n_steps, n_points) where the resulting field
+        component values will be stored.
+    """
+    # Iterate over computation points and prisms
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            c_y = 0.5 * (prisms[m, 0] + prisms[m, 1])
+            c_x = 0.5 * (prisms[m, 2] + prisms[m, 3])
+            c_z = 0.5 * (prisms[m, 4] + prisms[m, 5])
+            d_y = prisms[m, 1] - prisms[m, 0]
+            d_x = prisms[m, 3] - prisms[m, 2]
+            d_z = prisms[m, 4] - prisms[m, 5]
+            if image:
+                distance = (yp - c_y)**2 + (xp - c_x)**2 + (zp + c_z)**2
+            else:
+                distance = (yp - c_y)**2 + (xp - c_x)**2 + (zp - c_z)**2
+            if distance >= threshold * (d_y**2 + d_x**2 + d_z**2):
+                value = d_y * d_x * d_z * point_kernel(
+                    c_y, c_x, c_z, c_z, yp, xp, zp
+                )
+            else:
+                value = 0.0
+                for i in range(2):
+                    for j in range(2):
+                        for k in range(2):
+                            value += (-1) ** (i + j + k) * kernel(
+                                prisms[m, 1 - i],
+                                prisms[m, 3 - j],
+                                prisms[m, 5 - k],
+                                c_z,
+                                yp,
+                                xp,
+                                zp
+                            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_hybrid_field_component = njit(cache=True)(_hybrid_field_component_loop)
+jit_hybrid_field_component_parallel = njit(parallel=True, cache=True)(
+    _hybrid_field_component_loop
+)
+
+
+def _displacement_components_loop(coordinates, prisms, pressure, out):
+    """
+    Compute the sub-kernel fields of the three displacement components at the
+    computation points in a single sweep
+
+    Parameters
+    ----------
+    coordinates : 1d array
+        1d array containing ``y``, ``x`` and ``z`` Cartesian coordinates of the
+        computation points (in meters).
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 2d array
+        2d array with shape (n_steps, n_prisms) containing the pressure of
+        each prism in MPa.
+    out : 3d-array
+        Array with shape (9, n_steps, n_points) where the fields produced by
+        the kernels ``d_x1``, ``d_x2``, ``d_xz2``, ``d_y1``, ``d_y2``,
+        ``d_yz2``, ``d_z1``, ``d_z2`` and ``d_zz2`` will be stored, in this
+        order.
+    """
+    # Iterate over computation points and prisms
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        values = np.empty(9)
+        # Sub-kernel fields of the point, added in double precision
+        total = np.zeros((9, pressure.shape[0]))
+        for m in range(prisms.shape[0]):
+            c_z = 0.5 * (prisms[m, 4] + prisms[m, 5])
+            values[:] = 0.0
+            for i in range(2):
+                for j in range(2):
+                    for k in range(2):
+                        Y = yp - prisms[m, 1 - i]
+                        X = xp - prisms[m, 3 - j]
+                        sign = (-1) ** (i + j + k)
+                        # 1st system
+                        Z = zp - prisms[m, 5 - k]
+                        rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+                        log_x = safe_log(X + rho)
+                        log_y = safe_log(Y + rho)
+                        log_z = safe_log(Z + rho)
+                        atan_xy = safe_atan2(X * Y, Z * rho)
+                        values[0] += sign * (
+                            Y * log_z
+                            + Z * log_y
+                            - X * safe_atan2(Y * Z, X * rho)
+                        )
+                        values[3] += sign * (
+                            X * log_z
+                            + Z * log_x
+                            - Y * safe_atan2(X * Z, Y * rho)
+                        )
+                        values[6] += sign * (
+                            X * log_y
+                            + Y * log_x
+                            - Z * atan_xy
+                        )
+                        # 2nd system
+                        Z = zp - prisms[m, 5 - k] + 2 * c_z
+                        rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+                        log_x = safe_log(X + rho)
+                        log_y = safe_log(Y + rho)
+                        log_z = safe_log(Z + rho)
+                        atan_xy = safe_atan2(X * Y, Z * rho)
+                        values[1] += sign * (
+                            Y * log_z
+                            + Z * log_y
+                            - X * safe_atan2(Y * Z, X * rho)
+                        )
+                        values[4] += sign * (
+                            X * log_z
+                            + Z * log_x
+                            - Y * safe_atan2(X * Z, Y * rho)
+                        )
+                        values[7] += sign * (
+                            X * log_y
+                            + Y * log_x
+                            - Z * atan_xy
+                        )
+                        values[2] += sign * (2 * zp * log_y)
+                        values[5] += sign * (2 * zp * log_x)
+                        values[8] += sign * (2 * zp * (- atan_xy))
+            # Rank-one update of the (9, n_steps) block of the point
+            for s in range(9):
+                for t in range(pressure.shape[0]):
+                    total[s, t] += values[s] * pressure[t, m]
+        for s in range(9):
+            for t in range(pressure.shape[0]):
+                out[s, t, l] += total[s, t]
+
+
+jit_displacement_components = njit(cache=True)(_displacement_components_loop)
+jit_displacement_components_parallel = njit(parallel=True, cache=True)(
+    _displacement_components_loop
+)
+
+
+def _stress_components_loop(coordinates, prisms, pressure, out):
+    """
+    Compute the sub-kernel fields of the three stress components at the
+    computation points in a single sweep
+
+    Parameters
+    ----------
+    coordinates : 1d array
+        1d array containing ``y``, ``x`` and ``z`` Cartesian coordinates of the
+        computation points (in meters).
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 2d array
+        2d array with shape (n_steps, n_prisms) containing the pressure of
+        each prism in MPa.
+    out : 3d-array
+        Array with shape (9, n_steps, n_points) where the fields produced by
+        the kernels ``s_xz1``, ``s_xz2``, ``s_xzz2``, ``s_yz1``, ``s_yz2``,
+        ``s_yzz2``, ``s_zz1``, ``s_zz2`` and ``s_zzz2`` will be stored, in
+        this order.
+    """
+    # Iterate over computation points and prisms
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        values = np.empty(9)
+        # Sub-kernel fields of the point, added in double precision
+        total = np.zeros((9, pressure.shape[0]))
+        for m in range(prisms.shape[0]):
+            c_z = 0.5 * (prisms[m, 4] + prisms[m, 5])
+            values[:] = 0.0
+            for i in range(2):
+                for j in range(2):
+                    for k in range(2):
+                        Y = yp - prisms[m, 1 - i]
+                        X = xp - prisms[m, 3 - j]
+                        sign = (-1) ** (i + j + k)
+                        # 1st system
+                        Z = zp - prisms[m, 5 - k]
+                        rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+                        values[0] += sign * safe_log(Y + rho)
+                        values[3] += sign * safe_log(X + rho)
+                        values[6] += sign * (
+                            - safe_atan2(X * Y, Z * rho)
+                        )
+                        # 2nd system
+                        Z = zp - prisms[m, 5 - k] + 2 * c_z
+                        X2 = X ** 2
+                        Y2 = Y ** 2
+                        Z2 = Z ** 2
+                        rho = np.sqrt(Y2 + X2 + Z2)
+                        values[1] += sign * safe_log(Y + rho)
+                        values[4] += sign * safe_log(X + rho)
+                        values[7] += sign * (
+                            - safe_atan2(X * Y, Z * rho)
+                        )
+                        values[2] += sign * (
+                            2 * zp * (- (Y * Z)/(rho * (X2 + Z2)))
+                        )
+                        values[5] += sign * (
+                            2 * zp * (- (X * Z)/(rho * (Y2 + Z2)))
+                        )
+                        values[8] += sign * (
+                            2 * zp * (
+                                ((X * Y)/rho)*((1./(X2 + Z2)) + (1./(Y2 + Z2)))
+                            )
+                        )
+            # Rank-one update of the (9, n_steps) block of the point
+            for s in range(9):
+                for t in range(pressure.shape[0]):
+                    total[s, t] += values[s] * pressure[t, m]
+        for s in range(9):
+            for t in range(pressure.shape[0]):
+                out[s, t, l] += total[s, t]
+
+
+jit_stress_components = njit(cache=True)(_stress_components_loop)
+jit_stress_components_parallel = njit(parallel=True, cache=True)(
+    _stress_components_loop
+)
+
+
+@njit(cache=True)
+def kernel_d_x1(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for x-component of displacement in the infinite space domain
+    (1st system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        Y * safe_log(Z + rho)
+        + Z * safe_log(Y + rho)
+        - X * safe_atan2(Y * Z, X * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_d_y1(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for y-component of displacement in the infinite space domain
+    (1st system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        X * safe_log(Z + rho)
+        + Z * safe_log(X + rho)
+        - Y * safe_atan2(X * Z, Y * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_d_z1(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for z-component of displacement in the infinite space domain
+    (1st system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        X * safe_log(Y + rho)
+        + Y * safe_log(X + rho)
+        - Z * safe_atan2(X * Y, Z * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_d_x2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for x-component of displacement in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        Y * safe_log(Z + rho)
+        + Z * safe_log(Y + rho)
+        - X * safe_atan2(Y * Z, X * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_d_y2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for y-component of displacement in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        X * safe_log(Z + rho)
+        + Z * safe_log(X + rho)
+        - Y * safe_atan2(X * Z, Y * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_d_z2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for z-component of displacement in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        X * safe_log(Y + rho)
+        + Y * safe_log(X + rho)
+        - Z * safe_atan2(X * Y, Z * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_d_xz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for xz-component of displacement in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * (
+        safe_log(Y + rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_d_yz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for yz-component of displacement in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * (
+        safe_log(X + rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_d_zz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for zz-component of displacement in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * (
+        - safe_atan2(X * Y, Z * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_xz1(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for xz-component of stress in the infinite space domain (1st system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        safe_log(Y + rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_yz1(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for yz-component of stress in the infinite space domain (1st system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        safe_log(X + rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_zz1(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for zz-component of stress in the infinite space domain (1st system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        - safe_atan2(X * Y, Z * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_xz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for xz-component of stress in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        safe_log(Y + rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_yz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for yz-component of stress in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        safe_log(X + rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_zz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for zz-component of stress in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (
+        - safe_atan2(X * Y, Z * rho)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_xzz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for xzz-component of stress in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    aux = X ** 2 + Z ** 2
+    rho = np.sqrt(Y ** 2 + aux)
+    kernel = 2 * zp * (
+        - (Y * Z)/(rho * aux)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_yzz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for yzz-component of stress in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    aux = Y ** 2 + Z ** 2
+    rho = np.sqrt(X ** 2 + aux)
+    kernel = 2 * zp * (
+        - (X * Z)/(rho * aux)
+    )
+    return kernel
+
+
+@njit(cache=True)
+def kernel_s_zzz2(y, x, z, zc, yp, xp, zp):
+    """
+    Kernel for zzz-component of stress in the semi-infinite space domain
+    (2nd system)
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    X2 = X ** 2
+    Y2 = Y ** 2
+    Z2 = Z ** 2
+    rho = np.sqrt(X2 + Y2 + Z2)
+    kernel = 2 * zp * (
+        ((X * Y)/rho)*((1./(X2 + Z2)) + (1./(Y2 + Z2)))
+    )
+    return kernel
+
+
+# Kernels available for computing the field components
+KERNELS = {
+    "d_x1": kernel_d_x1,
+    "d_y1": kernel_d_y1,
+    "d_z1": kernel_d_z1,
+    "d_x2": kernel_d_x2,
+    "d_y2": kernel_d_y2,
+    "d_z2": kernel_d_z2,
+    "d_xz2": kernel_d_xz2,
+    "d_yz2": kernel_d_yz2,
+    "d_zz2": kernel_d_zz2,
+    "s_xz1": kernel_s_xz1,
+    "s_yz1": kernel_s_yz1,
+    "s_zz1": kernel_s_zz1,
+    "s_xz2": kernel_s_xz2,
+    "s_yz2": kernel_s_yz2,
+    "s_zz2": kernel_s_zz2,
+    "s_xzz2": kernel_s_xzz2,
+    "s_yzz2": kernel_s_yzz2,
+    "s_zzz2": kernel_s_zzz2
+}
+
+
+@njit(cache=True)
+def point_kernel_d_x1(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for
+    x-component of displacement in the infinite space domain (1st system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = -X/rho**3
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_d_y1(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for
+    y-component of displacement in the infinite space domain (1st system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = -Y/rho**3
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_d_z1(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for
+    z-component of displacement in the infinite space domain (1st system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = -Z/rho**3
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_d_x2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for
+    x-component of displacement in the semi-infinite space domain (2nd system),
+    per unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = -X/rho**3
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_d_y2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for
+    y-component of displacement in the semi-infinite space domain (2nd system),
+    per unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = -Y/rho**3
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_d_z2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for
+    z-component of displacement in the semi-infinite space domain (2nd system),
+    per unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = -Z/rho**3
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_d_xz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for xz-
+    component of displacement in the semi-infinite space domain (2nd system),
+    per unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * ((3*X*Z)/rho**5)
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_d_yz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for yz-
+    component of displacement in the semi-infinite space domain (2nd system),
+    per unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * ((3*Y*Z)/rho**5)
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_d_zz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for zz-
+    component of displacement in the semi-infinite space domain (2nd system),
+    per unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * ((3*(Z**2))/rho**5 - (1./rho**3))
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_xz1(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for xz-
+    component of stress in the infinite space domain (1st system), per unit
+    volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (3*X*Z)/rho**5
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_yz1(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for yz-
+    component of stress in the infinite space domain (1st system), per unit
+    volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (3*Y*Z)/rho**5
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_zz1(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for zz-
+    component of stress in the infinite space domain (1st system), per unit
+    volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp
+    Y = yp - y
+    X = xp - x
+    Z = zp - z
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (3*(Z**2))/rho**5 - (1./rho**3)
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_xz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for xz-
+    component of stress in the semi-infinite space domain (2nd system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (3*X*Z)/rho**5
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_yz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for yz-
+    component of stress in the semi-infinite space domain (2nd system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (3*Y*Z)/rho**5
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_zz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for zz-
+    component of stress in the semi-infinite space domain (2nd system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = (3*(Z**2))/rho**5 - (1./rho**3)
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_xzz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for xzz-
+    component of stress in the semi-infinite space domain (2nd system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * ((3*X)/rho**5 - (15*X*(Z**2))/rho**7)
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_yzz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for yzz-
+    component of stress in the semi-infinite space domain (2nd system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * ((3*Y)/rho**5 - (15*Y*(Z**2))/rho**7)
+    return kernel
+
+
+@njit(cache=True)
+def point_kernel_s_zzz2(y, x, z, zc, yp, xp, zp):
+    """
+    Point-source (nucleus of strain) approximation of the kernel for zzz-
+    component of stress in the semi-infinite space domain (2nd system), per
+    unit volume
+    """
+    # Y = y - yp
+    # X = x - xp
+    # Z = z - zp - 2 * zc
+    Y = yp - y
+    X = xp - x
+    Z = zp - z + 2 * zc
+    rho = np.sqrt(Y ** 2 + X ** 2 + Z ** 2)
+    kernel = 2 * zp * ((9*Z)/rho**5 - (15*(Z**3))/rho**7)
+    return kernel
+
+
+# Point-source approximations of the kernels (see field_component)
+POINT_KERNELS = {
+    "d_x1": point_kernel_d_x1,
+    "d_y1": point_kernel_d_y1,
+    "d_z1": point_kernel_d_z1,
+    "d_x2": point_kernel_d_x2,
+    "d_y2": point_kernel_d_y2,
+    "d_z2": point_kernel_d_z2,
+    "d_xz2": point_kernel_d_xz2,
+    "d_yz2": point_kernel_d_yz2,
+    "d_zz2": point_kernel_d_zz2,
+    "s_xz1": point_kernel_s_xz1,
+    "s_yz1": point_kernel_s_yz1,
+    "s_zz1": point_kernel_s_zz1,
+    "s_xz2": point_kernel_s_xz2,
+    "s_yz2": point_kernel_s_yz2,
+    "s_zz2": point_kernel_s_zz2,
+    "s_xzz2": point_kernel_s_xzz2,
+    "s_yzz2": point_kernel_s_yzz2,
+    "s_zzz2": point_kernel_s_zzz2
+}
+
+# Order of the derivatives of 1/r in the point-source approximations
+KERNEL_ORDERS = {
+    "d_x1": 1,
+    "d_y1": 1,
+    "d_z1": 1,
+    "d_x2": 1,
+    "d_y2": 1,
+    "d_z2": 1,
+    "d_xz2": 2,
+    "d_yz2": 2,
+    "d_zz2": 2,
+    "s_xz1": 2,
+    "s_yz1": 2,
+    "s_zz1": 2,
+    "s_xz2": 2,
+    "s_yz2": 2,
+    "s_zz2": 2,
+    "s_xzz2": 3,
+    "s_yzz2": 3,
+    "s_zzz2": 3
+}
+
+
+@njit(cache=True)
+def safe_atan2(numerator, denominator):
+    """
+    Principal value of the arctangent expressed as a two variable function
+
+    This modification has to be made to the arctangent function so the
+    harmonic field of the prism satisfies the Poisson's equation.
+    Therefore, it guarantees that the fields satisfies the symmetry properties
+    of the prism. This modified function has been defined according to
+    Fukushima (2019).
+    """
+    if denominator != 0:
+        result = np.arctan(numerator / denominator)
+    else:
+        if numerator > 0:
+            result = np.pi / 2
+        elif numerator < 0:
+            result = -np.pi / 2
+        else:
+            result = 0
+    return result
+
+
+@njit(cache=True)
+def safe_log(argument):
+    """
+    Modified log to return 0 for log(0).
+    The limits in the formula terms tend to 0 (see Nagy et al., 2000).
+    """
+    if np.abs(argument) < 1e-10:
+        result = 0
+    else:
+        result = np.log(argument)
+    return result
+
+
+# BEGIN GENERATED_LOOPS (see _specialized_loops_source)
+
+def _field_component_loop_d_x1(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_x1`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_x1(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_x1(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_x1(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_x1(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_x1(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_x1(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_x1(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_x1(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_x1 = njit(cache=True)(_field_component_loop_d_x1)
+jit_field_component_d_x1_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_x1
+)
+
+
+def _field_component_loop_d_y1(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_y1`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_y1(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_y1(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_y1(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_y1(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_y1(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_y1(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_y1(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_y1(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_y1 = njit(cache=True)(_field_component_loop_d_y1)
+jit_field_component_d_y1_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_y1
+)
+
+
+def _field_component_loop_d_z1(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_z1`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_z1(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_z1(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_z1(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_z1(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_z1(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_z1(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_z1(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_z1(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_z1 = njit(cache=True)(_field_component_loop_d_z1)
+jit_field_component_d_z1_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_z1
+)
+
+
+def _field_component_loop_d_x2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_x2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_x2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_x2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_x2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_x2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_x2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_x2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_x2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_x2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_x2 = njit(cache=True)(_field_component_loop_d_x2)
+jit_field_component_d_x2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_x2
+)
+
+
+def _field_component_loop_d_y2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_y2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_y2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_y2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_y2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_y2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_y2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_y2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_y2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_y2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_y2 = njit(cache=True)(_field_component_loop_d_y2)
+jit_field_component_d_y2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_y2
+)
+
+
+def _field_component_loop_d_z2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_z2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_z2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_z2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_z2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_z2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_z2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_z2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_z2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_z2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_z2 = njit(cache=True)(_field_component_loop_d_z2)
+jit_field_component_d_z2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_z2
+)
+
+
+def _field_component_loop_d_xz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_xz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_xz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_xz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_xz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_xz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_xz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_xz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_xz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_xz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_xz2 = njit(cache=True)(_field_component_loop_d_xz2)
+jit_field_component_d_xz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_xz2
+)
+
+
+def _field_component_loop_d_yz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_yz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_yz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_yz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_yz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_yz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_yz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_yz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_yz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_yz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_yz2 = njit(cache=True)(_field_component_loop_d_yz2)
+jit_field_component_d_yz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_yz2
+)
+
+
+def _field_component_loop_d_zz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``d_zz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_d_zz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_d_zz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_d_zz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_d_zz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_d_zz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_d_zz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_d_zz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_d_zz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_d_zz2 = njit(cache=True)(_field_component_loop_d_zz2)
+jit_field_component_d_zz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_d_zz2
+)
+
+
+def _field_component_loop_s_xz1(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_xz1`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_xz1(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_xz1(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_xz1(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_xz1(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_xz1(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_xz1(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_xz1(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_xz1(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_xz1 = njit(cache=True)(_field_component_loop_s_xz1)
+jit_field_component_s_xz1_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_xz1
+)
+
+
+def _field_component_loop_s_yz1(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_yz1`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_yz1(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_yz1(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_yz1(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_yz1(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_yz1(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_yz1(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_yz1(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_yz1(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_yz1 = njit(cache=True)(_field_component_loop_s_yz1)
+jit_field_component_s_yz1_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_yz1
+)
+
+
+def _field_component_loop_s_zz1(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_zz1`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_zz1(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_zz1(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_zz1(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_zz1(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_zz1(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_zz1(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_zz1(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_zz1(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_zz1 = njit(cache=True)(_field_component_loop_s_zz1)
+jit_field_component_s_zz1_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_zz1
+)
+
+
+def _field_component_loop_s_xz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_xz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_xz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_xz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_xz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_xz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_xz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_xz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_xz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_xz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_xz2 = njit(cache=True)(_field_component_loop_s_xz2)
+jit_field_component_s_xz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_xz2
+)
+
+
+def _field_component_loop_s_yz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_yz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_yz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_yz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_yz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_yz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_yz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_yz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_yz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_yz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_yz2 = njit(cache=True)(_field_component_loop_s_yz2)
+jit_field_component_s_yz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_yz2
+)
+
+
+def _field_component_loop_s_zz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_zz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_zz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_zz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_zz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_zz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_zz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_zz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_zz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_zz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_zz2 = njit(cache=True)(_field_component_loop_s_zz2)
+jit_field_component_s_zz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_zz2
+)
+
+
+def _field_component_loop_s_xzz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_xzz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_xzz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_xzz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_xzz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_xzz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_xzz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_xzz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_xzz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_xzz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_xzz2 = njit(cache=True)(_field_component_loop_s_xzz2)
+jit_field_component_s_xzz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_xzz2
+)
+
+
+def _field_component_loop_s_yzz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_yzz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_yzz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_yzz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_yzz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_yzz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_yzz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_yzz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_yzz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_yzz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_yzz2 = njit(cache=True)(_field_component_loop_s_yzz2)
+jit_field_component_s_yzz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_yzz2
+)
+
+
+def _field_component_loop_s_zzz2(coordinates, prisms, pressure, out):
+    """
+    Compute the field component of the kernel ``s_zzz2`` at the computation
+    points (see ``_field_component_loop``)
+    """
+    for l in prange(coordinates[0].size):
+        yp = coordinates[0][l]
+        xp = coordinates[1][l]
+        zp = coordinates[2][l]
+        total = np.zeros(pressure.shape[0])
+        for m in range(prisms.shape[0]):
+            y1 = prisms[m, 0]
+            y2 = prisms[m, 1]
+            x1 = prisms[m, 2]
+            x2 = prisms[m, 3]
+            z2 = prisms[m, 4]
+            z1 = prisms[m, 5]
+            c_z = 0.5 * (z2 + z1)
+            value = (
+                kernel_s_zzz2(y2, x2, z1, c_z, yp, xp, zp)
+                - kernel_s_zzz2(y2, x2, z2, c_z, yp, xp, zp)
+                - kernel_s_zzz2(y2, x1, z1, c_z, yp, xp, zp)
+                + kernel_s_zzz2(y2, x1, z2, c_z, yp, xp, zp)
+                - kernel_s_zzz2(y1, x2, z1, c_z, yp, xp, zp)
+                + kernel_s_zzz2(y1, x2, z2, c_z, yp, xp, zp)
+                + kernel_s_zzz2(y1, x1, z1, c_z, yp, xp, zp)
+                - kernel_s_zzz2(y1, x1, z2, c_z, yp, xp, zp)
+            )
+            for t in range(pressure.shape[0]):
+                total[t] += pressure[t, m] * value
+        for t in range(pressure.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_field_component_s_zzz2 = njit(cache=True)(_field_component_loop_s_zzz2)
+jit_field_component_s_zzz2_parallel = njit(parallel=True, cache=True)(
+    _field_component_loop_s_zzz2
+)
+
+
+# Serial and parallel loops of field_component specialized for each kernel
+SPECIALIZED_LOOPS = {
+    "d_x1": (
+        jit_field_component_d_x1,
+        jit_field_component_d_x1_parallel
+    ),
+    "d_y1": (
+        jit_field_component_d_y1,
+        jit_field_component_d_y1_parallel
+    ),
+    "d_z1": (
+        jit_field_component_d_z1,
+        jit_field_component_d_z1_parallel
+    ),
+    "d_x2": (
+        jit_field_component_d_x2,
+        jit_field_component_d_x2_parallel
+    ),
+    "d_y2": (
+        jit_field_component_d_y2,
+        jit_field_component_d_y2_parallel
+    ),
+    "d_z2": (
+        jit_field_component_d_z2,
+        jit_field_component_d_z2_parallel
+    ),
+    "d_xz2": (
+        jit_field_component_d_xz2,
+        jit_field_component_d_xz2_parallel
+    ),
+    "d_yz2": (
+        jit_field_component_d_yz2,
+        jit_field_component_d_yz2_parallel
+    ),
+    "d_zz2": (
+        jit_field_component_d_zz2,
+        jit_field_component_d_zz2_parallel
+    ),
+    "s_xz1": (
+        jit_field_component_s_xz1,
+        jit_field_component_s_xz1_parallel
+    ),
+    "s_yz1": (
+        jit_field_component_s_yz1,
+        jit_field_component_s_yz1_parallel
+    ),
+    "s_zz1": (
+        jit_field_component_s_zz1,
+        jit_field_component_s_zz1_parallel
+    ),
+    "s_xz2": (
+        jit_field_component_s_xz2,
+        jit_field_component_s_xz2_parallel
+    ),
+    "s_yz2": (
+        jit_field_component_s_yz2,
+        jit_field_component_s_yz2_parallel
+    ),
+    "s_zz2": (
+        jit_field_component_s_zz2,
+        jit_field_component_s_zz2_parallel
+    ),
+    "s_xzz2": (
+        jit_field_component_s_xzz2,
+        jit_field_component_s_xzz2_parallel
+    ),
+    "s_yzz2": (
+        jit_field_component_s_yzz2,
+        jit_field_component_s_yzz2_parallel
+    ),
+    "s_zzz2": (
+        jit_field_component_s_zzz2,
+        jit_field_component_s_zzz2_parallel
+    )
+}
+# END GENERATED_LOOPS
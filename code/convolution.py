@@ -0,0 +1,351 @@
+"""
+Forward modelling of elastic reservoir deformation on regular horizontal
+grids of computation points by using the fast Fourier transform (FFT).
+
+When the prisms are the cells of a grid with uniform horizontal spacing and
+the computation points form a regular horizontal grid at a constant depth,
+the kernels integrated over the prisms depend only on the horizontal offsets
+between computation points and vertices of the grid (the 1st system depends
+on ``zp - z`` and the 2nd system on ``zp - z + 2*zc``). Each layer of prisms
+then produces a field given by the 2D discrete convolution of the weights of
+its vertices (see ``shared_vertex``) with the kernel evaluated on a lattice
+of offsets. The convolution is computed with the FFT, so that the cost is
+O(N log N) instead of O(N_points x N_prisms).
+
+The grids of prisms and computation points must have commensurate spacings
+(their ratio must be a fraction with small numerator and denominator) so
+that both can be embedded in a common lattice. In any other case, the
+functions of this module fall back to the direct computation performed by
+``compaction``.
+"""
+
+from fractions import Fraction
+
+import numpy as np
+from numba import njit
+import compaction as cp
+import sensitivity as sens
+import shared_vertex as sv
+
+# Largest numerator or denominator of the ratio between the spacings of the
+# computation points and the prisms
+MAX_RATIO = 16
+
+
+def field_component(
+    coordinates, prisms, pressure, poisson, young, kernel, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None
+):
+    """
+    Displacement and stress components produced by pore-pressure variations in
+    right-rectangular prisms computed with the FFT.
+
+    Falls back to ``compaction.field_component`` if the prisms and the
+    computation points are not regular grids with commensurate spacings.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters. The
+        points must form a regular horizontal grid at a constant depth.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters. The prisms
+        must be cells of a grid with uniform horizontal spacing.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+    kernel : str
+        Kernel used for computing the desired field component. See
+        ``compaction.field_component`` for the available kernels.
+    dtype : data-type (optional)
+        Data type assigned to the resulting field component. Default to
+        ``np.float64``.
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    parallel, n_threads : optional
+        Used only by the direct computation (see
+        ``compaction.field_component``).
+
+    Returns
+    -------
+    result : array
+        Field component generated by the prisms at the computation points.
+    """
+    if kernel not in cp.KERNELS:
+        raise ValueError("Kernel {} not recognized".format(kernel))
+    fields = _convolution_fields(
+        coordinates, prisms, pressure, poisson, young, [kernel], dtype,
+        disable_checks
+    )
+    if fields is None:
+        return cp.field_component(
+            coordinates, prisms, pressure, poisson, young, kernel, dtype,
+            disable_checks, parallel, n_threads
+        )
+    return fields[0]
+
+
+def displacement_components(
+    coordinates, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None
+):
+    """
+    x, y and z components of the displacement field computed with the FFT.
+
+    Falls back to ``compaction.displacement_components`` if the prisms and
+    the computation points are not regular grids with commensurate spacings.
+    See ``field_component`` for a description of the parameters.
+
+    Returns
+    -------
+    d_x, d_y, d_z : arrays
+        x, y and z components of the displacement field generated by the
+        prisms at the computation points.
+    """
+    fields = _convolution_fields(
+        coordinates, prisms, pressure, poisson, young,
+        ["displacement_x", "displacement_y", "displacement_z"], dtype,
+        disable_checks
+    )
+    if fields is None:
+        return cp.displacement_components(
+            coordinates, prisms, pressure, poisson, young, dtype,
+            disable_checks, parallel, n_threads
+        )
+    return tuple(fields)
+
+
+def stress_components(
+    coordinates, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None
+):
+    """
+    x, y and z components of the stress field computed with the FFT.
+
+    Falls back to ``compaction.stress_components`` if the prisms and the
+    computation points are not regular grids with commensurate spacings.
+    See ``field_component`` for a description of the parameters.
+
+    Returns
+    -------
+    s_x, s_y, s_z : arrays
+        x, y and z components of the stress field generated by the prisms at
+        the computation points.
+    """
+    fields = _convolution_fields(
+        coordinates, prisms, pressure, poisson, young,
+        ["stress_x", "stress_y", "stress_z"], dtype, disable_checks
+    )
+    if fields is None:
+        return cp.stress_components(
+            coordinates, prisms, pressure, poisson, young, dtype,
+            disable_checks, parallel, n_threads
+        )
+    return tuple(fields)
+
+
+def _convolution_fields(
+    coordinates, prisms, pressure, poisson, young, fields, dtype,
+    disable_checks
+):
+    """
+    Compute a sequence of fields (see ``sensitivity.field_terms``) with the
+    FFT. Returns ``None`` if the FFT cannot be used.
+    """
+    shape, coordinates, prisms, pressure = cp._prepare_arguments(
+        coordinates, prisms, pressure, disable_checks
+    )
+    layout = convolution_layout(coordinates, prisms, pressure)
+    if layout is None:
+        return None
+    lattice_y, lattice_x, point_indices, (z_edges, weights) = layout
+    zp = coordinates[2][0]
+    y_offsets, ratio_y = lattice_y
+    x_offsets, ratio_x = lattice_x
+    n_vy = (weights.shape[-2] - 1)*ratio_y + 1
+    n_vx = (weights.shape[-1] - 1)*ratio_x + 1
+    fft_shape = (y_offsets.size + n_vy - 1, x_offsets.size + n_vx - 1)
+    results = []
+    for field in fields:
+        terms = sens.field_terms(field, poisson, young)
+        spectrum = np.zeros(
+            (pressure.shape[0], fft_shape[0], fft_shape[1]//2 + 1),
+            dtype="complex128"
+        )
+        for layer in range(z_edges.size - 1):
+            top, bottom = z_edges[layer], z_edges[layer + 1]
+            response = np.zeros((y_offsets.size, x_offsets.size))
+            for kernel, coefficient in terms:
+                jit_kernel_lattice(
+                    cp.KERNELS[kernel], y_offsets, x_offsets, top, bottom,
+                    0.5*(top + bottom), zp, coefficient, response
+                )
+            vertex_weights = np.zeros((pressure.shape[0], n_vy, n_vx))
+            vertex_weights[:, ::ratio_y, ::ratio_x] = weights[:, layer]
+            spectrum += (
+                np.fft.rfft2(response, s=fft_shape)
+                * np.fft.rfft2(vertex_weights, s=fft_shape)
+            )
+        lattice = np.fft.irfft2(spectrum, s=fft_shape)
+        # The full convolution is shifted by the number of vertices
+        result = lattice[
+            :, point_indices[0] + n_vy - 1, point_indices[1] + n_vx - 1
+        ]
+        results.append(result.astype(dtype).reshape(shape))
+    return results
+
+
+def convolution_layout(coordinates, prisms, pressure):
+    """
+    Embed the prisms and the computation points in a common horizontal
+    lattice.
+
+    Parameters
+    ----------
+    coordinates : tuple of 1d-arrays
+        Raveled ``y``, ``x`` and ``z`` coordinates of the computation points.
+    prisms : 2d-array
+        Boundaries of the prisms.
+    pressure : 2d-array
+        Pressure of each prism with shape (``n_steps``, ``n_prisms``).
+
+    Returns
+    -------
+    layout : tuple or None
+        ``None`` if the FFT cannot be used. Otherwise, a tuple containing:
+        the offsets between computation points and vertices along ``y`` and
+        the spacing ratio of the vertices in lattice units; the same for
+        ``x``; the lattice indices of each computation point; the edges of
+        the layers along ``z`` and the horizontal weights of the vertices of
+        each layer with shape (``n_steps``, ``nz``, ``ny + 1``, ``nx + 1``).
+    """
+    y, x, z = coordinates
+    if np.ptp(z) != 0:
+        return None
+    try:
+        y_edges, x_edges, z_edges, pressure_grid = sv.grid_from_prisms(
+            prisms, pressure
+        )
+    except ValueError:
+        return None
+    # The computation points must be all the nodes of a regular grid
+    y_nodes, iy = np.unique(y, return_inverse=True)
+    x_nodes, ix = np.unique(x, return_inverse=True)
+    if y_nodes.size*x_nodes.size != y.size:
+        return None
+    if np.unique(iy*x_nodes.size + ix).size != y.size:
+        return None
+    lattice_y = _lattice(y_nodes, y_edges)
+    lattice_x = _lattice(x_nodes, x_edges)
+    if lattice_y is None or lattice_x is None:
+        return None
+    (y_offsets, ratio_y, step_y), (x_offsets, ratio_x, step_x) = (
+        lattice_y, lattice_x
+    )
+    # Fall back to the direct computation if it requires fewer kernel
+    # evaluations (two per lattice node and layer against eight per point
+    # and prism)
+    n_lattice = y_offsets.size*x_offsets.size*(z_edges.size - 1)
+    if 2*n_lattice > 8*y.size*prisms.shape[0]:
+        return None
+    padded = np.pad(pressure_grid, ((0, 0), (0, 0), (1, 1), (1, 1)))
+    weights = (
+        padded[..., :-1, :-1] - padded[..., :-1, 1:]
+        - padded[..., 1:, :-1] + padded[..., 1:, 1:]
+    )
+    point_indices = (iy*step_y, ix*step_x)
+    return (
+        (y_offsets, ratio_y), (x_offsets, ratio_x), point_indices,
+        (z_edges, weights)
+    )
+
+
+def _lattice(nodes, edges):
+    """
+    Common lattice of the computation points and the vertices along one
+    horizontal direction.
+
+    Returns ``None`` if the spacings are not uniform or not commensurate.
+    Otherwise, returns the offsets ``nodes[0] - edges[0] + p*h`` for all the
+    lattice indices ``p`` between the last vertex and the last node, the
+    spacing of the vertices and the spacing of the nodes in lattice units.
+    """
+    edge_spacing = _uniform_spacing(edges)
+    if edge_spacing is None:
+        return None
+    if nodes.size == 1:
+        node_spacing = edge_spacing
+    else:
+        node_spacing = _uniform_spacing(nodes)
+        if node_spacing is None:
+            return None
+    ratio = Fraction(node_spacing/edge_spacing).limit_denominator(MAX_RATIO)
+    if ratio.numerator > MAX_RATIO or not np.isclose(
+        float(ratio), node_spacing/edge_spacing, rtol=1e-9, atol=0
+    ):
+        return None
+    # Lattice spacing and spacings of vertices and nodes in lattice units
+    h = edge_spacing/ratio.denominator
+    edge_step, node_step = ratio.denominator, ratio.numerator
+    n_vertices = (edges.size - 1)*edge_step + 1
+    n_nodes = (nodes.size - 1)*node_step + 1
+    p = np.arange(-(n_vertices - 1), n_nodes)
+    offsets = nodes[0] - edges[0] + p*h
+    return offsets, edge_step, node_step
+
+
+def _uniform_spacing(values):
+    """
+    Spacing of sorted values, or ``None`` if it is not uniform.
+    """
+    if values.size < 2:
+        return None
+    spacing = np.diff(values)
+    if not np.allclose(spacing, spacing[0], rtol=1e-9, atol=0):
+        return None
+    return (values[-1] - values[0])/(values.size - 1)
+
+
+@njit(cache=True)
+def jit_kernel_lattice(
+    kernel, y_offsets, x_offsets, top, bottom, c_z, zp, coefficient, out
+):
+    """
+    Evaluate the kernel at the top minus the kernel at the bottom of a layer
+    on a lattice of horizontal offsets
+
+    Parameters
+    ----------
+    kernel : func
+        Kernel function to be used for computing the desired field component.
+    y_offsets, x_offsets : 1d-arrays
+        Horizontal offsets ``yp - y`` and ``xp - x`` between the computation
+        points and the vertices.
+    top, bottom : float
+        Depths of the top and bottom of the layer.
+    c_z : float
+        Depth of the center of the layer.
+    zp : float
+        Depth of the computation points.
+    coefficient : float
+        Coefficient multiplying the kernel.
+    out : 2d-array
+        Array with shape (``y_offsets.size``, ``x_offsets.size``) where the
+        results will be added.
+    """
+    for p in range(y_offsets.size):
+        for q in range(x_offsets.size):
+            out[p, q] += coefficient * (
+                kernel(0., 0., top, c_z, y_offsets[p], x_offsets[q], zp)
+                - kernel(0., 0., bottom, c_z, y_offsets[p], x_offsets[q], zp)
+            )
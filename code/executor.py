@@ -0,0 +1,288 @@
+"""
+Forward modelling of elastic reservoir deformation split among worker
+processes.
+
+The computation points or the prisms are divided into contiguous blocks,
+which are computed by a pool of worker processes with the functions of
+``compaction``. The computation points, prisms and pressure are copied once
+into shared memory blocks (or into memory-mapped temporary files, with
+Python < 3.8), which the workers attach to when they start, so the arrays
+are not sent to the workers with every block.
+
+The results of the blocks are merged in the order of the blocks,
+independently of the order in which the workers finish them. When the
+prisms are split, the partial fields are added in this order, so the result
+depends only on the number of blocks and not on the number of workers or on
+their scheduling.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import tempfile
+import numpy as np
+import compaction as cp
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8: the arrays are shared through memory-mapped files
+    shared_memory = None
+
+
+# Arrays in shared memory attached by each worker process
+_SHARED = {}
+
+
+def field_component(
+    coordinates, prisms, pressure, poisson, young, kernel, n_workers=None,
+    split="points", n_blocks=None, dtype="float64", disable_checks=False,
+    tolerance=None, mp_context=None
+):
+    """
+    Displacement and stress components produced by pore-pressure variations in
+    right-rectangular prisms computed by multiple processes.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+    kernel : str
+        Kernel used for computing the desired field component. See
+        ``compaction.field_component`` for the available kernels.
+    n_workers : int or None (optional)
+        Number of worker processes. If ``None``, the number of CPUs is used.
+        Default to ``None``.
+    split : str (optional)
+        Whether the computation is split by blocks of computation points
+        (``"points"``) or by blocks of prisms (``"prisms"``). In the latter
+        case, the partial fields of the blocks are added.
+        Default to ``"points"``.
+    n_blocks : int or None (optional)
+        Number of blocks. If ``None``, one block per worker is used.
+        Default to ``None``.
+    dtype : data-type (optional)
+        Data type assigned to the resulting field component. Default to
+        ``np.float64``.
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    tolerance : float or None (optional)
+        Tolerance of the far-field approximation (see
+        ``compaction.field_component``). Default to ``None``.
+    mp_context : multiprocessing context or None (optional)
+        Context used to start the worker processes (e.g.,
+        ``multiprocessing.get_context("fork")``). If ``None``, the workers
+        are spawned, because forking a process after the parallel loops of
+        Numba have run may deadlock. Default to ``None``.
+
+    Returns
+    -------
+    result : array
+        Field component generated by the prisms at the computation points.
+    """
+    if kernel not in cp.KERNELS:
+        raise ValueError("Kernel {} not recognized".format(kernel))
+    return _map_blocks(
+        "field_component", (poisson, young, kernel),
+        dict(dtype=dtype, tolerance=tolerance), coordinates, prisms,
+        pressure, n_workers, split, n_blocks, disable_checks, mp_context
+    )[0]
+
+
+def displacement_components(
+    coordinates, prisms, pressure, poisson, young, n_workers=None,
+    split="points", n_blocks=None, dtype="float64", disable_checks=False,
+    mp_context=None
+):
+    """
+    x, y and z components of the displacement field computed by multiple
+    processes.
+
+    See ``field_component`` for a description of the parameters.
+
+    Returns
+    -------
+    d_x, d_y, d_z : arrays
+        x, y and z components of the displacement field generated by the
+        prisms at the computation points.
+    """
+    return _map_blocks(
+        "displacement_components", (poisson, young), dict(dtype=dtype),
+        coordinates, prisms, pressure, n_workers, split, n_blocks,
+        disable_checks, mp_context
+    )
+
+
+def stress_components(
+    coordinates, prisms, pressure, poisson, young, n_workers=None,
+    split="points", n_blocks=None, dtype="float64", disable_checks=False,
+    mp_context=None
+):
+    """
+    x, y and z components of the stress field computed by multiple processes.
+
+    See ``field_component`` for a description of the parameters.
+
+    Returns
+    -------
+    s_x, s_y, s_z : arrays
+        x, y and z components of the stress field generated by the prisms at
+        the computation points.
+    """
+    return _map_blocks(
+        "stress_components", (poisson, young), dict(dtype=dtype),
+        coordinates, prisms, pressure, n_workers, split, n_blocks,
+        disable_checks, mp_context
+    )
+
+
+def _map_blocks(
+    function, args, kwargs, coordinates, prisms, pressure, n_workers, split,
+    n_blocks, disable_checks, mp_context
+):
+    """
+    Compute a function of ``compaction`` over blocks of computation points
+    or prisms with a pool of worker processes and merge the results.
+
+    Returns
+    -------
+    results : tuple of arrays
+        Results of the function with the shape of the computation points,
+        preceded by the number of time steps if ``pressure`` is a 2d array.
+    """
+    if split not in ("points", "prisms"):
+        raise ValueError(
+            "Invalid split '{}'. ".format(split)
+            + "It must be 'points' or 'prisms'."
+        )
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    if n_blocks is None:
+        n_blocks = n_workers
+    if mp_context is None:
+        mp_context = multiprocessing.get_context("spawn")
+    if n_workers < 1 or n_blocks < 1:
+        raise ValueError(
+            "Invalid number of workers ({}) ".format(n_workers)
+            + "or blocks ({}). They must be positive.".format(n_blocks)
+        )
+    shape, coordinates, prisms, pressure = cp._prepare_arguments(
+        coordinates, prisms, pressure, disable_checks
+    )
+    size = coordinates[0].size if split == "points" else prisms.shape[0]
+    bounds = np.linspace(0, size, min(n_blocks, max(size, 1)) + 1)
+    bounds = bounds.astype(int)
+    arrays = {
+        "coordinates": np.vstack(coordinates).astype(np.float64),
+        "prisms": prisms.astype(np.float64),
+        "pressure": pressure.astype(np.float64),
+    }
+    memories = []
+    directory = None
+    try:
+        descriptors = {}
+        if shared_memory is None:
+            directory = tempfile.TemporaryDirectory()
+        for name, array in arrays.items():
+            if shared_memory is None:
+                # Empty arrays can't be memory-mapped, so they are copied
+                descriptors[name] = array
+                if array.size:
+                    descriptors[name] = os.path.join(
+                        directory.name, name + ".npy"
+                    )
+                    np.save(descriptors[name], array)
+                continue
+            memory = shared_memory.SharedMemory(
+                create=True, size=max(array.nbytes, 1)
+            )
+            memories.append(memory)
+            np.ndarray(array.shape, array.dtype, buffer=memory.buf)[:] = array
+            descriptors[name] = (memory.name, array.shape, array.dtype.str)
+        with ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=mp_context,
+            initializer=_attach, initargs=(descriptors,)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _compute_block, function, split, start, stop, args,
+                    kwargs
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            # Collected in the order of the blocks
+            blocks = [future.result() for future in futures]
+    finally:
+        for memory in memories:
+            memory.close()
+            memory.unlink()
+        if directory is not None:
+            directory.cleanup()
+    if split == "points":
+        merged = np.concatenate(blocks, axis=-1)
+    else:
+        merged = blocks[0]
+        for block in blocks[1:]:
+            merged += block
+    return tuple(result.reshape(shape) for result in merged)
+
+
+def _attach(descriptors):
+    """
+    Attach a worker process to the arrays in shared memory.
+    """
+    for name, descriptor in descriptors.items():
+        if isinstance(descriptor, np.ndarray):
+            _SHARED[name] = (None, descriptor)
+            continue
+        if isinstance(descriptor, str):
+            _SHARED[name] = (None, np.load(descriptor, mmap_mode="r"))
+            continue
+        memory_name, shape, dtype = descriptor
+        memory = shared_memory.SharedMemory(name=memory_name)
+        _SHARED[name] = (
+            memory, np.ndarray(shape, np.dtype(dtype), buffer=memory.buf)
+        )
+
+
+def _compute_block(function, split, start, stop, args, kwargs):
+    """
+    Compute a block of computation points or prisms in a worker process.
+
+    Returns
+    -------
+    result : 3d-array
+        Results of the function with shape (``n_results``, ``n_steps``,
+        ``n_points``).
+    """
+    coordinates = _SHARED["coordinates"][1]
+    prisms = _SHARED["prisms"][1]
+    pressure = _SHARED["pressure"][1]
+    if split == "points":
+        coordinates = coordinates[:, start:stop]
+    else:
+        prisms = prisms[start:stop]
+        pressure = pressure[:, start:stop]
+    # The workers run serially to avoid oversubscribing the CPUs
+    result = getattr(cp, function)(
+        coordinates, prisms, pressure, *args, disable_checks=True,
+        parallel=False, **kwargs
+    )
+    if not isinstance(result, tuple):
+        result = (result,)
+    return np.stack(result)
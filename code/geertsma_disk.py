@@ -4,7 +4,7 @@ disk-shaped reservoir.
 
 The displacement and stress components are computed by using the Geertsma's
 model (Fjær et al., 2008, Appendix D-5). The equations are valid outside the
-reservoir.
+reservoir. SciPy is only imported when the elliptic integrals are computed.
 
 References
 ----------
@@ -15,7 +15,6 @@ Petroleum Related Rock Mechanics. Elsevier, 2nd edition. ISBN:978-0-444-50260-5
 """
 
 import numpy as np
-from scipy.special import ellipk, ellipe, ellipkinc, ellipeinc
 from compaction import Cm
 
 
@@ -160,6 +159,7 @@ def Int1(q, r , R):
     '''
     Integral I1.
     '''
+    ellipk, ellipe, ellipkinc, ellipeinc = _elliptic_integrals()
     m = 4*R*r/(q**2 + (r+R)**2)
 
     K = ellipk(m) # Complete elliptic integral of the first kind
@@ -173,6 +173,7 @@ def Int2(q, r , R):
     '''
     Integral I2.
     '''
+    ellipk, ellipe, ellipkinc, ellipeinc = _elliptic_integrals()
     m = 4*R*r/(q**2 + (r+R)**2)
 
     K = ellipk(m) # Complete elliptic integral of the first kind
@@ -186,6 +187,7 @@ def Int3(q, r , R):
     '''
     Integral I3.
     '''
+    ellipk, ellipe, ellipkinc, ellipeinc = _elliptic_integrals()
     m = 4*R*r/(q**2 + (r+R)**2)
 
     K0 = ellipk(m) # Complete elliptic integral of the first kind
@@ -211,6 +213,7 @@ def Int4(q, r , R):
     '''
     Integral I4.
     '''
+    ellipk, ellipe, ellipkinc, ellipeinc = _elliptic_integrals()
     m = 4*R*r/(q**2 + (r+R)**2)
 
     K0 = ellipk(m) # Complete elliptic integral of the first kind
@@ -226,6 +229,7 @@ def Int6(q, r , R):
     '''
     Integral I6.
     '''
+    ellipk, ellipe, ellipkinc, ellipeinc = _elliptic_integrals()
     m = 4*R*r/(q**2 + (r+R)**2)
 
     K0 = ellipk(m) # Complete elliptic integral of the first kind
@@ -243,3 +247,12 @@ def G(poisson, young):
     """
     result = young/(2*(1+poisson))
     return result
+
+
+def _elliptic_integrals():
+    '''
+    Complete and incomplete elliptic integrals of the first and second
+    kinds, imported from SciPy when they are first needed.
+    '''
+    from scipy.special import ellipk, ellipe, ellipkinc, ellipeinc
+    return ellipk, ellipe, ellipkinc, ellipeinc
@@ -15,7 +15,7 @@ Petroleum Related Rock Mechanics. Elsevier, 2nd edition. ISBN:978-0-444-50260-5
 
 import numpy as np
 from numba import njit
-from compaction import Cm
+from compaction import Cm, cell_edges
 
 
 def displacement_x_component(coordinates, nuclei, pressure, poisson, young):
@@ -226,7 +226,7 @@ def field_component(
 
 
 
-@njit
+@njit(cache=True)
 def jit_field_component(
     coordinates, nuclei, pressure, kernel, out
 ):
@@ -267,7 +267,7 @@ def jit_field_component(
                 )
             )
 
-@njit
+@njit(cache=True)
 def kernel_d_x1(y, x, z, yp, xp, zp):
     """
     Kernel for x-component of displacement in the infinite space domain
@@ -285,7 +285,7 @@ def kernel_d_x1(y, x, z, yp, xp, zp):
     return kernel
 
 
-@njit
+@njit(cache=True)
 def kernel_d_y1(y, x, z, yp, xp, zp):
     """
     Kernel for y-component of displacement in the infinite space domain
@@ -303,7 +303,7 @@ def kernel_d_y1(y, x, z, yp, xp, zp):
     return kernel
 
 
-@njit
+@njit(cache=True)
 def kernel_d_z1(y, x, z, yp, xp, zp):
     """
     Kernel for z-component of displacement in the infinite space domain
@@ -321,7 +321,7 @@ def kernel_d_z1(y, x, z, yp, xp, zp):
     return kernel
 
 
-@njit
+@njit(cache=True)
 def kernel_d_x2(y, x, z, yp, xp, zp):
     """
     Kernel for x-component of displacement in the semi-infinite space domain
@@ -339,7 +339,7 @@ def kernel_d_x2(y, x, z, yp, xp, zp):
     return kernel
 
 
-@njit
+@njit(cache=True)
 def kernel_d_y2(y, x, z, yp, xp, zp):
     """
     Kernel for y-component of displacement in the semi-infinite space domain
@@ -357,7 +357,7 @@ def kernel_d_y2(y, x, z, yp, xp, zp):
     return kernel
 
 
-@njit
+@njit(cache=True)
 def kernel_d_z2(y, x, z, yp, xp, zp):
     """
     Kernel for z-component of displacement in the semi-infinite space domain
@@ -375,7 +375,7 @@ def kernel_d_z2(y, x, z, yp, xp, zp):
     return kernel
 
 
-@njit
+@njit(cache=True)
 def kernel_d_xz2(y, x, z, yp, xp, zp):
     """
     Kernel for xz-component of displacement in the semi-infinite space domain
@@ -392,7 +392,7 @@ def kernel_d_xz2(y, x, z, yp, xp, zp):
     return kernel
 
 
-@njit
+@njit(cache=True)
 def kernel_d_yz2(y, x, z, yp, xp, zp):
     """
     Kernel for yz-component of displacement in the semi-infinite space domain
@@ -409,7 +409,7 @@ def kernel_d_yz2(y, x, z, yp, xp, zp):
     return kernel
 
 
-@njit
+@njit(cache=True)
 def kernel_d_zz2(y, x, z, yp, xp, zp):
     """
     Kernel for zz-component of displacement in the semi-infinite space domain
@@ -433,20 +433,11 @@ def nuclei_layer_rectangular(region, shape, z0):
     y1, y2, x1, x2 = region
     assert y2 > y1, 'y2 must be greater than y1'
     assert x2 > x1, 'x2 must be greater than x1'
-    assert bottom > top, 'bottom must be greater than top (z points downward)'
-    dy = (y2 - y1)/shape[0]
-    dx = (x2 - x1)/shape[1]
-    half_dy = 0.5*dy
-    half_dx = 0.5*dx
-    layer = []
-    y = y1
-    for i in range(shape[0]):
-        x = x1
-        for j in range(shape[1]):
-            layer.append([y + half_dy, x + half_dx, z0])
-            x += dx
-        y += dy
-    layer = np.array(layer)
+    y, x = cell_edges(region, shape)
+    layer = np.empty((shape[0]*shape[1], 3))
+    layer[:, 0] = np.repeat(0.5*(y[:-1] + y[1:]), shape[1])
+    layer[:, 1] = np.tile(0.5*(x[:-1] + x[1:]), shape[0])
+    layer[:, 2] = z0
     return layer
 
 
@@ -456,23 +447,8 @@ def nuclei_layer_circular(center, radius, shape, z0):
     '''
     y0, x0 = center
     assert radius > 0, 'radius must be positive'
-    y_min = y0 - radius
-    y_max = y0 + radius
-    x_min = x0 - radius
-    x_max = x0 + radius
-    dy = (y_max - y_min)/shape[0]
-    dx = (x_max - x_min)/shape[1]
-    half_dy = 0.5*dy
-    half_dx = 0.5*dx
-    layer = []
-    y = y_min
-    for i in range(shape[0]):
-        x = x_min
-        for j in range(shape[1]):
-            r_prism = np.sqrt((x + half_dx - x0)**2 + (y + half_dy - y0)**2)
-            if r_prism <= radius:
-                layer.append([y + half_dy, x + half_dx, z0])
-            x += dx
-        y += dy
-    layer = np.array(layer)
-    return layer
+    layer = nuclei_layer_rectangular(
+        (y0 - radius, y0 + radius, x0 - radius, x0 + radius), shape, z0
+    )
+    r_prism = np.hypot(layer[:, 1] - x0, layer[:, 0] - y0)
+    return layer[r_prism <= radius]
@@ -0,0 +1,183 @@
+"""
+Compact binary storage of reservoir models.
+
+A model is stored in a directory containing:
+
+- ``header.json``: name and version of the format, number of prisms and
+  time steps, elastic parameters and free-form metadata;
+- ``prisms.npy``: boundaries of the prisms with shape (``n_prisms``, 6), in
+  the order used by ``compaction.field_component``;
+- ``pressure.npy``: pressure of each prism in MPa at each time step, with
+  shape (``n_steps``, ``n_prisms``).
+
+The arrays are NumPy ``.npy`` files opened as memory maps, so loading a
+model reads only the header, and each time step (a row of ``pressure``) is
+read from disk only when it is used. ``convert_pickle`` converts the models
+stored as pickles (e.g., ``realistic_model.pickle``).
+
+Run this module from the ``code`` directory to convert a pickle::
+
+    python reservoir_model.py realistic_model.pickle realistic_model
+
+"""
+
+import argparse
+import json
+import os
+import pickle
+import numpy as np
+
+
+# Name and version of the format written by save_model
+FORMAT = "disreserv-model"
+VERSION = 1
+
+
+def save_model(
+    directory, prisms, pressure, poisson=None, young=None, metadata=None
+):
+    """
+    Save a reservoir model.
+
+    Parameters
+    ----------
+    directory : str
+        Directory where the model is written. It is created if needed.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prisms (see
+        ``compaction.field_component``).
+    pressure : 1d-array or 2d-array
+        Pressure of each prism in MPa, or pressure of each prism at a
+        sequence of time steps with shape (``n_steps``, ``n_prisms``).
+    poisson : float or None (optional)
+        Poisson’s ratio. Default to ``None``.
+    young : float or None (optional)
+        Young’s modulus in MPa. Default to ``None``.
+    metadata : dict or None (optional)
+        Additional information that can be stored as JSON (e.g., the name of
+        the field or the dates of the time steps). Default to ``None``.
+    """
+    prisms = np.ascontiguousarray(np.atleast_2d(prisms), dtype=np.float64)
+    pressure = np.ascontiguousarray(
+        np.atleast_2d(pressure), dtype=np.float64
+    )
+    if prisms.shape[1] != 6:
+        raise ValueError(
+            "Invalid prisms with shape {}. ".format(prisms.shape)
+            + "They must have 6 columns."
+        )
+    if pressure.ndim != 2 or pressure.shape[1] != prisms.shape[0]:
+        raise ValueError(
+            "Invalid pressure with shape {}. ".format(pressure.shape)
+            + "It must have shape (n_steps, {}).".format(prisms.shape[0])
+        )
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "prisms.npy"), prisms)
+    np.save(os.path.join(directory, "pressure.npy"), pressure)
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "n_prisms": prisms.shape[0],
+        "n_steps": pressure.shape[0],
+        "poisson": poisson,
+        "young": young,
+        "metadata": {} if metadata is None else metadata,
+    }
+    # The header is written last, so an incomplete model can't be loaded
+    with open(os.path.join(directory, "header.json"), "w") as f:
+        json.dump(header, f, indent=2)
+
+
+def load_model(directory):
+    """
+    Load a reservoir model saved by ``save_model``.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing the model.
+
+    Returns
+    -------
+    model : dict
+        Dictionary with the read-only memory maps ``prisms`` and
+        ``pressure`` (with shape (``n_steps``, ``n_prisms``)), the elastic
+        parameters ``poisson`` and ``young`` (``None`` if unknown), the
+        ``metadata`` and the ``version`` of the format.
+    """
+    with open(os.path.join(directory, "header.json")) as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT:
+        raise ValueError(
+            "Invalid model in {}. Unknown format.".format(directory)
+        )
+    if header["version"] > VERSION:
+        raise ValueError(
+            "Model in {} has version {}. ".format(directory, header["version"])
+            + "The latest version supported is {}.".format(VERSION)
+        )
+    prisms = np.load(os.path.join(directory, "prisms.npy"), mmap_mode="r")
+    pressure = np.load(
+        os.path.join(directory, "pressure.npy"), mmap_mode="r"
+    )
+    if prisms.shape != (header["n_prisms"], 6) or pressure.shape != (
+        header["n_steps"], header["n_prisms"]
+    ):
+        raise ValueError(
+            "Invalid model in {}. ".format(directory)
+            + "The arrays do not match the header."
+        )
+    return {
+        "prisms": prisms,
+        "pressure": pressure,
+        "poisson": header["poisson"],
+        "young": header["young"],
+        "metadata": header["metadata"],
+        "version": header["version"],
+    }
+
+
+def convert_pickle(filename, directory, poisson=None, young=None):
+    """
+    Convert a model stored as a pickle into the binary format.
+
+    The pickle must contain a dictionary with the prisms in ``model`` and
+    the pressure in ``DP`` (the keys may be bytes, as in
+    ``realistic_model.pickle``).
+
+    Parameters
+    ----------
+    filename : str
+        Name of the pickle file.
+    directory : str
+        Directory where the model is written (see ``save_model``).
+    poisson : float or None (optional)
+        Poisson’s ratio. Default to ``None``.
+    young : float or None (optional)
+        Young’s modulus in MPa. Default to ``None``.
+    """
+    with open(filename, "rb") as f:
+        content = pickle.load(f, encoding="bytes")
+    content = {
+        key.decode() if isinstance(key, bytes) else key: value
+        for key, value in content.items()
+    }
+    save_model(
+        directory, content["model"], content["DP"], poisson=poisson,
+        young=young, metadata={"source": os.path.basename(filename)}
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert a reservoir model stored as a pickle."
+    )
+    parser.add_argument("pickle", help="pickle file containing the model")
+    parser.add_argument("directory", help="directory of the converted model")
+    parser.add_argument("--poisson", type=float, default=None)
+    parser.add_argument("--young", type=float, default=None)
+    arguments = parser.parse_args()
+    convert_pickle(
+        arguments.pickle, arguments.directory, poisson=arguments.poisson,
+        young=arguments.young
+    )
@@ -0,0 +1,245 @@
+"""
+Sensitivity (Green's function) matrices of the displacement and stress
+fields produced by pore-pressure variations in prismatic cells.
+
+For a fixed geometry of prisms and computation points, and fixed elastic
+parameters, the fields computed in ``compaction`` are linear in the
+pressure. The sensitivity matrix has one row per computation point and one
+column per prism, so that the field produced by any pressure distribution is
+the product of the matrix by the pressure vector. The matrix can be stored
+on disk as a ``.npy`` file and loaded as a memory map, so that it is built
+only once and reused for many pressure distributions.
+"""
+
+import numpy as np
+from numba import njit, prange
+import compaction as cp
+
+
+def sensitivity_matrix(
+    coordinates, prisms, poisson, young, field, filename=None,
+    block_size=1000, dtype="float64", disable_checks=False, parallel=None,
+    n_threads=None
+):
+    """
+    Sensitivity matrix of a field component with respect to the pressure of
+    the prisms.
+
+    The matrix is computed in blocks of computation points, so that its
+    computation requires memory proportional to ``block_size`` when it is
+    written to a file.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+    field : str
+        Field component. The available components are ``displacement_x``,
+        ``displacement_y``, ``displacement_z``, ``stress_x``, ``stress_y``
+        and ``stress_z``. The kernels available in ``compaction.KERNELS``
+        (e.g., ``d_x1``) can also be used.
+    filename : str or None (optional)
+        If not ``None``, the matrix is written to this ``.npy`` file and
+        returned as a memory map. Default to ``None``.
+    block_size : int (optional)
+        Number of computation points computed at once. Default to 1000.
+    dtype : data-type (optional)
+        Data type of the matrix. Default to ``np.float64``.
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    parallel : bool or None (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. If ``None``, the global setting defined by
+        ``compaction.set_parallel`` is used. Default to ``None``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. If ``None``, the
+        global setting defined by ``compaction.set_parallel`` is used.
+        Default to ``None``.
+
+    Returns
+    -------
+    matrix : 2d-array or numpy.memmap
+        Sensitivity matrix with shape (``n_points``, ``n_prisms``). The
+        computation points are ordered as the raveled ``coordinates``.
+    """
+    terms = field_terms(field, poisson, young)
+    coordinates = tuple(
+        np.ravel(i) for i in np.broadcast_arrays(*coordinates[:3])
+    )
+    prisms = np.atleast_2d(prisms)
+    if not disable_checks:
+        cp._check_prisms(prisms)
+    shape = (coordinates[0].size, prisms.shape[0])
+    if filename is None:
+        matrix = np.empty(shape, dtype=dtype)
+    else:
+        matrix = np.lib.format.open_memmap(
+            filename, mode="w+", dtype=dtype, shape=shape
+        )
+    block = np.empty((min(block_size, shape[0]), shape[1]))
+    term = np.empty_like(block)
+    for start in range(0, shape[0], block_size):
+        stop = min(start + block_size, shape[0])
+        points = tuple(
+            np.ascontiguousarray(i[start:stop]) for i in coordinates
+        )
+        block[:] = 0
+        for kernel, coefficient in terms:
+            term[:] = 0
+            cp._run_loop(
+                jit_kernel_matrix, jit_kernel_matrix_parallel, parallel,
+                n_threads, points, prisms, cp.KERNELS[kernel],
+                term[:stop - start]
+            )
+            block += coefficient*term
+        matrix[start:stop] = block[:stop - start]
+    if filename is not None:
+        matrix.flush()
+    return matrix
+
+
+def load_sensitivity_matrix(filename):
+    """
+    Load a sensitivity matrix written by ``sensitivity_matrix`` as a
+    read-only memory map.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the ``.npy`` file.
+
+    Returns
+    -------
+    matrix : numpy.memmap
+        Sensitivity matrix with shape (``n_points``, ``n_prisms``).
+    """
+    return np.load(filename, mmap_mode="r")
+
+
+def forward(matrix, pressure, block_size=100000):
+    """
+    Field component produced by a pressure distribution.
+
+    The product is computed in blocks of rows, so that memory-mapped
+    matrices are read from disk block by block.
+
+    Parameters
+    ----------
+    matrix : 2d-array or numpy.memmap
+        Sensitivity matrix with shape (``n_points``, ``n_prisms``).
+    pressure : 1d-array or 2d-array
+        Pressure of each prism in MPa. It may have shape (``n_prisms``,) or
+        (``n_steps``, ``n_prisms``) for a sequence of pressure distributions.
+    block_size : int (optional)
+        Number of rows of the matrix used at once. Default to 100000.
+
+    Returns
+    -------
+    result : array
+        Field component with shape (``n_points``,) or (``n_steps``,
+        ``n_points``).
+    """
+    pressure = np.asarray(pressure)
+    if pressure.shape[-1] != matrix.shape[1]:
+        raise ValueError(
+            "Number of elements in pressure ({}) ".format(pressure.shape[-1])
+            + "mismatch the number of prisms ({})".format(matrix.shape[1])
+        )
+    result = np.empty(pressure.shape[:-1] + (matrix.shape[0],))
+    for start in range(0, matrix.shape[0], block_size):
+        stop = min(start + block_size, matrix.shape[0])
+        result[..., start:stop] = pressure @ matrix[start:stop].T
+    return result
+
+
+def field_terms(field, poisson, young):
+    """
+    Kernels and coefficients whose weighted sum gives a field component.
+
+    Parameters
+    ----------
+    field : str
+        Field component (see ``sensitivity_matrix``).
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+
+    Returns
+    -------
+    terms : list
+        List of tuples containing the name of a kernel and its coefficient.
+    """
+    c = -cp.Cm(poisson, young)/(4*np.pi)
+    s = c*young/(1 + poisson)
+    fields = {
+        "displacement_x": [
+            ("d_x1", c), ("d_x2", (3 - 4*poisson)*c), ("d_xz2", c)
+        ],
+        "displacement_y": [
+            ("d_y1", c), ("d_y2", (3 - 4*poisson)*c), ("d_yz2", c)
+        ],
+        "displacement_z": [
+            ("d_z1", c), ("d_z2", -(3 - 4*poisson)*c), ("d_zz2", c)
+        ],
+        "stress_x": [("s_xz1", s), ("s_xzz2", s), ("s_xz2", s)],
+        "stress_y": [("s_yz1", s), ("s_yzz2", s), ("s_yz2", s)],
+        "stress_z": [("s_zz1", s), ("s_zzz2", s), ("s_zz2", -s)],
+    }
+    if field in fields:
+        return fields[field]
+    if field in cp.KERNELS:
+        return [(field, c)]
+    raise ValueError("Field {} not recognized".format(field))
+
+
+def _kernel_matrix_loop(coordinates, prisms, kernel, out):
+    """
+    Compute the kernel integrated over each prism at the computation points
+
+    Parameters
+    ----------
+    coordinates : 1d array
+        1d array containing ``y``, ``x`` and ``z`` Cartesian coordinates of the
+        computation points (in meters).
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    kernel : func
+        Kernel function to be used for computing the desired field component.
+    out : 2d-array
+        Array with shape (``n_points``, ``n_prisms``) where the results will
+        be stored.
+    """
+    for l in prange(coordinates[0].size):
+        for m in range(prisms.shape[0]):
+            c_z = 0.5 * (prisms[m, 4] + prisms[m, 5])
+            for i in range(2):
+                for j in range(2):
+                    for k in range(2):
+                        out[l, m] += (-1) ** (i + j + k) * kernel(
+                            prisms[m, 1 - i],
+                            prisms[m, 3 - j],
+                            prisms[m, 5 - k],
+                            c_z,
+                            coordinates[0][l],
+                            coordinates[1][l],
+                            coordinates[2][l]
+                        )
+
+
+jit_kernel_matrix = njit(cache=True)(_kernel_matrix_loop)
+jit_kernel_matrix_parallel = njit(parallel=True, cache=True)(
+    _kernel_matrix_loop
+)
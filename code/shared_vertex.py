@@ -0,0 +1,355 @@
+"""
+Forward modelling of elastic reservoir deformation produced by prisms
+arranged on a rectilinear grid, by evaluating the kernels once per unique
+vertex.
+
+The field produced by a prism is a sum of the kernel evaluated at its 8
+corners with alternating signs (Nagy et al., 2000). When the prisms are the
+cells of a grid, like the layers built by
+``compaction.prism_layer_rectangular`` or stacks of such layers, neighbouring
+prisms share their corners. Because the fields are linear in the pressure,
+the contributions of all the prisms sharing a vertex can be combined into a
+single weight given by the differences of the pressure of the adjacent
+cells. The kernel is then evaluated only once per vertex with non-null
+weight.
+
+The vertices are shared in the three directions for the kernels of both
+systems. The kernels of the 2nd system are evaluated at the image of the
+prism: with ``Z = zp - z + 2*zc``, the corners on the top of a prism give
+``Z = zp + z2`` and those on its bottom give ``Z = zp + z1``. The image
+corners of two vertically stacked prisms therefore coincide at their shared
+face, as the corners of the 1st system do, but with reversed signs.
+
+References
+----------
+
+Nagy, D., Papp, G. and Benedek, J. (2000). The gravitational potential and
+its derivatives for the prism. Journal of Geodesy 74: 552.
+doi:10.1007/s001900000116
+
+"""
+
+import numpy as np
+from numba import njit, prange
+import compaction as cp
+
+
+def field_component(
+    coordinates, prisms, pressure, poisson, young, kernel, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None
+):
+    """
+    Displacement and stress components produced by pore-pressure variations in
+    right-rectangular prisms arranged on a rectilinear grid.
+
+    The result is equal to that obtained with ``compaction.field_component``.
+
+    Parameters
+    ----------
+    coordinates : 2d-array
+        2d numpy array containing ``y``, ``x`` and ``z`` Cartesian cordinates
+        of the computation points. All coordinates should be in meters.
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters. The prisms
+        must be cells of a rectilinear grid (see ``grid_from_prisms``).
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``) containing the pressure of each
+        prism at a sequence of time steps. In the latter case, the time steps
+        are along the first dimension of the results.
+    poisson : float
+        Poisson’s ratio.
+    young : float
+        Young’s modulus in MPa.
+    kernel : str
+        Kernel used for computing the desired field component. See
+        ``compaction.field_component`` for the available kernels.
+    dtype : data-type (optional)
+        Data type assigned to the resulting field component. Default to
+        ``np.float64``.
+    disable_checks : bool (optional)
+        Flag that controls whether to perform a sanity check on the model.
+        Default to ``False``.
+    parallel : bool or None (optional)
+        If ``True``, the computation points are distributed over multiple
+        threads. If ``None``, the global setting defined by
+        ``compaction.set_parallel`` is used. Default to ``None``.
+    n_threads : int or None (optional)
+        Number of threads used by the parallel computation. If ``None``, the
+        global setting defined by ``compaction.set_parallel`` is used.
+        Default to ``None``.
+
+    Returns
+    -------
+    result : array
+        Field component generated by the prisms at the computation points.
+    """
+    if kernel not in cp.KERNELS:
+        raise ValueError("Kernel {} not recognized".format(kernel))
+    shape, coordinates, prisms, pressure = cp._prepare_arguments(
+        coordinates, prisms, pressure, disable_checks
+    )
+    grid = grid_from_prisms(prisms, pressure)
+    vertices, weights = vertex_sources(*grid, kernel=kernel)
+    result = np.zeros(
+        (pressure.shape[0], coordinates[0].size), dtype=dtype
+    )
+    cp._run_loop(
+        jit_vertex_field_component, jit_vertex_field_component_parallel,
+        parallel, n_threads, coordinates, vertices, weights,
+        cp.KERNELS[kernel], result
+    )
+    result *= -cp.Cm(poisson, young)/(4*np.pi)
+    return result.reshape(shape)
+
+
+def displacement_components(
+    coordinates, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None
+):
+    """
+    x, y and z components of the displacement field produced by prisms
+    arranged on a rectilinear grid.
+
+    See ``field_component`` for a description of the parameters.
+
+    Returns
+    -------
+    d_x, d_y, d_z : arrays
+        x, y and z components of the displacement field generated by the
+        prisms at the computation points.
+    """
+    fields = _sub_kernel_fields(
+        coordinates, prisms, pressure, poisson, young,
+        ("d_x1", "d_x2", "d_xz2", "d_y1", "d_y2", "d_yz2", "d_z1", "d_z2",
+         "d_zz2"),
+        dtype, disable_checks, parallel, n_threads
+    )
+    d_x1, d_x2, d_xz2, d_y1, d_y2, d_yz2, d_z1, d_z2, d_zz2 = fields
+    d_x = d_x1 + (3 - 4*poisson)*d_x2 + d_xz2
+    d_y = d_y1 + (3 - 4*poisson)*d_y2 + d_yz2
+    d_z = d_z1 - (3 - 4*poisson)*d_z2 + d_zz2
+    return d_x, d_y, d_z
+
+
+def stress_components(
+    coordinates, prisms, pressure, poisson, young, dtype="float64",
+    disable_checks=False, parallel=None, n_threads=None
+):
+    """
+    x, y and z components of the stress field produced by prisms arranged on
+    a rectilinear grid.
+
+    See ``field_component`` for a description of the parameters.
+
+    Returns
+    -------
+    s_x, s_y, s_z : arrays
+        x, y and z components of the stress field generated by the prisms at
+        the computation points.
+    """
+    fields = _sub_kernel_fields(
+        coordinates, prisms, pressure, poisson, young,
+        ("s_xz1", "s_xz2", "s_xzz2", "s_yz1", "s_yz2", "s_yzz2", "s_zz1",
+         "s_zz2", "s_zzz2"),
+        dtype, disable_checks, parallel, n_threads
+    )
+    s_xz1, s_xz2, s_xzz2, s_yz1, s_yz2, s_yzz2, s_zz1, s_zz2, s_zzz2 = fields
+    s_x = s_xz1 + s_xzz2 + s_xz2
+    s_y = s_yz1 + s_yzz2 + s_yz2
+    s_z = s_zz1 + s_zzz2 - s_zz2
+    s_x *= young/(1 + poisson)
+    s_y *= young/(1 + poisson)
+    s_z *= young/(1 + poisson)
+    return s_x, s_y, s_z
+
+
+def _sub_kernel_fields(
+    coordinates, prisms, pressure, poisson, young, kernels, dtype,
+    disable_checks, parallel, n_threads
+):
+    """
+    Compute the fields produced by a sequence of kernels, building the grid
+    only once.
+    """
+    shape, coordinates, prisms, pressure = cp._prepare_arguments(
+        coordinates, prisms, pressure, disable_checks
+    )
+    grid = grid_from_prisms(prisms, pressure)
+    fields = []
+    for kernel in kernels:
+        vertices, weights = vertex_sources(*grid, kernel=kernel)
+        result = np.zeros(
+            (pressure.shape[0], coordinates[0].size), dtype=dtype
+        )
+        cp._run_loop(
+            jit_vertex_field_component, jit_vertex_field_component_parallel,
+            parallel, n_threads, coordinates, vertices, weights,
+            cp.KERNELS[kernel], result
+        )
+        result *= -cp.Cm(poisson, young)/(4*np.pi)
+        fields.append(result.reshape(shape))
+    return fields
+
+
+def grid_from_prisms(prisms, pressure):
+    """
+    Represent a set of prisms as the cells of a rectilinear grid.
+
+    The edges of the grid are the unique boundaries of the prisms. Each prism
+    must fill exactly one cell of the grid. Cells not occupied by any prism
+    (e.g., outside a layer built by ``compaction.prism_layer_circular``)
+    have null pressure, and prisms occupying the same cell have their
+    pressures added.
+
+    Parameters
+    ----------
+    prisms : 2d-array
+        2d array containing the Cartesian coordinates of the prism(s). Each
+        line contains the coordinates of a prism in following order: y1, y2,
+        x1, x2, z2 and z1. All coordinates should be in meters.
+    pressure : 1d-array or 2d-array
+        1d array containing the pressure of each prism in MPa, or 2d array
+        with shape (``n_steps``, ``n_prisms``).
+
+    Returns
+    -------
+    y_edges, x_edges, z_edges : 1d-arrays
+        Sorted edges of the grid along the ``y``, ``x`` and ``z`` directions.
+    pressure_grid : 3d-array or 4d-array
+        Pressure of the cells with shape (``nz``, ``ny``, ``nx``), where the
+        first index increases with depth. If ``pressure`` is a 2d array, the
+        shape is (``n_steps``, ``nz``, ``ny``, ``nx``).
+    """
+    prisms = np.atleast_2d(prisms)
+    pressure = np.atleast_1d(pressure)
+    indices = []
+    edges = []
+    for lower, upper, direction in ((0, 1, "y"), (2, 3, "x"), (5, 4, "z")):
+        axis_edges = np.unique(prisms[:, [lower, upper]])
+        lower_index = np.searchsorted(axis_edges, prisms[:, lower])
+        upper_index = np.searchsorted(axis_edges, prisms[:, upper])
+        if np.any(upper_index != lower_index + 1):
+            raise ValueError(
+                "The prisms are not cells of a rectilinear grid: "
+                + "some prisms cross grid edges along {}.".format(direction)
+            )
+        indices.append(lower_index)
+        edges.append(axis_edges)
+    y_edges, x_edges, z_edges = edges
+    iy, ix, iz = indices
+    pressure_grid = np.zeros(
+        pressure.shape[:-1]
+        + (z_edges.size - 1, y_edges.size - 1, x_edges.size - 1)
+    )
+    np.add.at(pressure_grid, (Ellipsis, iz, iy, ix), pressure)
+    return y_edges, x_edges, z_edges, pressure_grid
+
+
+def vertex_sources(y_edges, x_edges, z_edges, pressure_grid, kernel):
+    """
+    Vertices of the grid and their weights for a given kernel.
+
+    The weight of each vertex combines the pressures of the adjacent cells
+    with the signs of the corresponding corners. Vertices with null weight
+    are removed, so the number of returned vertices is the number of kernel
+    evaluations per computation point.
+
+    Parameters
+    ----------
+    y_edges, x_edges, z_edges : 1d-arrays
+        Sorted edges of the grid along the ``y``, ``x`` and ``z`` directions.
+    pressure_grid : 3d-array or 4d-array
+        Pressure of the cells with shape (``nz``, ``ny``, ``nx``) or
+        (``n_steps``, ``nz``, ``ny``, ``nx``).
+    kernel : str
+        Kernel used for computing the field component.
+
+    Returns
+    -------
+    vertices : 2d-array
+        Array with shape (``n_vertices``, 4) containing the ``y``, ``x`` and
+        ``z`` coordinates of the vertices and the depth passed to the kernels
+        as the center of the prism (null for the 1st system and equal to
+        ``z`` for the 2nd system, so that ``Z = zp + z``).
+    weights : 1d-array or 2d-array
+        Weight of each vertex. If ``pressure_grid`` is a 4d array, the shape
+        is (``n_steps``, ``n_vertices``).
+    """
+    steps = pressure_grid.shape[:-3]
+    pressure_grid = pressure_grid.reshape((-1,) + pressure_grid.shape[-3:])
+    # Horizontal weights of each layer: upper boundaries have a plus sign and
+    # lower boundaries have a minus sign (see compaction.jit_field_component)
+    padded = np.pad(pressure_grid, ((0, 0), (0, 0), (1, 1), (1, 1)))
+    plan = (
+        padded[..., :-1, :-1] - padded[..., :-1, 1:]
+        - padded[..., 1:, :-1] + padded[..., 1:, 1:]
+    )
+    y, x = np.meshgrid(y_edges, x_edges, indexing="ij")
+    # The top of a layer has a plus sign and its bottom has a minus sign
+    padded = np.pad(plan, ((0, 0), (1, 1), (0, 0), (0, 0)))
+    weights = padded[:, 1:] - padded[:, :-1]
+    shape = weights.shape[1:]
+    z = np.broadcast_to(z_edges[:, None, None], shape)
+    if kernel.endswith("1"):
+        z_c = np.zeros(shape)
+    else:
+        # The image of the top of a layer is at the depth of its bottom and
+        # vice versa, so the signs are reversed
+        weights = -weights
+        z_c = z
+    vertices = np.stack([
+        np.broadcast_to(y, shape), np.broadcast_to(x, shape), z, z_c
+    ], axis=-1)
+    active = np.any(weights != 0, axis=0)
+    vertices = np.ascontiguousarray(vertices[active])
+    weights = np.ascontiguousarray(weights[:, active])
+    return vertices, weights.reshape(steps + weights.shape[-1:])
+
+
+def _vertex_field_component_loop(coordinates, vertices, weights, kernel, out):
+    """
+    Compute the field component at the computation points by adding the
+    weighted kernels evaluated at the vertices
+
+    Parameters
+    ----------
+    coordinates : 1d array
+        1d array containing ``y``, ``x`` and ``z`` Cartesian coordinates of the
+        computation points (in meters).
+    vertices : 2d-array
+        Coordinates ``y``, ``x``, ``z`` of the vertices and the depth passed
+        to the kernel as the center of the prism (see ``vertex_sources``).
+    weights : 2d-array
+        Weight of each vertex with shape (n_steps, n_vertices).
+    kernel : func
+        Kernel function to be used for computing the desired field component.
+    out : 2d-array
+        Array with shape (n_steps, n_points) where the resulting field
+        component values will be stored.
+    """
+    for l in prange(coordinates[0].size):
+        # The alternating terms of the point are added in double precision
+        total = np.zeros(weights.shape[0])
+        for v in range(vertices.shape[0]):
+            value = kernel(
+                vertices[v, 0],
+                vertices[v, 1],
+                vertices[v, 2],
+                vertices[v, 3],
+                coordinates[0][l],
+                coordinates[1][l],
+                coordinates[2][l]
+            )
+            for t in range(weights.shape[0]):
+                total[t] += weights[t, v] * value
+        for t in range(weights.shape[0]):
+            out[t, l] += total[t]
+
+
+jit_vertex_field_component = njit(cache=True)(_vertex_field_component_loop)
+jit_vertex_field_component_parallel = njit(parallel=True, cache=True)(
+    _vertex_field_component_loop
+)
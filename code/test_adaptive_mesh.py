@@ -0,0 +1,119 @@
+import numpy as np
+from numpy.testing import assert_almost_equal as aae
+import pytest
+import compaction as cp
+import adaptive_mesh as am
+
+
+def computation_points():
+    'computation points on the surface above the layer'
+    y, x = np.meshgrid(
+        np.linspace(-3000, 3000, 9), np.linspace(-3000, 3000, 8)
+    )
+    return np.vstack([y.ravel(), x.ravel(), np.zeros(x.size)])
+
+
+def test_uniform_pressure_is_not_refined():
+    'prisms with uniform pressure must not be refined'
+    prisms, pressure, error = am.prism_layer_adaptive(
+        (-2000, 2000, -1000, 1000), 1100, 1000, lambda y, x, z: -10 + 0*y,
+        computation_points(), 0.25, 3300, tolerance=1e-3, shape=(2, 2)
+    )
+    assert prisms.shape == (4, 6)
+    aae(pressure, np.zeros(4) - 10)
+    assert error < 1e-6
+
+
+def test_grid_pressure_is_area_weighted():
+    'fully refined grid must reproduce the uniform layer of the grid'
+    region = (-2000, 2000, -1000, 1000)
+    np.random.seed(5)
+    grid = -10*np.random.rand(4, 4)
+    coordinates = computation_points()
+    prisms, pressure, error = am.prism_layer_adaptive(
+        region, 1100, 1000, grid, coordinates, 0.25, 3300, tolerance=0,
+        max_depth=2
+    )
+    volume = am._volume(prisms)
+    aae((pressure*volume).sum()/volume.sum(), grid.mean(), decimal=12)
+    reference = cp.displacement_z_component(
+        coordinates, cp.prism_layer_rectangular(region, (4, 4), 1100, 1000),
+        grid.ravel(), 0.25, 3300
+    )
+    result = cp.displacement_z_component(
+        coordinates, prisms, pressure, 0.25, 3300
+    )
+    np.testing.assert_allclose(result, reference, rtol=1e-9)
+
+
+def test_adaptive_versus_refined_layer():
+    'refining the adaptive layer once more must stay within the tolerance'
+    region = (-2000, 2000, -2000, 2000)
+    coordinates = computation_points()
+
+    def gaussian(y, x, z):
+        return -10*np.exp(-((y - 300)**2 + x**2)/(2*500**2))
+
+    tolerance = 1e-2
+    prisms, pressure, error = am.prism_layer_adaptive(
+        region, 1100, 1000, gaussian, coordinates, 0.25, 3300,
+        tolerance=tolerance, max_depth=6
+    )
+    assert error <= tolerance
+    assert prisms.shape[0] < 64*64
+    # The error estimate of each prism is the largest difference between
+    # the fields of its children and its own field, so splitting all the
+    # prisms changes the field by at most the sum of the estimates. The
+    # estimates are relative to the field of the last level, which differs
+    # from the refined field by the same sum.
+    children = am._split(prisms, False)
+    refined = cp.displacement_z_component(
+        coordinates, children, am._function_average(gaussian, 4, False)(
+            children
+        ), 0.25, 3300
+    )
+    result = cp.displacement_z_component(
+        coordinates, prisms, pressure, 0.25, 3300
+    )
+    assert (
+        np.abs(result - refined).max()
+        <= tolerance*np.abs(refined).max()/(1 - tolerance)
+    )
+
+
+def test_error_when_max_depth_stops_refinement():
+    'error must include the prisms left unrefined by max_depth'
+
+    def gaussian(y, x, z):
+        return -10*np.exp(-(y**2 + x**2)/(2*500**2))
+
+    tolerance = 1e-6
+    prisms, pressure, error = am.prism_layer_adaptive(
+        (-2000, 2000, -2000, 2000), 1100, 1000, gaussian,
+        computation_points(), 0.25, 3300, tolerance=tolerance,
+        shape=(2, 2), max_depth=1
+    )
+    assert prisms.shape == (16, 6)
+    assert error > tolerance
+
+
+def test_octree_split():
+    'prisms must be split along z if requested'
+    prisms, pressure, error = am.prism_layer_adaptive(
+        (-2000, 2000, -1000, 1000), 1100, 1000, lambda y, x, z: z - 1000,
+        computation_points(), 0.25, 3300, tolerance=0, max_depth=1,
+        split_z=True
+    )
+    assert prisms.shape == (8, 6)
+    aae(am._volume(prisms).sum(), 4000*2000*100)
+    aae(np.sort(np.unique(pressure)), [25, 75])
+    with pytest.raises(ValueError):
+        am.prism_layer_adaptive(
+            (-2000, 2000, -1000, 1000), 1100, 1000, lambda y, x, z: 0*y,
+            computation_points(), 0.25, 3300, tolerance=-1
+        )
+    with pytest.raises(ValueError):
+        am.prism_layer_adaptive(
+            (-2000, 2000, -1000, 1000), 1100, 1000, lambda y, x, z: 0*y,
+            computation_points(), 0.25, 3300, max_depth=0
+        )
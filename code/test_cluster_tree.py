@@ -0,0 +1,103 @@
+import numpy as np
+from numpy.testing import assert_almost_equal as aae
+import pytest
+import compaction as cp
+import cluster_tree as ctree
+
+
+def layered_model():
+    'two stacked rectangular layers with a smooth pressure plus noise'
+    region = (-3000, 3000, -3000, 3000)
+    top = cp.prism_layer_rectangular(region, (20, 20), 1100, 1000)
+    bottom = cp.prism_layer_rectangular(region, (20, 20), 1250, 1100)
+    model = np.vstack([top, bottom])
+    y = 0.5*(model[:, 0] + model[:, 1])
+    x = 0.5*(model[:, 2] + model[:, 3])
+    np.random.seed(5)
+    pressure = -10*np.exp(-(y**2 + x**2)/2000**2)
+    pressure += np.random.rand(model.shape[0])
+    return model, pressure
+
+
+def computation_points():
+    'computation points at the surface and below the model'
+    y, x = np.meshgrid(
+        np.linspace(-6000, 6000, 13), np.linspace(-6000, 6000, 11)
+    )
+    z = np.where(y > 0, 0, 1500)
+    return np.stack([y, x, z])
+
+
+def test_tree_versus_exact_kernels():
+    'cluster-tree fields must converge to the exact ones as theta decreases'
+    model, pressure = layered_model()
+    coordinates = computation_points()
+    for kernel in cp.KERNELS:
+        reference = cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel
+        )
+        result = ctree.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel, theta=0
+        )
+        aae(result, reference, decimal=10)
+        scale = np.max(np.abs(reference))
+        for theta, tolerance in [(0.2, 1e-3), (0.5, 5e-2)]:
+            result = ctree.field_component(
+                coordinates, model, pressure, 0.25, 3300, kernel, theta=theta
+            )
+            assert np.max(np.abs(result - reference)) < tolerance*scale
+
+
+def test_tree_versus_exact_components():
+    'cluster-tree displacement and stress must be close to the fused ones'
+    model, pressure = layered_model()
+    coordinates = computation_points()
+    pressure = np.stack([pressure, 0.5*pressure])
+    for exact, tree in [
+        (cp.displacement_components, ctree.displacement_components),
+        (cp.stress_components, ctree.stress_components),
+    ]:
+        reference = np.asarray(
+            exact(coordinates, model, pressure, 0.25, 3300)
+        )
+        result = np.asarray(
+            tree(coordinates, model, pressure, 0.25, 3300, theta=0.2)
+        )
+        assert result.shape == reference.shape
+        scale = np.max(np.abs(reference))
+        assert np.max(np.abs(result - reference)) < 1e-3*scale
+
+
+def test_build_tree():
+    'nodes must partition the prisms and carry their moments'
+    model, pressure = layered_model()
+    prisms, sorted_pressure, nodes, centers, monopoles, dipoles, depth = (
+        ctree.build_tree(model, pressure[np.newaxis], leaf_size=8)
+    )
+    assert depth > 1
+    assert np.all(nodes[:, 1] - nodes[:, 0] > 0)
+    # the prisms are a permutation of the model
+    aae(np.sort(prisms, axis=0), np.sort(model, axis=0))
+    aae(monopoles[0, 0], np.sum(
+        pressure*(model[:, 1] - model[:, 0])*(model[:, 3] - model[:, 2])
+        * (model[:, 4] - model[:, 5])
+    ), decimal=3)
+    for node in nodes:
+        if node[3] > 0:
+            children = nodes[node[2]:node[2] + node[3]]
+            assert children[0, 0] == node[0]
+            assert children[-1, 1] == node[1]
+            assert np.all(children[1:, 0] == children[:-1, 1])
+        else:
+            assert node[1] - node[0] <= 8
+
+
+def test_bad_theta():
+    'must stop if the opening angle is not in [0, 1)'
+    model, pressure = layered_model()
+    coordinates = computation_points()
+    for theta in [-0.1, 1]:
+        with pytest.raises(ValueError):
+            ctree.field_component(
+                coordinates, model, pressure, 0.25, 3300, 'd_z1', theta=theta
+            )
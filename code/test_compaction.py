@@ -254,3 +254,649 @@ def test_single_versus_multiple_prisms():
         coordinates, multiple, pressure, poisson, young
     )
     aae(result_single, result_multiple)
+
+
+def test_displacement_components_versus_single_components():
+    'fused displacement must be equal to the single component functions'
+    # computation points
+    y = np.linspace(-900, 1000, 23)
+    x = np.linspace(-2500, -1400, 20)
+    y, x = np.meshgrid(y, x)
+    np.random.seed(3)
+    z = 400*np.random.rand(*x.shape) - 100
+    coordinates = np.stack([y, x, z])
+
+    # Poisson ratio and Youg modulus
+    poisson = 0.25
+    young = 3300
+
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]])
+    pressure = np.array([-10, -5, 3])
+    d_x, d_y, d_z = cp.displacement_components(
+        coordinates, model, pressure, poisson, young
+    )
+    assert d_x.shape == x.shape
+    aae(d_x, cp.displacement_x_component(
+        coordinates, model, pressure, poisson, young
+    ), decimal=12)
+    aae(d_y, cp.displacement_y_component(
+        coordinates, model, pressure, poisson, young
+    ), decimal=12)
+    aae(d_z, cp.displacement_z_component(
+        coordinates, model, pressure, poisson, young
+    ), decimal=12)
+
+
+def test_stress_components_versus_single_components():
+    'fused stress must be equal to the single component functions'
+    # computation points
+    y = np.linspace(-900, 1000, 23)
+    x = np.linspace(-2500, -1400, 20)
+    y, x = np.meshgrid(y, x)
+    np.random.seed(5)
+    z = 400*np.random.rand(*x.shape) - 100
+    coordinates = np.stack([y, x, z])
+
+    # Poisson ratio and Youg modulus
+    poisson = 0.25
+    young = 3300
+
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]])
+    pressure = np.array([-10, -5, 3])
+    s_x, s_y, s_z = cp.stress_components(
+        coordinates, model, pressure, poisson, young
+    )
+    assert s_x.shape == x.shape
+    aae(s_x, cp.stress_x_component(
+        coordinates, model, pressure, poisson, young
+    ), decimal=12)
+    aae(s_y, cp.stress_y_component(
+        coordinates, model, pressure, poisson, young
+    ), decimal=12)
+    aae(s_z, cp.stress_z_component(
+        coordinates, model, pressure, poisson, young
+    ), decimal=12)
+
+
+def test_parallel_versus_serial():
+    'parallel computation must be equal to the serial one'
+    # computation points
+    y = np.linspace(-900, 1000, 23)
+    x = np.linspace(-2500, -1400, 20)
+    y, x = np.meshgrid(y, x)
+    np.random.seed(7)
+    z = 400*np.random.rand(*x.shape) - 100
+    coordinates = np.stack([y, x, z])
+
+    # Poisson ratio and Youg modulus
+    poisson = 0.25
+    young = 3300
+
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]])
+    pressure = np.array([-10, -5, 3])
+    for kernel in ['d_x1', 'd_zz2', 's_xzz2', 's_zz1']:
+        serial = cp.field_component(
+            coordinates, model, pressure, poisson, young, kernel,
+            parallel=False
+        )
+        parallel = cp.field_component(
+            coordinates, model, pressure, poisson, young, kernel,
+            parallel=True, n_threads=2
+        )
+        aae(serial, parallel, decimal=12)
+    for components in [cp.displacement_components, cp.stress_components]:
+        serial = components(
+            coordinates, model, pressure, poisson, young, parallel=False
+        )
+        parallel = components(
+            coordinates, model, pressure, poisson, young, parallel=True
+        )
+        aae(serial, parallel, decimal=12)
+
+
+def test_set_parallel():
+    'global parallel setting must be used by the components'
+    y = np.linspace(-900, 1000, 5)
+    x = np.zeros(5)
+    z = np.zeros(5)
+    coordinates = np.vstack([y, x, z])
+    model = np.array([[-100, 0, 100, 250, 350, 300]])
+    pressure = np.array([-10])
+    reference = cp.displacement_z_component(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    cp.set_parallel(True, n_threads=2)
+    try:
+        result = cp.displacement_z_component(
+            coordinates, model, pressure, 0.25, 3300
+        )
+    finally:
+        cp.set_parallel(False)
+    aae(reference, result, decimal=12)
+    with pytest.raises(ValueError):
+        cp.set_parallel(True, n_threads=0)
+
+
+def test_multiple_time_steps():
+    'results for 2d pressure must be equal to those of each time step'
+    # computation points
+    y = np.linspace(-900, 1000, 7)
+    x = np.linspace(-2500, -1400, 6)
+    y, x = np.meshgrid(y, x)
+    np.random.seed(17)
+    z = 400*np.random.rand(*x.shape) - 100
+    coordinates = np.stack([y, x, z])
+
+    # Poisson ratio and Youg modulus
+    poisson = 0.25
+    young = 3300
+
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]])
+    pressure = -10*np.random.rand(4, 3)
+    functions = [
+        cp.displacement_x_component, cp.displacement_y_component,
+        cp.displacement_z_component, cp.stress_x_component,
+        cp.stress_y_component, cp.stress_z_component,
+        cp.displacement_components, cp.stress_components
+    ]
+    for function in functions:
+        result = np.asarray(
+            function(coordinates, model, pressure, poisson, young)
+        )
+        for step in range(pressure.shape[0]):
+            reference = np.asarray(
+                function(coordinates, model, pressure[step], poisson, young)
+            )
+            assert reference.shape[-2:] == x.shape
+            aae(result[..., step, :, :], reference, decimal=12)
+
+
+def test_bad_pressure_dimensions():
+    'must stop if pressure has more than 2 dimensions'
+    coordinates = np.zeros((3, 10))
+    model = np.array([[-100, 0, 100, 250, 350, 300]])
+    with pytest.raises(ValueError):
+        cp.field_component(
+            coordinates, model, np.zeros((2, 2, 1)), 0.25, 3300, 'd_x1'
+        )
+
+
+def test_far_field_tolerance():
+    'point-source approximation of distant prisms must honor the tolerance'
+    model = cp.prism_layer_rectangular(
+        (-3000, 3000, -3000, 3000), (12, 12), 1100, 1000
+    )
+    np.random.seed(3)
+    pressure = -10*np.random.rand(model.shape[0])
+    y, x = np.meshgrid(
+        np.linspace(-8000, 8000, 9), np.linspace(-8000, 8000, 9)
+    )
+    coordinates = np.stack([y, x, np.full_like(x, 300)])
+    for kernel in cp.KERNELS:
+        exact = cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel
+        )
+        for tolerance in [1e-1, 1e-2]:
+            hybrid = cp.field_component(
+                coordinates, model, pressure, 0.25, 3300, kernel,
+                tolerance=tolerance
+            )
+            error = np.max(np.abs(hybrid - exact))/np.max(np.abs(exact))
+            assert error < tolerance
+        # a tiny tolerance must reproduce the exact computation
+        hybrid = cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel,
+            tolerance=1e-12
+        )
+        aae(hybrid, exact, decimal=12)
+    with pytest.raises(ValueError):
+        cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, 'd_x1', tolerance=0
+        )
+
+
+def test_single_precision_error_bound():
+    'single precision results must honor the documented error bound'
+    model = cp.prism_layer_rectangular(
+        (-3000, 3000, -3000, 3000), (30, 30), 1100, 1000
+    )
+    np.random.seed(8)
+    pressure = -10*np.random.rand(model.shape[0])
+    y, x = np.meshgrid(
+        np.linspace(-6000, 6000, 7), np.linspace(-6000, 6000, 6)
+    )
+    coordinates = np.stack([y, x, np.full_like(x, 300)])
+    u = 2.0**-24
+    for kernel in cp.KERNELS:
+        reference = cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel
+        )
+        result = cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel, dtype="float32"
+        )
+        assert result.dtype == np.float32
+        assert np.all(np.abs(result - reference) <= 4*u*np.abs(reference))
+    # the fused loops also add the contributions in double precision
+    reference = cp.displacement_components(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    result = cp.displacement_components(
+        coordinates, model, pressure, 0.25, 3300, dtype="float32"
+    )
+    for component, expected in zip(result, reference):
+        assert component.dtype == np.float32
+        bound = 32*u*np.abs(expected).max()
+        assert np.all(np.abs(component - expected) <= bound)
+
+
+def test_streaming_versus_full_computation():
+    'results computed chunk by chunk must be equal to the full computation'
+    y = np.linspace(-500, 500, 7)
+    x = np.linspace(-400, 600, 5)
+    z = np.array([0, 150, 400])
+    coordinates = np.ix_(y, x, z)
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]])
+    np.random.seed(4)
+    pressure = -10*np.random.rand(2, 3)
+    chunks = list(cp.iter_chunks(coordinates, chunk_size=20))
+    assert [chunk[0].size for chunk in chunks] == [20, 20, 20, 20, 20, 5]
+    full = np.stack(np.broadcast_arrays(*coordinates))
+    reference = cp.field_component(full, model, pressure, 0.25, 3300, 'd_z1')
+    result = np.concatenate(list(cp.stream_field_component(
+        chunks, model, pressure, 0.25, 3300, 'd_z1'
+    )), axis=-1)
+    aae(result, reference.reshape(2, -1), decimal=15)
+    for stream, function in [
+        (cp.stream_displacement_components, cp.displacement_components),
+        (cp.stream_stress_components, cp.stress_components),
+    ]:
+        reference = np.asarray(function(full, model, pressure, 0.25, 3300))
+        result = np.concatenate([
+            np.asarray(i)
+            for i in stream(chunks, model, pressure, 0.25, 3300)
+        ], axis=-1)
+        aae(result, reference.reshape(3, 2, -1), decimal=15)
+    with pytest.raises(ValueError):
+        next(cp.stream_field_component(
+            chunks, model, pressure[:, :2], 0.25, 3300, 'd_z1'
+        ))
+
+
+def test_memory_mapped_coordinates_and_results(tmp_path):
+    'results written block by block into memory maps must match'
+    y, x = np.meshgrid(
+        np.linspace(-900, 1000, 9), np.linspace(-2500, 1400, 8)
+    )
+    np.random.seed(21)
+    z = 400*np.random.rand(*x.shape) - 100
+    stacked = np.lib.format.open_memmap(
+        str(tmp_path / 'coordinates.npy'), mode='w+', shape=(3,) + x.shape
+    )
+    stacked[:] = np.stack([y, x, z])
+    stacked.flush()
+    coordinates = np.load(str(tmp_path / 'coordinates.npy'), mmap_mode='r')
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]])
+    pressure = -10*np.random.rand(2, 3)
+    shape = (2,) + x.shape
+    out = np.lib.format.open_memmap(
+        str(tmp_path / 'd_z1.npy'), mode='w+', shape=shape
+    )
+    result = cp.field_component(
+        coordinates, model, pressure, 0.25, 3300, 'd_z1', out=out,
+        block_size=10
+    )
+    assert result is out
+    reference = cp.field_component(
+        np.stack([y, x, z]), model, pressure, 0.25, 3300, 'd_z1'
+    )
+    aae(np.load(str(tmp_path / 'd_z1.npy')), reference, decimal=15)
+    out = tuple(np.empty(shape) for i in range(3))
+    cp.stress_components(
+        coordinates, model, pressure, 0.25, 3300, out=out, block_size=7
+    )
+    reference = cp.stress_components(
+        np.stack([y, x, z]), model, pressure, 0.25, 3300
+    )
+    aae(out, reference, decimal=12)
+    with pytest.raises(ValueError):
+        cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, 'd_z1',
+            out=np.empty(x.shape)
+        )
+    with pytest.raises(ValueError):
+        cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, 'd_z1',
+            out=np.empty(shape[::-1]).T
+        )
+
+
+def test_specialized_versus_generic_loop():
+    'loops specialized for each kernel must match the generic loop'
+    y = np.linspace(-900, 1000, 7)
+    x = np.linspace(-2500, -1400, 6)
+    y, x = np.meshgrid(y, x)
+    np.random.seed(23)
+    z = 400*np.random.rand(*x.shape) - 100
+    coordinates = (y.ravel(), x.ravel(), z.ravel())
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]], dtype=float)
+    pressure = -10*np.random.rand(2, 3)
+    for kernel in cp.KERNELS:
+        reference = np.zeros((2, x.size))
+        cp.jit_field_component(
+            coordinates, model, pressure, cp.KERNELS[kernel], reference
+        )
+        for loop in cp.SPECIALIZED_LOOPS[kernel]:
+            result = np.zeros((2, x.size))
+            loop(coordinates, model, pressure, result)
+            np.testing.assert_array_equal(result, reference)
+
+
+def test_generated_loops_up_to_date():
+    'generated specialized loops must match their generator'
+    import compaction_jit
+    with open(compaction_jit.__file__, encoding='utf-8') as module:
+        source = module.read()
+    begin = '# BEGIN GENERATED_LOOPS (see _specialized_loops_source)'
+    end = '# END GENERATED_LOOPS'
+    generated = source[source.index(begin) + len(begin):source.index(end)]
+    assert generated == compaction_jit._specialized_loops_source()
+
+
+def test_ahead_of_time_loops(tmp_path):
+    'loops compiled ahead of time must match the jitted loops'
+    pytest.importorskip('numba.pycc')
+    import importlib.util
+    import build_aot
+    filename = build_aot.build(str(tmp_path), name='compaction_aot_test')
+    spec = importlib.util.spec_from_file_location(
+        'compaction_aot_test', str(tmp_path / filename)
+    )
+    aot = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(aot)
+    y, x = np.meshgrid(
+        np.linspace(-900, 1000, 7), np.linspace(-2500, 1400, 6)
+    )
+    np.random.seed(29)
+    z = 400*np.random.rand(*x.shape) - 100
+    coordinates = (y.ravel(), x.ravel(), z.ravel())
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]], dtype=float)
+    pressure = -10*np.random.rand(2, 3)
+    for kernel in cp.KERNELS:
+        reference = np.zeros((2, x.size))
+        cp.SPECIALIZED_LOOPS[kernel][0](
+            coordinates, model, pressure, reference
+        )
+        result = np.zeros((2, x.size))
+        cp._aot_loop(getattr(aot, 'field_component_' + kernel))(
+            coordinates, model, pressure, result
+        )
+        aae(result, reference, decimal=12)
+
+
+def test_lazy_imports():
+    'helpers must be imported without importing numba and scipy'
+    import os
+    import subprocess
+    import sys
+    script = (
+        'import sys, compaction, geertsma_disk; '
+        'compaction.Cm(0.25, 3300); geertsma_disk.G(0.25, 3300); '
+        'compaction.prism_layer_rectangular((0, 1, 0, 1), (2, 2), 2, 1); '
+        'print("numba" in sys.modules, "scipy" in sys.modules)'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script], check=True, capture_output=True,
+        text=True, cwd=os.path.dirname(os.path.abspath(cp.__file__))
+    ).stdout
+    assert output.split() == ['False', 'False']
+
+
+def test_profile_report():
+    'profile must count the points, prisms and kernel evaluations'
+    y = np.linspace(-900, 1000, 5)
+    coordinates = np.vstack([y, np.zeros(5), np.zeros(5)])
+    model = np.array([[-100, 0, 100, 250, 350, 300],
+                      [0, 100, 100, 250, 350, 300]])
+    pressure = np.array([-10, -5])
+    cp.set_profiling(True)
+    try:
+        cp.displacement_z_component(coordinates, model, pressure, 0.25, 3300)
+        cp.stress_components(coordinates, model, pressure, 0.25, 3300)
+        report = cp.profile_report()
+    finally:
+        cp.set_profiling(False)
+    assert sorted(report['sweeps']) == [
+        'd_z1', 'd_z2', 'd_zz2', 'stress_components'
+    ]
+    sweep = report['sweeps']['d_z1']
+    assert sweep['calls'] == 1
+    assert sweep['points'] == 5
+    assert sweep['prisms'] == 2
+    assert sweep['evaluations'] == 8*5*2
+    assert report['sweeps']['stress_components']['evaluations'] == 9*8*5*2
+    for phase in ['compile', 'checks', 'post_processing']:
+        assert report[phase] >= 0
+    assert report['peak_bytes'] > 0
+    # nothing is recorded while disabled
+    cp.displacement_z_component(coordinates, model, pressure, 0.25, 3300)
+    assert cp.profile_report()['sweeps'] == report['sweeps']
+
+
+def test_skip_negligible_prisms():
+    'prisms with zero or negligible pressure must be skipped'
+    y, x = np.meshgrid(
+        np.linspace(-3000, 3000, 6), np.linspace(-3000, 3000, 5)
+    )
+    coordinates = np.vstack([y.ravel(), x.ravel(), np.zeros(x.size)])
+    model = cp.prism_layer_rectangular((-500, 500, -500, 500), (4, 4), 1100,
+                                       1000)
+    pressure = np.zeros((2, 16))
+    pressure[0, :5] = -10
+    pressure[1, 3:7] = -5
+    pressure[1, 7] = -1e-6
+    reference = cp.displacement_z_component(
+        coordinates, model[:8], pressure[:, :8], 0.25, 3300
+    )
+    cp.set_profiling(True)
+    try:
+        result = cp.displacement_z_component(
+            coordinates, model, pressure, 0.25, 3300
+        )
+        report = cp.profile_report()
+    finally:
+        cp.set_profiling(False)
+    aae(result, reference, decimal=15)
+    assert report['skipped_prisms'] == 3*8
+    assert report['error_estimate'] == 0
+    # drop the prism with negligible pressure
+    prisms, active, error = cp.active_prisms(model, pressure, threshold=1e-3)
+    assert prisms.shape[0] == 7
+    assert active.shape == (2, 7)
+    assert 0 < error < 1e-6
+    result = cp.field_component(
+        coordinates, model, pressure, 0.25, 3300, kernel='d_z1',
+        pressure_threshold=1e-3
+    )
+    full = cp.field_component(
+        coordinates, model[:8], pressure[:, :8], 0.25, 3300, kernel='d_z1'
+    )
+    assert np.abs(result - full).max() <= 10*error*np.abs(full).max()
+    with pytest.raises(ValueError):
+        cp.active_prisms(model, pressure, threshold=-1)
+
+
+def test_merge_prisms():
+    'merged prisms must produce the same fields as the original prisms'
+    y, x = np.meshgrid(
+        np.linspace(-3000, 3000, 6), np.linspace(-3000, 3000, 5)
+    )
+    coordinates = np.vstack([y.ravel(), x.ravel(), np.zeros(x.size) + 500])
+    # uniform stack of two rectangular layers
+    model = np.vstack([
+        cp.prism_layer_rectangular((-500, 500, -800, 800), (4, 5), 1100,
+                                   1000),
+        cp.prism_layer_rectangular((-500, 500, -800, 800), (4, 5), 1200,
+                                   1100),
+    ])
+    merged, pressure, ratio = cp.merge_prisms(model, np.zeros(40) - 10)
+    aae(merged, [[-500, 500, -800, 800, 1200, 1000]], decimal=9)
+    aae(pressure, [-10])
+    assert ratio == 40
+    # circular layers with different pressure along z and time
+    model = np.vstack([
+        cp.prism_layer_circular((0, 0), 500, (10, 10), 800, 750),
+        cp.prism_layer_circular((0, 0), 500, (10, 10), 850, 800),
+    ])
+    n = model.shape[0]//2
+    pressure = np.vstack([
+        np.hstack([np.zeros(n) - 40, np.zeros(n) - 20]),
+        np.zeros(2*n) - 5,
+    ])
+    merged, merged_pressure, ratio = cp.merge_prisms(model, pressure)
+    assert merged_pressure.shape == (2, merged.shape[0])
+    assert ratio == model.shape[0]/merged.shape[0]
+    assert ratio > 4
+    for function in [cp.displacement_components, cp.stress_components]:
+        reference = function(coordinates, model, pressure, 0.25, 3300)
+        result = function(coordinates, merged, merged_pressure, 0.25, 3300)
+        for i, j in zip(result, reference):
+            np.testing.assert_allclose(
+                i, j, rtol=1e-9, atol=1e-12*np.abs(j).max()
+            )
+
+
+def test_prism_grid_builders():
+    'vectorized builders must share exact boundaries between prisms'
+    region = (-1000, 1000, -700, 1300)
+    layer = cp.prism_layer_rectangular(region, (7, 9), 1100, 1000)
+    assert layer.shape == (63, 6)
+    assert layer.flags.c_contiguous
+    aae(layer[0], [-1000, -1000 + 2000/7, -700, -700 + 2000/9, 1100, 1000])
+    aae(layer[-1], [1000 - 2000/7, 1000, 1300 - 2000/9, 1300, 1100, 1000])
+    # neighbouring prisms share exactly the same boundaries
+    assert np.all(layer[1:9, 2] == layer[:8, 3])
+    assert np.all(layer[9::9, 0] == layer[:-9:9, 1])
+    levels = [1000, 1050, 1200]
+    grid = cp.prism_grid(region, (7, 9), levels)
+    assert grid.shape == (126, 6)
+    aae(grid[:63, :4], layer[:, :4])
+    aae(grid[63:, :4], layer[:, :4])
+    aae(grid[:63, 4:], [[1050, 1000]]*63)
+    aae(grid[63:, 4:], [[1200, 1050]]*63)
+    # surfaces with varying depth divided into two layers
+    stacked = cp.prism_layer_surfaces(
+        region, (7, 9), lambda y, x: 1100 + 0.01*y, 1000, n_layers=2
+    )
+    assert stacked.shape == (126, 6)
+    aae(stacked[:63, 5], np.zeros(63) + 1000)
+    aae(stacked[63:, 4] - 1100, 0.01*0.5*(layer[:, 0] + layer[:, 1]))
+    aae(stacked[:63, 4], stacked[63:, 5])
+    # circular layer keeps the prisms with centers inside the circle
+    circle = cp.prism_layer_circular((100, -50), 500, (20, 20), 850, 750)
+    center_y = 0.5*(circle[:, 0] + circle[:, 1]) - 100
+    center_x = 0.5*(circle[:, 2] + circle[:, 3]) + 50
+    assert np.all(np.hypot(center_y, center_x) <= 500)
+    assert circle.shape[0] == 316
+
+
+def test_result_cache(tmp_path, monkeypatch):
+    'cached results must be equal to the computed ones and evicted by size'
+    y = np.linspace(-900, 1000, 5)
+    coordinates = np.vstack([y, np.zeros(5), np.zeros(5)])
+    model = np.array([[-100, 0, 100, 250, 350, 300],
+                      [0, 100, 100, 250, 350, 300]])
+    pressure = np.array([-10., -5.])
+    reference = cp.field_component(coordinates, model, pressure, 0.25, 3300,
+                                   kernel='d_z1')
+    cp.set_cache(str(tmp_path))
+    try:
+        for i in range(2):
+            result = cp.field_component(coordinates, model, pressure, 0.25,
+                                        3300, kernel='d_z1')
+            aae(result, reference, decimal=15)
+        statistics = cp.cache_statistics()
+        assert statistics['hits'] == 1
+        assert statistics['misses'] == 1
+        assert statistics['entries'] == 1
+        # results of other versions of the kernels are not read
+        monkeypatch.setattr(cp, '_CACHE_VERSION', cp._CACHE_VERSION + 1)
+        cp.field_component(coordinates, model, pressure, 0.25, 3300,
+                           kernel='d_z1')
+        assert cp.cache_statistics()['misses'] == 2
+        monkeypatch.undo()
+        # keep only the entry of the current version
+        cp.clear_cache()
+        cp.field_component(coordinates, model, pressure, 0.25, 3300,
+                           kernel='d_z1')
+        # room for two entries, which are different for different inputs
+        entry_bytes = statistics['bytes']
+        cp.set_cache(str(tmp_path), max_bytes=2*entry_bytes)
+        for young in [3000, 3100]:
+            cp.field_component(coordinates, model, pressure, 0.25, young,
+                               kernel='d_z1')
+        statistics = cp.cache_statistics()
+        assert statistics['misses'] == 2
+        assert statistics['evictions'] == 1
+        assert statistics['bytes'] == 2*entry_bytes
+        cp.clear_cache()
+        assert cp.cache_statistics()['entries'] == 0
+        # results written into out are not cached
+        out = np.empty(5)
+        cp.field_component(coordinates, model, pressure, 0.25, 3300,
+                           kernel='d_z1', out=out, block_size=2)
+        aae(out, reference, decimal=15)
+        assert cp.cache_statistics()['entries'] == 0
+        # neither are the chunks of a stream
+        chunks = cp.iter_chunks(coordinates, chunk_size=2)
+        result = np.concatenate(list(cp.stream_field_component(
+            chunks, model, pressure, 0.25, 3300, 'd_z1'
+        )))
+        aae(result, reference, decimal=15)
+        assert cp.cache_statistics()['entries'] == 0
+    finally:
+        cp.set_cache(None)
+    assert cp.cache_statistics()['hits'] == 0
+
+
+def test_elastic_parameter_sweep():
+    'sweep must be equal to the components computed for each pair'
+    y, x = np.meshgrid(np.linspace(-900, 1000, 5), np.linspace(-500, 600, 4))
+    coordinates = np.vstack([y.ravel(), x.ravel(), np.zeros(x.size) - 10])
+    model = np.array([[-100, 0, 100, 250, 350, 300],
+                      [0, 100, 100, 250, 350, 300]])
+    pressure = np.array([[-10, -5], [-3, -7]])
+    poisson = np.array([0.2, 0.25, 0.3])
+    young = np.array([[3000], [3300]])
+    for components, sweep in [
+        (cp.displacement_components, cp.displacement_components_sweep),
+        (cp.stress_components, cp.stress_components_sweep)
+    ]:
+        results = sweep(coordinates, model, pressure, poisson, young)
+        for result in results:
+            assert result.shape == (2, 3, 2, 20)
+        for i in range(2):
+            for j in range(3):
+                references = components(coordinates, model, pressure,
+                                        poisson[j], young[i, 0])
+                # round-off of the different order of the operations
+                for result, reference in zip(results, references):
+                    np.testing.assert_allclose(
+                        result[i, j], reference, rtol=1e-12,
+                        atol=1e-12*np.abs(reference).max()
+                    )
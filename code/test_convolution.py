@@ -0,0 +1,90 @@
+import numpy as np
+from numpy.testing import assert_almost_equal as aae
+import compaction as cp
+import convolution as conv
+
+
+def layered_model():
+    'two stacked rectangular layers with spacing of 50 m'
+    region = (-500, 0, -300, 300)
+    top = cp.prism_layer_rectangular(region, (10, 12), 350, 300)
+    bottom = cp.prism_layer_rectangular(region, (10, 12), 420, 350)
+    model = np.vstack([top, bottom])
+    np.random.seed(23)
+    pressure = -10*np.random.rand(model.shape[0])
+    return model, pressure
+
+
+def map_points(spacing, z):
+    'regular horizontal grid of computation points'
+    y = -1000 + 13 + spacing*np.arange(40)
+    x = -800 - 7 + spacing*np.arange(36)
+    y, x = np.meshgrid(y, x)
+    return np.stack([y, x, np.full_like(y, z)])
+
+
+def test_fft_versus_direct_components():
+    'FFT displacement and stress must be equal to the direct ones'
+    model, pressure = layered_model()
+    for spacing, z in [(50, 0), (25, 0), (100, 150)]:
+        coordinates = map_points(spacing, z)
+        assert conv.convolution_layout(
+            *cp._prepare_arguments(coordinates, model, pressure, False)[1:]
+        ) is not None
+        reference = cp.displacement_components(
+            coordinates, model, pressure, 0.25, 3300
+        )
+        result = conv.displacement_components(
+            coordinates, model, pressure, 0.25, 3300
+        )
+        scale = np.abs(reference).max()
+        aae(np.array(result)/scale, np.array(reference)/scale, decimal=10)
+        reference = cp.stress_components(
+            coordinates, model, pressure, 0.25, 3300
+        )
+        result = conv.stress_components(
+            coordinates, model, pressure, 0.25, 3300
+        )
+        aae(result, reference, decimal=10)
+
+
+def test_fft_versus_direct_kernels():
+    'FFT kernels must be equal to the direct ones for 2d pressure'
+    model, pressure = layered_model()
+    pressure = np.vstack([pressure, np.ones_like(pressure)])
+    coordinates = map_points(50, 10)
+    for kernel in ['d_x1', 'd_zz2', 's_zzz2']:
+        reference = cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel
+        )
+        result = conv.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel
+        )
+        assert result.shape == reference.shape
+        scale = np.abs(reference).max()
+        aae(result/scale, reference/scale, decimal=10)
+
+
+def test_fallback_to_direct():
+    'irregular computation points must use the direct computation'
+    model, pressure = layered_model()
+    np.random.seed(29)
+    coordinates = np.vstack([
+        1000*np.random.rand(20) - 500, 1000*np.random.rand(20) - 500,
+        np.zeros(20)
+    ])
+    assert conv.convolution_layout(
+        *cp._prepare_arguments(coordinates, model, pressure, False)[1:]
+    ) is None
+    reference = cp.displacement_components(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    result = conv.displacement_components(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    aae(result, reference, decimal=15)
+    # incommensurate spacings
+    coordinates = map_points(50*np.sqrt(2), 0)
+    assert conv.convolution_layout(
+        *cp._prepare_arguments(coordinates, model, pressure, False)[1:]
+    ) is None
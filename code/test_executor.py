@@ -0,0 +1,96 @@
+import multiprocessing
+import numpy as np
+from numpy.testing import assert_almost_equal as aae
+import pytest
+import compaction as cp
+import executor as ex
+
+
+def model_and_points():
+    'small model with time-varying pressure and computation points'
+    y = np.linspace(-900, 1000, 7)
+    x = np.linspace(-2500, -1400, 6)
+    y, x = np.meshgrid(y, x)
+    np.random.seed(19)
+    z = 400*np.random.rand(*x.shape) - 100
+    coordinates = np.stack([y, x, z])
+    model = np.vstack([
+        cp.prism_layer_rectangular((-500, 500, -300, 700), (3, 4), 350, 300),
+        cp.prism_layer_rectangular((-500, 500, -300, 700), (3, 4), 400, 350),
+    ])
+    pressure = -10*np.random.rand(2, model.shape[0])
+    return coordinates, model, pressure
+
+
+def test_workers_versus_single_process():
+    'points and prisms split among processes must match compaction'
+    coordinates, model, pressure = model_and_points()
+    reference = cp.field_component(
+        coordinates, model, pressure, 0.25, 3300, 'd_z2'
+    )
+    for split in ['points', 'prisms']:
+        result = ex.field_component(
+            coordinates, model, pressure, 0.25, 3300, 'd_z2', n_workers=2,
+            split=split, n_blocks=5
+        )
+        assert result.shape == reference.shape
+        aae(result, reference, decimal=12)
+    for function in ['displacement_components', 'stress_components']:
+        reference = getattr(cp, function)(
+            coordinates, model, pressure[0], 0.25, 3300
+        )
+        result = getattr(ex, function)(
+            coordinates, model, pressure[0], 0.25, 3300, n_workers=2,
+            split='prisms'
+        )
+        aae(result, reference, decimal=10)
+
+
+def test_memory_mapped_files(monkeypatch):
+    'arrays must be shared through files without shared memory'
+    monkeypatch.setattr(ex, 'shared_memory', None)
+    coordinates, model, pressure = model_and_points()
+    reference = cp.field_component(
+        coordinates, model, pressure, 0.25, 3300, 'd_z2'
+    )
+    result = ex.field_component(
+        coordinates, model, pressure, 0.25, 3300, 'd_z2', n_workers=2,
+        split='prisms', n_blocks=3
+    )
+    aae(result, reference, decimal=12)
+
+
+def test_deterministic_merge():
+    'results must depend only on the number of blocks'
+    coordinates, model, pressure = model_and_points()
+    results = [
+        ex.field_component(
+            coordinates, model, pressure, 0.25, 3300, 's_zz1',
+            n_workers=n_workers, split='prisms', n_blocks=4
+        )
+        for n_workers in [1, 2, 3]
+    ]
+    for result in results[1:]:
+        np.testing.assert_array_equal(result, results[0])
+
+
+def test_fork_server_workers():
+    'workers started by a fork server must attach to the shared arrays'
+    coordinates, model, pressure = model_and_points()
+    reference = cp.field_component(
+        coordinates, model, pressure, 0.25, 3300, 'd_x1'
+    )
+    result = ex.field_component(
+        coordinates, model, pressure, 0.25, 3300, 'd_x1', n_workers=2,
+        mp_context=multiprocessing.get_context('forkserver')
+    )
+    aae(result, reference, decimal=12)
+
+
+def test_bad_split():
+    'must stop if the split is not recognized'
+    coordinates, model, pressure = model_and_points()
+    with pytest.raises(ValueError):
+        ex.field_component(
+            coordinates, model, pressure, 0.25, 3300, 'd_x1', split='steps'
+        )
@@ -0,0 +1,62 @@
+import json
+import os
+import pickle
+import numpy as np
+from numpy.testing import assert_almost_equal as aae
+import pytest
+import compaction as cp
+import reservoir_model as rm
+
+
+def test_save_and_load_model(tmp_path):
+    'loaded model must be equal to the saved one and memory-mapped'
+    prisms = cp.prism_layer_rectangular((-500, 500, -300, 700), (4, 5), 350,
+                                        300)
+    np.random.seed(3)
+    pressure = -10*np.random.rand(3, prisms.shape[0])
+    directory = str(tmp_path / 'model')
+    rm.save_model(directory, prisms, pressure, poisson=0.25, young=3300,
+                  metadata={'field': 'test'})
+    model = rm.load_model(directory)
+    assert isinstance(model['prisms'], np.memmap)
+    assert isinstance(model['pressure'], np.memmap)
+    aae(model['prisms'], prisms, decimal=15)
+    aae(model['pressure'][1], pressure[1], decimal=15)
+    assert model['poisson'] == 0.25
+    assert model['young'] == 3300
+    assert model['metadata'] == {'field': 'test'}
+    assert model['version'] == rm.VERSION
+    # 1d pressure is stored as a single time step
+    rm.save_model(directory, prisms, pressure[0])
+    assert rm.load_model(directory)['pressure'].shape == (1, 20)
+    with pytest.raises(ValueError):
+        rm.save_model(directory, prisms, pressure[:, :3])
+
+
+def test_load_newer_version(tmp_path):
+    'models with a newer version of the format must not be loaded'
+    directory = str(tmp_path / 'model')
+    rm.save_model(directory, np.array([[0, 1, 0, 1, 2, 1]]), [-1])
+    header_file = os.path.join(directory, 'header.json')
+    with open(header_file) as f:
+        header = json.load(f)
+    header['version'] = rm.VERSION + 1
+    with open(header_file, 'w') as f:
+        json.dump(header, f)
+    with pytest.raises(ValueError):
+        rm.load_model(directory)
+
+
+def test_convert_pickle(tmp_path):
+    'converted pickle must contain the same prisms and pressure'
+    prisms = cp.prism_layer_circular((0, 0), 500, (6, 6), 850, 750)
+    pressure = np.zeros(prisms.shape[0]) - 10
+    filename = str(tmp_path / 'model.pickle')
+    with open(filename, 'wb') as f:
+        pickle.dump({b'model': prisms, b'DP': pressure}, f)
+    directory = str(tmp_path / 'model')
+    rm.convert_pickle(filename, directory, poisson=0.25, young=3300)
+    model = rm.load_model(directory)
+    aae(model['prisms'], prisms, decimal=15)
+    aae(model['pressure'][0], pressure, decimal=15)
+    assert model['metadata'] == {'source': 'model.pickle'}
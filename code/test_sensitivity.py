@@ -0,0 +1,80 @@
+import numpy as np
+from numpy.testing import assert_almost_equal as aae
+import pytest
+import compaction as cp
+import sensitivity as sens
+
+
+def model_and_points():
+    'small model and computation points'
+    y = np.linspace(-900, 1000, 7)
+    x = np.linspace(-2500, -1400, 6)
+    y, x = np.meshgrid(y, x)
+    np.random.seed(13)
+    z = 400*np.random.rand(*x.shape) - 100
+    coordinates = np.stack([y, x, z])
+    model = np.array([[-100, -50, 100, 150, 350, 330],
+                      [-100, -50, 150, 250, 350, 330],
+                      [-50, 0, 100, 150, 330, 300]])
+    return coordinates, model
+
+
+def test_matrix_versus_components():
+    'product of the matrix by the pressure must be equal to the components'
+    coordinates, model = model_and_points()
+    poisson = 0.25
+    young = 3300
+    pressure = np.array([-10, -5, 3])
+    components = {
+        'displacement_x': cp.displacement_x_component,
+        'displacement_y': cp.displacement_y_component,
+        'displacement_z': cp.displacement_z_component,
+        'stress_x': cp.stress_x_component,
+        'stress_y': cp.stress_y_component,
+        'stress_z': cp.stress_z_component,
+    }
+    for field, component in components.items():
+        reference = component(coordinates, model, pressure, poisson, young)
+        matrix = sens.sensitivity_matrix(
+            coordinates, model, poisson, young, field, block_size=10
+        )
+        assert matrix.shape == (coordinates[0].size, model.shape[0])
+        aae(sens.forward(matrix, pressure), reference.ravel(), decimal=12)
+    reference = cp.field_component(
+        coordinates, model, pressure, poisson, young, 's_zzz2'
+    )
+    matrix = sens.sensitivity_matrix(
+        coordinates, model, poisson, young, 's_zzz2'
+    )
+    aae(sens.forward(matrix, pressure), reference.ravel(), decimal=12)
+
+
+def test_memory_mapped_matrix(tmp_path):
+    'matrix written to disk must be equal to the one kept in memory'
+    coordinates, model = model_and_points()
+    filename = str(tmp_path / 'matrix.npy')
+    reference = sens.sensitivity_matrix(
+        coordinates, model, 0.25, 3300, 'displacement_z'
+    )
+    sens.sensitivity_matrix(
+        coordinates, model, 0.25, 3300, 'displacement_z', filename=filename,
+        block_size=7
+    )
+    matrix = sens.load_sensitivity_matrix(filename)
+    assert isinstance(matrix, np.memmap)
+    aae(matrix, reference, decimal=15)
+    # sequence of pressure distributions
+    pressure = np.array([[-10, -5, 3], [-1, 0, 0]])
+    result = sens.forward(matrix, pressure, block_size=5)
+    assert result.shape == (2, coordinates[0].size)
+    aae(result[1], -reference[:, 0], decimal=15)
+
+
+def test_bad_field():
+    'must stop if the field or the pressure are invalid'
+    coordinates, model = model_and_points()
+    with pytest.raises(ValueError):
+        sens.sensitivity_matrix(coordinates, model, 0.25, 3300, 'foo')
+    matrix = sens.sensitivity_matrix(coordinates, model, 0.25, 3300, 'd_x1')
+    with pytest.raises(ValueError):
+        sens.forward(matrix, np.zeros(4))
@@ -0,0 +1,128 @@
+import numpy as np
+from numpy.testing import assert_almost_equal as aae
+import pytest
+import compaction as cp
+import shared_vertex as sv
+
+
+def stacked_model():
+    'two stacked rectangular layers with random pressure'
+    region = (-500, 700, -300, 900)
+    top = cp.prism_layer_rectangular(region, (4, 5), 350, 300)
+    bottom = cp.prism_layer_rectangular(region, (4, 5), 420, 350)
+    model = np.vstack([top, bottom])
+    np.random.seed(11)
+    pressure = -10*np.random.rand(model.shape[0])
+    return model, pressure
+
+
+def computation_points():
+    'computation points above, inside and below the model'
+    y = np.linspace(-900, 1100, 9)
+    x = np.linspace(-700, 1300, 8)
+    y, x = np.meshgrid(y, x)
+    np.random.seed(2)
+    z = 600*np.random.rand(*x.shape) - 50
+    return np.stack([y, x, z])
+
+
+def test_vertex_versus_prism_kernels():
+    'shared-vertex fields must be equal to those computed prism by prism'
+    model, pressure = stacked_model()
+    coordinates = computation_points()
+    for kernel in cp.KERNELS:
+        reference = cp.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel
+        )
+        result = sv.field_component(
+            coordinates, model, pressure, 0.25, 3300, kernel
+        )
+        aae(result, reference, decimal=10)
+
+
+def test_vertex_versus_prism_components():
+    'shared-vertex displacement and stress must be equal to the fused ones'
+    model, pressure = stacked_model()
+    coordinates = computation_points()
+    reference = cp.displacement_components(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    result = sv.displacement_components(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    aae(result, reference, decimal=10)
+    reference = cp.stress_components(coordinates, model, pressure, 0.25, 3300)
+    result = sv.stress_components(coordinates, model, pressure, 0.25, 3300)
+    aae(result, reference, decimal=10)
+
+
+def test_circular_layer():
+    'missing cells of the grid must have null pressure'
+    model = cp.prism_layer_circular((0, 0), 500, (8, 8), 350, 300)
+    pressure = np.zeros(model.shape[0]) - 10
+    coordinates = computation_points()
+    reference = cp.displacement_z_component(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    result = sv.displacement_components(
+        coordinates, model, pressure, 0.25, 3300
+    )[2]
+    aae(result, reference, decimal=10)
+
+
+def test_number_of_vertices():
+    'each vertex must be evaluated once and null weights must be removed'
+    model, pressure = stacked_model()
+    grid = sv.grid_from_prisms(model, pressure)
+    vertices, weights = sv.vertex_sources(*grid, kernel='d_x1')
+    assert vertices.shape[0] == 3*5*6
+    # image vertices are also shared between the layers
+    vertices, weights = sv.vertex_sources(*grid, kernel='d_x2')
+    assert vertices.shape[0] == 3*5*6
+    # uniform pressure cancels the weights of the interior vertices
+    grid = sv.grid_from_prisms(model, np.ones(model.shape[0]))
+    for kernel in ['d_x1', 'd_x2']:
+        vertices, weights = sv.vertex_sources(*grid, kernel=kernel)
+        assert vertices.shape[0] == 2*4
+
+
+def test_bad_grid():
+    'must stop if the prisms are not cells of a rectilinear grid'
+    model = np.array([[-100, 0, 100, 250, 350, 300],
+                      [-50, 50, 100, 250, 350, 300]])
+    with pytest.raises(ValueError):
+        sv.grid_from_prisms(model, np.ones(2))
+
+
+def test_multiple_time_steps():
+    'results for 2d pressure must be equal to those computed prism by prism'
+    model, pressure = stacked_model()
+    pressure = np.vstack([pressure, np.ones_like(pressure)])
+    coordinates = computation_points()
+    reference = cp.displacement_components(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    result = sv.displacement_components(
+        coordinates, model, pressure, 0.25, 3300
+    )
+    assert np.shape(result) == (3, 2) + coordinates[0].shape
+    aae(result, reference, decimal=10)
+
+
+def test_single_precision():
+    'single precision must round the sum of the vertex terms only once'
+    model = cp.prism_layer_rectangular((-2000, 2000, -2000, 2000), (40, 40),
+                                       1100, 1000)
+    np.random.seed(7)
+    pressure = -10*np.random.rand(model.shape[0])
+    y, x = np.meshgrid(np.linspace(-20000, 20000, 5),
+                       np.linspace(-20000, 20000, 5))
+    coordinates = np.stack([y, x, np.zeros_like(x)])
+    reference = sv.field_component(
+        coordinates, model, pressure, 0.25, 3300, 'd_z1'
+    )
+    result = sv.field_component(
+        coordinates, model, pressure, 0.25, 3300, 'd_z1', dtype='float32'
+    )
+    assert result.dtype == np.float32
+    assert np.all(np.abs(result - reference) <= 4*2.0**-24*np.abs(reference))